@@ -0,0 +1,4 @@
+"""Performance benchmarks for the codex rules engine.
+
+Run ``python -m benchmarks.run_codex_rules --help`` from ``Tooling/x-cli``.
+"""
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Time every codex rules CLI stage on a synthetic history.
+
+For each backend (``sqlite``: a fresh :class:`Storage` file opened by every
+CLI invocation, as in CI; ``memory``: one shared :class:`InMemoryStorage`)
+the runner drives ``codex_rules.cli.main`` through the workflow:
+
+  record-pr (every PR) -> ingest-tests (every PR) -> analyze -> prune
+  -> emit-warnings (every PR)
+
+and records the wall time of each stage.  With ``--repeat R`` the whole
+workflow runs R times on fresh workspaces and the fastest time per stage is
+kept.  Results are written as JSON::
+
+    {"params": {...}, "repeat": 3, "python": "3.x", "results": {"sqlite":
+     {"analyze": {"seconds": 0.12, "ops": 1, "per_op_ms": 120.0}, ...},
+     "memory": {...}}}
+
+``--baseline FILE`` compares ``per_op_ms`` against a previous results file
+and exits 1 when any stage is more than ``--threshold`` (a fraction, default
+0.25) slower, or 2 when the baseline was generated with other ``params``
+(``repeat`` only affects timing noise and is not one of them).  ``--update-baseline`` writes the new results to that file.
+A baseline for the default parameters is kept in ``benchmarks/baseline.json``::
+
+    python benchmarks/run_codex_rules.py --repeat 3 --baseline benchmarks/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+if __package__ in (None, ""):  # executed as a script
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate_history, write_workspace  # noqa: E402
+from codex_rules import cli  # noqa: E402
+from codex_rules.storage import InMemoryStorage  # noqa: E402
+
+BACKENDS = ("sqlite", "memory")
+STAGES = ("record-pr", "ingest-tests", "analyze", "prune", "emit-warnings")
+DEFAULT_THRESHOLD = 0.25
+
+
+def _stage_commands(history: Dict) -> Dict[str, List[List[str]]]:
+    """Return the CLI argument lists of each stage."""
+    prs = [pr["pr_id"] for pr in history["prs"]]
+    return {
+        "record-pr": [
+            ["record-pr", "--pr", str(pr), "--files-json", f"data/pr-{pr}-files.json"]
+            for pr in prs
+        ],
+        "ingest-tests": [
+            [
+                "ingest-tests", "--pr", str(pr), "--path", f"data/pr-{pr}-junit.xml",
+                "--run-id", f"bench-{pr}", "--commit", f"sha-{pr}",
+            ]
+            for pr in prs
+        ],
+        "analyze": [["analyze"]],
+        "prune": [["prune", "--last-n", "50"]],
+        "emit-warnings": [["emit-warnings", "--pr", str(pr)] for pr in prs],
+    }
+
+
+def _run_workflow(history: Dict, backend: str) -> Dict[str, Dict]:
+    """Run every stage once in a fresh workspace; return per-stage timings."""
+    commands = _stage_commands(history)
+    timings: Dict[str, Dict] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="codex-rules-bench-") as tmp:
+        root = Path(tmp)
+        write_workspace(history, root)
+        # Thresholds low enough for the synthetic correlations to yield rules.
+        (root / ".codex" / "rules.yml").write_text(
+            json.dumps({"min_occurrences": 2, "min_lift": 1.5, "alpha": 0.05}),
+            encoding="utf-8",
+        )
+        storage = InMemoryStorage() if backend == "memory" else None
+        os.chdir(root)
+        try:
+            for stage in STAGES:
+                runs = commands[stage]
+                sink = io.StringIO()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+                    for argv in runs:
+                        cli.main(argv, storage=storage)
+                elapsed = time.perf_counter() - start
+                timings[stage] = {
+                    "seconds": elapsed,
+                    "ops": len(runs),
+                    "per_op_ms": elapsed * 1000 / len(runs),
+                }
+        finally:
+            os.chdir(cwd)
+    return timings
+
+
+def run(
+    *,
+    prs: int,
+    components: int,
+    tests: int,
+    seed: int = 0,
+    correlation: float = 0.3,
+    noise: float = 0.01,
+    repeat: int = 1,
+    backends: List[str] | None = None,
+) -> Dict:
+    """Benchmark ``backends`` and return the results document."""
+    params = {
+        "prs": prs,
+        "components": components,
+        "tests": tests,
+        "seed": seed,
+        "correlation": correlation,
+        "noise": noise,
+    }
+    history = generate_history(
+        prs=prs, components=components, tests=tests, seed=seed,
+        correlation=correlation, noise=noise,
+    )
+    results: Dict[str, Dict] = {}
+    for backend in backends or BACKENDS:
+        best: Dict[str, Dict] = {}
+        for _ in range(max(repeat, 1)):
+            for stage, timing in _run_workflow(history, backend).items():
+                if stage not in best or timing["seconds"] < best[stage]["seconds"]:
+                    best[stage] = timing
+        results[backend] = best
+    return {
+        "params": params,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Return one message per stage slower than ``baseline`` by > ``threshold``.
+
+    Stages or backends missing from either document are ignored.  Raises
+    ``ValueError`` when the baseline was recorded with different generator
+    parameters, since its timings are then not comparable.
+    """
+    if current.get("params") != baseline.get("params"):
+        raise ValueError(
+            f"baseline params {baseline.get('params')} differ from {current.get('params')}; "
+            "rerun with matching options or --update-baseline"
+        )
+    regressions = []
+    for backend, stages in current["results"].items():
+        for stage, timing in stages.items():
+            base = baseline.get("results", {}).get(backend, {}).get(stage)
+            if not base or not base.get("per_op_ms"):
+                continue
+            ratio = timing["per_op_ms"] / base["per_op_ms"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{backend}/{stage}: {timing['per_op_ms']:.2f} ms/op vs baseline "
+                    f"{base['per_op_ms']:.2f} ms/op ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prs", type=int, default=200)
+    parser.add_argument("--components", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--correlation", type=float, default=0.3,
+        help="Failure probability of a test whose component the PR touched",
+    )
+    parser.add_argument("--noise", type=float, default=0.01, help="Background failure probability")
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the fastest of N runs per stage")
+    parser.add_argument("--backend", choices=BACKENDS, action="append", dest="backends")
+    parser.add_argument("--out", default=None, help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Overwrite --baseline with these results"
+    )
+    args = parser.parse_args(argv)
+
+    report = run(
+        prs=args.prs, components=args.components, tests=args.tests, seed=args.seed,
+        correlation=args.correlation, noise=args.noise, repeat=args.repeat,
+        backends=args.backends,
+    )
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if not args.baseline:
+        return 0
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(text + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+    if not baseline_path.is_file():
+        print(f"No baseline file found at {baseline_path}", file=sys.stderr)
+        return 0
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    try:
+        regressions = compare(report, baseline, args.threshold)
+    except ValueError as exc:
+        print(f"Cannot compare with {baseline_path}: {exc}", file=sys.stderr)
+        return 2
+    for line in regressions:
+        print(f"Regression: {line}", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"All stages within {args.threshold:.0%} of {baseline_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Seeded synthetic PR/test history for benchmarking the codex rules engine.
+
+:func:`generate_history` builds ``prs`` pull requests over ``components``
+components and ``tests`` tests.  Tests are assigned round-robin to
+components (their JUnit ``file`` hint lives in the component's directory).
+Each PR touches between one and ``max_touched`` components; a test whose
+component was touched fails with probability ``correlation`` and any test
+fails with probability ``noise``.  The same seed always yields the same
+history, so timings from different runs are comparable.
+
+:func:`write_workspace` lays the history out as the CLI expects it: a
+component mapping at ``.codex/components.yml``, one files JSON per PR for
+``record-pr`` and one JUnit report per PR for ``ingest-tests``.
+"""
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import quoteattr
+
+
+def generate_history(
+    *,
+    prs: int,
+    components: int,
+    tests: int,
+    seed: int = 0,
+    correlation: float = 0.3,
+    noise: float = 0.01,
+    max_touched: int = 3,
+) -> Dict:
+    """Return ``{"components": [...], "tests": [...], "prs": [...]}``.
+
+    Each PR is ``{"pr_id", "files": [{"path", "status"}], "results":
+    [{"classname", "name", "file", "failed"}]}``.
+    """
+    rng = random.Random(seed)
+    names = [f"comp{c:03d}" for c in range(components)]
+    test_defs = [
+        {
+            "classname": f"{names[k % components]}.suite",
+            "name": f"test_{k:05d}",
+            "file": f"src/{names[k % components]}/tests/test_{k:05d}.py",
+            "component": names[k % components],
+        }
+        for k in range(tests)
+    ]
+    history: List[Dict] = []
+    for pr_id in range(1, prs + 1):
+        touched = rng.sample(names, rng.randint(1, min(max_touched, components)))
+        files = [
+            {"path": f"src/{comp}/module_{rng.randrange(50)}.py", "status": "modified"}
+            for comp in touched
+        ]
+        results = [
+            {
+                "classname": t["classname"],
+                "name": t["name"],
+                "file": t["file"],
+                "failed": (t["component"] in touched and rng.random() < correlation)
+                or rng.random() < noise,
+            }
+            for t in test_defs
+        ]
+        history.append({"pr_id": pr_id, "files": files, "results": results})
+    return {"components": names, "tests": test_defs, "prs": history}
+
+
+def write_workspace(history: Dict, root: Path) -> None:
+    """Write the mapping, PR files JSON and JUnit reports under ``root``."""
+    codex = root / ".codex"
+    codex.mkdir(parents=True, exist_ok=True)
+    mapping = {"components": {c: {"globs": [f"src/{c}/**"]} for c in history["components"]}}
+    (codex / "components.yml").write_text(json.dumps(mapping), encoding="utf-8")
+    data = root / "data"
+    data.mkdir(exist_ok=True)
+    for pr in history["prs"]:
+        pr_id = pr["pr_id"]
+        (data / f"pr-{pr_id}-files.json").write_text(json.dumps(pr["files"]), encoding="utf-8")
+        cases = "".join(
+            f"<testcase classname={quoteattr(r['classname'])} name={quoteattr(r['name'])}"
+            f" file={quoteattr(r['file'])} time=\"0.01\">"
+            + ("<failure>synthetic</failure>" if r["failed"] else "")
+            + "</testcase>"
+            for r in pr["results"]
+        )
+        (data / f"pr-{pr_id}-junit.xml").write_text(
+            f"<testsuites><testsuite>{cases}</testsuite></testsuites>", encoding="utf-8"
+        )
@@ -4,12 +4,32 @@ The CLI exposes subcommands that mirror the high‑level workflow:
 
   - ``record-pr``: record PR metadata and touched files.
   - ``ingest-tests``: parse test results (e.g. JUnit) and store failing events.
-  - ``analyze``: compute component/test correlations and update guidance.
+  - ``analyze``: compute component/test correlations and update guidance
+    (``--incremental`` recomputes only pairs touched since the last run).
   - ``update-docs``: rewrite the guidance section in AGENTS.md.
   - ``emit-warnings``: print warnings when a PR touches components with active
     guidance.
   - ``prune``: mark stale guidance rules inactive.
-  - ``export``: export guidance or stats as JSON for debugging.
+  - ``compact``: roll events older than the retention horizon into per-day
+    failure counts and reclaim the freed space.
+  - ``merge``: combine the histories of several rules databases.
+  - ``export``: export guidance or stats as JSON for debugging, or the raw
+    event history as NDJSON/Parquet/Arrow.
+  - ``import``: load an exported event history into the store.  Only test
+    events travel this way; PR metadata (``prs``/``pr_files``) and pass
+    summaries do not, so use ``merge`` to move a history that will be
+    re-analyzed.
+  - ``serve``: keep the config, component mapping and a read-only database
+    connection warm and answer ``emit-warnings`` and ``check-compliance``
+    over a local socket (see :mod:`codex_rules.daemon`;
+    ``python -m codex_rules.client`` is the matching client).
+
+``--storage memory`` runs any subcommand against the in-process backend;
+add ``--snapshot out.json`` to persist its state between invocations.
+
+``--profile`` times each stage (see :mod:`codex_rules.profiling`) and prints
+the spans as JSON to stderr, or to the file given; with
+``--record-telemetry`` they are also attached to the telemetry entry.
 
 The engine is fully self‑contained and does not require GitHub Actions.
 """
@@ -17,34 +37,38 @@ The engine is fully self‑contained and does not require GitHub Actions.
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import os
 import subprocess
 import sys
+import time
 from datetime import datetime, timezone
 from glob import glob
 from pathlib import Path
-from typing import Dict, List, Type
+from typing import Dict, Iterable, List, Tuple, Type
 
 from .config import load_config
+from .exchange import EVENT_FORMATS, format_for_path, iter_events, write_events
 from .mapping import ComponentMapping
-from .storage import Storage, StorageProtocol
-from .ingest.junit import parse_junit
-from .ingest.pytest_json import parse_pytest_json
-from .ingest.jest_json import parse_jest_json
-from .correlate import compute_candidates
-from .guidance import (
-    create_guidance_entries,
-    update_agents_md,
+from .profiling import Profiler, active as active_profiler, add_rows, profiled, span
+from .storage import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_RETENTION_DAYS,
+    InMemoryStorage,
+    Storage,
+    StorageProtocol,
 )
-from .warnings import build_warnings
-from .compliance import load_manifest as load_exec_manifest, check as check_compliance
-from .memory import (
-    REPO_ROOT,
-    MEMORY_PATH,  # absolute path to memory file
-    append_entry as memory_append_entry,  # for writing to persistent memory
-)
-from .telemetry import record_telemetry_entry
+
+# Ingestors, analysis, compliance, memory and telemetry are imported by the
+# subcommands that need them, so ``--help`` and the query commands do not pay
+# for the parsers, numpy, the process pool or the repository-root lookup.
+
+
+# Subcommands that only query the database; they open it read-only so that
+# concurrent CI jobs never contend for the write lock.  ``serve`` answers
+# only the other read-only subcommands.
+READ_ONLY_COMMANDS = ("emit-warnings", "export", "check-compliance", "serve")
 
 
 def _git_env() -> Dict[str, str]:
@@ -55,9 +79,11 @@ def _git_env() -> Dict[str, str]:
 
 
 def _stage_memory_file() -> None:
+    from . import memory
+
     try:
         subprocess.run(
-            ["git", "-C", str(REPO_ROOT), "add", "--", ".codex/memory.json"],
+            ["git", "-C", str(memory.REPO_ROOT), "add", "--", ".codex/memory.json"],
             check=True,
             env=_git_env(),
         )
@@ -70,17 +96,30 @@ def _stage_memory_file() -> None:
         raise SystemExit(code) from exc
 
 
-def main(
-    argv: List[str] | None = None,
-    *,
-    storage_cls: Type[StorageProtocol] = Storage,
-    storage: StorageProtocol | None = None,
-) -> None:
-    """Entry point for the CLI."""
-    argv = argv or sys.argv[1:]
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for every subcommand."""
     parser = argparse.ArgumentParser(
         description="codex rules engine", allow_abbrev=False
     )
+    parser.add_argument(
+        "--storage",
+        choices=["sqlite", "memory"],
+        default="sqlite",
+        help="Storage backend; 'memory' keeps everything in-process",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="JSON file the memory backend is loaded from and saved to",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Write per-stage wall/CPU time, rows and peak RSS as JSON to FILE (default: stderr)",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     # record-pr
@@ -95,14 +134,14 @@ def main(
 
     # ingest-tests
     inj = sub.add_parser(
-        "ingest-tests", help="Ingest test results from JUnit XML or custom JSON"
+        "ingest-tests", help="Ingest test results from JUnit/TRX XML or JSON reports"
     )
     inj.add_argument(
         "--pr", required=True, type=int, dest="pr_id", help="PR identifier"
     )
     inj.add_argument(
         "--format",
-        choices=["junit", "pytest-json", "jest-json", "custom"],
+        choices=["auto", "junit", "pytest-json", "jest-json", "trx", "custom"],
         default="junit",
         help="Input format",
     )
@@ -121,6 +160,18 @@ def main(
         default="",
         help="Unique run identifier (optional)",
     )
+    inj.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Rows per batched insert (overrides config.storage.chunk_size)",
+    )
+    inj.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse result files in N worker processes (default: 1)",
+    )
 
     # analyze
     ana = sub.add_parser(
@@ -133,6 +184,11 @@ def main(
         default=None,
         help="Lookback window in days (overrides config)",
     )
+    ana.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only recompute pairs touched by data recorded since the last analyze",
+    )
 
     # update-docs
     upd = sub.add_parser(
@@ -218,20 +274,96 @@ def main(
         "--last-n",
         type=int,
         default=50,
-        help="Deactivate rules with fewer than this many recent PRs",
+        help="Deactivate rules with no failures among the N most recent PRs in the window",
+    )
+
+    # compact
+    cmp_ = sub.add_parser(
+        "compact",
+        help="Summarize and delete test events older than the retention horizon",
+    )
+    cmp_.add_argument(
+        "--retention-days",
+        type=int,
+        default=None,
+        help="Keep raw events this many days (overrides config.storage.retention_days)",
+    )
+    cmp_.add_argument(
+        "--window-days",
+        type=int,
+        default=None,
+        help="Analysis window the retention must cover (overrides config)",
+    )
+
+    # merge
+    mrg = sub.add_parser(
+        "merge", help="Combine the histories of several rules databases"
+    )
+    mrg.add_argument(
+        "--from",
+        dest="sources",
+        action="append",
+        required=True,
+        help="Source database (repeatable)",
+    )
+    mrg.add_argument(
+        "--into",
+        default=None,
+        help="Target database (default: config.storage.sqlite_path)",
     )
 
     # export
     exp = sub.add_parser(
-        "export", help="Export guidance or stats to JSON for debugging"
+        "export",
+        help="Export guidance, stats or the raw event history",
+        description=(
+            "--what events writes test events only; PR metadata and pass "
+            "summaries are not exported (use 'merge' to move whole histories)."
+        ),
     )
     exp.add_argument(
         "--what",
-        choices=["guidance", "stats"],
+        choices=["guidance", "stats", "events"],
         required=True,
         help="Which data to export",
     )
-    exp.add_argument("--out", required=True, help="Output JSON file")
+    exp.add_argument("--out", required=True, help="Output file")
+    exp.add_argument(
+        "--format",
+        choices=list(EVENT_FORMATS),
+        default=None,
+        help="Event file format (default: from the --out suffix, else ndjson)",
+    )
+    exp.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Events per streamed chunk (overrides config)",
+    )
+
+    # import
+    imp = sub.add_parser(
+        "import",
+        help="Import an event history written by 'export --what events'",
+        description=(
+            "Appends test events only. PR metadata and pass summaries are not "
+            "part of the file, so 'analyze' finds no component correlations for "
+            "imported PRs; use 'merge' to move whole histories."
+        ),
+    )
+    imp.add_argument("--path", required=True, help="Event file to import")
+    imp.add_argument(
+        "--format",
+        choices=list(EVENT_FORMATS),
+        default=None,
+        help="Event file format (default: from the file suffix, else ndjson)",
+    )
+    imp.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Events per insert batch (overrides config)",
+    )
 
     # check-compliance (explicit gate)
     gate = sub.add_parser(
@@ -275,6 +407,25 @@ def main(
         help="Optional author name for the entry",
     )
 
+    # serve (long-running daemon)
+    srv = sub.add_parser(
+        "serve",
+        help="Answer read-only subcommands over a local socket with warm state",
+    )
+    srv.add_argument(
+        "--address",
+        default=None,
+        help="Unix socket path or tcp://127.0.0.1:PORT, which requires the token the "
+        "daemon writes to .codex/cache/rules_engine.token (default: $CODEX_RULES_DAEMON "
+        "or .codex/cache/rules_engine.sock)",
+    )
+    srv.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=0,
+        help="Exit after this many seconds without a request (default: never)",
+    )
+
     # run-workflow
     run = sub.add_parser(
         "run-workflow",
@@ -291,7 +442,7 @@ def main(
     )
     run.add_argument(
         "--format",
-        choices=["junit", "pytest-json", "jest-json", "custom"],
+        choices=["auto", "junit", "pytest-json", "jest-json", "trx", "custom"],
         default="junit",
         help="Test results format",
     )
@@ -304,6 +455,18 @@ def main(
         "--commit", default="", help="Commit SHA for the test run (optional)"
     )
     run.add_argument("--run-id", default="", help="Unique run identifier (optional)")
+    run.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Rows per batched insert (overrides config.storage.chunk_size)",
+    )
+    run.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse result files in N worker processes (default: 1)",
+    )
     run.add_argument(
         "--manifest",
         default=None,
@@ -355,6 +518,11 @@ def main(
         "--update-docs", action="store_true", help="Rewrite AGENTS.md after analysis"
     )
     run.add_argument("--prune", action="store_true", help="Prune stale guidance rules")
+    run.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only recompute pairs touched by data recorded since the last analyze",
+    )
     run.add_argument(
         "--window-days",
         type=int,
@@ -371,16 +539,76 @@ def main(
         default=None,
         help="Optional author name for the memory entry",
     )
+    return parser
 
-    args = parser.parse_args(argv)
-    config = load_config()
+
+def apply_overrides(args: argparse.Namespace, config: Dict) -> None:
+    """Apply per-invocation CLI overrides to ``args`` and ``config``."""
     # Optionally override window_days on CLI
     if getattr(args, "window_days", None):
         config["window_days"] = args.window_days
-    db_path = config["storage"]["sqlite_path"]
-    storage_obj = storage or storage_cls(db_path)
-    mapping = ComponentMapping(config.get("components_file", ".codex/components.yml"))
+    if hasattr(args, "chunk_size") and args.chunk_size is None:
+        args.chunk_size = config["storage"].get("chunk_size", DEFAULT_CHUNK_SIZE)
+
+
+def main(
+    argv: List[str] | None = None,
+    *,
+    storage_cls: Type[StorageProtocol] = Storage,
+    storage: StorageProtocol | None = None,
+) -> None:
+    """Entry point for the CLI."""
+    argv = argv or sys.argv[1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    config = load_config()
+    apply_overrides(args, config)
+    if args.snapshot and args.storage != "memory":
+        parser.error("--snapshot requires --storage memory")
+    if args.command == "merge" and args.into:
+        config["storage"]["sqlite_path"] = args.into
+    read_only = args.command in READ_ONLY_COMMANDS
+    if args.storage == "memory":
+        storage_cls = InMemoryStorage
+    profiler = Profiler() if args.profile else contextlib.nullcontext()
+    try:
+        with profiler:
+            with span("open-storage"):
+                storage_obj = storage or _open_storage(storage_cls, config, read_only=read_only)
+                if args.snapshot and Path(args.snapshot).exists():
+                    storage_obj.load_snapshot(args.snapshot)
+            mapping = ComponentMapping(config.get("components_file", ".codex/components.yml"))
 
+            try:
+                _dispatch(parser, args, storage_obj, mapping, config)
+                if args.snapshot and not read_only:
+                    with span("save-snapshot"):
+                        storage_obj.save_snapshot(args.snapshot)
+            finally:
+                if storage is None and hasattr(storage_obj, "close"):
+                    storage_obj.close()
+    finally:
+        if args.profile:
+            _write_profile(profiler, args.command, args.profile)
+
+
+def _write_profile(profiler: Profiler, command: str, target: str) -> None:
+    """Write the profile summary as JSON to ``target`` (``-``: stderr)."""
+    text = json.dumps({"command": command, **profiler.summary()}, indent=2)
+    if target == "-":
+        print(text, file=sys.stderr)
+    else:
+        Path(target).write_text(text + "\n", encoding="utf-8")
+
+
+def _dispatch(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    storage_obj: StorageProtocol,
+    mapping: ComponentMapping,
+    config: Dict,
+) -> None:
+    """Run the subcommand selected by ``args.command``."""
     if args.command == "record-pr":
         record_pr(args, storage_obj, mapping)
     elif args.command == "ingest-tests":
@@ -396,51 +624,27 @@ def main(
                 file=sys.stderr,
             )
             sys.exit(2)
-        emit_warnings(args, storage_obj, config)
+        evaluation = emit_warnings(args, storage_obj, config)
         if args.record_telemetry:
-            components = storage_obj.get_components_for_pr(args.pr_id)
-            guidance = storage_obj.get_active_guidance_by_component(components)
-            required = sorted({g["command"] for g in guidance})
-            checks_skipped: List[str] = []
-            if args.manifest:
-                executed = load_exec_manifest(args.manifest)
-                ok, missing = check_compliance(
-                    required, executed, mode="any" if args.require_any else "all"
-                )
-                if not ok:
-                    checks_skipped = missing
-            entry = {
-                "pr_id": args.pr_id,
-                "modules_inspected": components,
-                "checks_skipped": checks_skipped,
-            }
-            if args.ci_log_paths:
-                entry["ci_log_paths"] = args.ci_log_paths
-            if args.failing_tests:
-                entry["failing_tests"] = args.failing_tests
-            try:
-                record_telemetry_entry(
-                    entry,
-                    agent_feedback=args.agent_feedback,
-                    srs_ids=args.srs_ids,
-                )
-                subprocess.run(
-                    ["git", "add", ".codex/telemetry.json", "telemetry/summary.json"],
-                    check=False,
-                )
-            except Exception as exc:
-                print(
-                    f"[codex-rules] Error recording telemetry for PR {args.pr_id}: {exc}",
-                    file=sys.stderr,
-                )
+            _record_pr_telemetry(args, evaluation)
     elif args.command == "prune":
         prune(args, storage_obj, config)
+    elif args.command == "compact":
+        compact(args, storage_obj, config)
+    elif args.command == "merge":
+        merge(args, storage_obj)
     elif args.command == "export":
         export_data(args, storage_obj)
+    elif args.command == "import":
+        import_events(args, storage_obj)
     elif args.command == "check-compliance":
         gate_compliance(args, storage_obj, config)
     elif args.command == "run-workflow":
         run_workflow(args, storage_obj, mapping, config)
+    elif args.command == "serve":
+        from .daemon import serve
+
+        serve(args, storage_obj, mapping, config)
     elif args.command == "memory":
         if args.memory_cmd == "read":
             memory_read(args, config)
@@ -452,6 +656,20 @@ def main(
         parser.error(f"Unknown command {args.command!r}")
 
 
+def _open_storage(
+    storage_cls: Type[StorageProtocol], config: Dict, *, read_only: bool = False
+) -> StorageProtocol:
+    """Instantiate the storage backend described by ``config["storage"]``."""
+    storage_cfg = config["storage"]
+    return storage_cls(
+        storage_cfg["sqlite_path"],
+        event_mode=storage_cfg.get("event_mode", "all"),
+        read_only=read_only,
+        pragmas=storage_cfg.get("pragmas"),
+    )
+
+
+@profiled("run-workflow")
 def run_workflow(
     args: argparse.Namespace,
     storage: StorageProtocol | Type[StorageProtocol],
@@ -466,7 +684,7 @@ def run_workflow(
         )
         sys.exit(2)
     if isinstance(storage, type):
-        storage = storage(config["storage"]["sqlite_path"])
+        storage = _open_storage(storage, config)
     pr_id = args.pr_id
     if pr_id is None:
         for env in ("PR_NUMBER", "CI_PR_NUMBER", "GITHUB_PR_NUMBER"):
@@ -486,27 +704,31 @@ def run_workflow(
         with open(args.files_json, "r", encoding="utf-8") as f:
             files = json.load(f)
     else:
-        diff_base = args.diff_base
-        out = subprocess.check_output(
-            ["git", "diff", "--name-status", diff_base], text=True
-        )
-        files = []
-        status_map = {"A": "added", "M": "modified", "D": "deleted"}
-        for line in out.strip().splitlines():
-            if not line.strip():
-                continue
-            status, path = line.split("\t", 1)
-            kind = status_map.get(status)
-            if kind:
-                files.append({"path": path, "status": kind})
+        with span("git-diff") as sp:
+            diff_base = args.diff_base
+            out = subprocess.check_output(
+                ["git", "diff", "--name-status", diff_base], text=True
+            )
+            files = []
+            status_map = {"A": "added", "M": "modified", "D": "deleted"}
+            for line in out.strip().splitlines():
+                if not line.strip():
+                    continue
+                status, path = line.split("\t", 1)
+                kind = status_map.get(status)
+                if kind:
+                    files.append({"path": path, "status": kind})
+            sp.rows = len(files)
 
-    file_records = []
-    for fobj in files:
-        path = fobj.get("path")
-        status = fobj.get("status", "")
-        comp = mapping.component_for_path(path)
-        file_records.append({"path": path, "status": status, "component": comp})
-    storage.record_pr(pr_id=pr_id, branch="", base="", labels=[], files=file_records)
+    with span("record-pr") as sp:
+        file_records = []
+        for fobj in files:
+            path = fobj.get("path")
+            status = fobj.get("status", "")
+            comp = mapping.component_for_path(path)
+            file_records.append({"path": path, "status": status, "component": comp})
+        storage.record_pr(pr_id=pr_id, branch="", base="", labels=[], files=file_records)
+        sp.rows = len(file_records)
 
     inj_args = argparse.Namespace(
         pr_id=pr_id,
@@ -514,10 +736,14 @@ def run_workflow(
         path=args.results_path,
         commit=args.commit or "",
         run_id=args.run_id or "",
+        chunk_size=getattr(args, "chunk_size", None),
+        jobs=getattr(args, "jobs", 1),
     )
     ingest_tests(inj_args, storage, mapping)
 
-    ana_args = argparse.Namespace(window_days=args.window_days)
+    ana_args = argparse.Namespace(
+        window_days=args.window_days, incremental=getattr(args, "incremental", False)
+    )
     analyze(ana_args, storage, config)
 
     upd_args = argparse.Namespace(file=None)
@@ -537,47 +763,18 @@ def run_workflow(
         require_any=args.require_any,
         fail_on_violation=args.fail_on_violation,
     )
-    emit_warnings(warn_args, storage, config)
-
-    components = storage.get_components_for_pr(pr_id)
+    # One lookup (and at most one manifest read) serves warnings, the
+    # compliance verdict and telemetry.
+    with span("evaluate-pr"):
+        evaluation = evaluate_pr(storage, pr_id, _manifest_path(args, config), args.require_any)
+    emit_warnings(warn_args, storage, config, evaluation)
     if args.record_telemetry:
-        guidance = storage.get_active_guidance_by_component(components)
-        required = sorted({g["command"] for g in guidance})
-        checks_skipped: List[str] = []
-        if args.manifest:
-            executed = load_exec_manifest(args.manifest)
-            ok, missing = check_compliance(
-                required, executed, mode="any" if args.require_any else "all"
-            )
-            if not ok:
-                checks_skipped = missing
-        entry = {
-            "pr_id": pr_id,
-            "modules_inspected": components,
-            "checks_skipped": checks_skipped,
-        }
-        if args.ci_log_paths:
-            entry["ci_log_paths"] = args.ci_log_paths
-        if args.failing_tests:
-            entry["failing_tests"] = args.failing_tests
-        try:
-            record_telemetry_entry(
-                entry,
-                agent_feedback=args.agent_feedback,
-                srs_ids=args.srs_ids,
-            )
-            subprocess.run(
-                ["git", "add", ".codex/telemetry.json", "telemetry/summary.json"],
-                check=False,
-            )
-        except Exception as exc:
-            print(
-                f"[codex-rules] Error recording telemetry for PR {pr_id} (run-workflow): {exc}",
-                file=sys.stderr,
-            )
+        _record_pr_telemetry(args, evaluation, " (run-workflow)")
 
     # If a memory summary is provided, append it to memory and stage the file for commit
     if getattr(args, "memory_summary", None):
+        from .memory import append_entry as memory_append_entry
+
         entry = {"summary": args.memory_summary}
         if getattr(args, "memory_author", None):
             entry["author"] = args.memory_author
@@ -592,6 +789,7 @@ def run_workflow(
         _stage_memory_file()
 
 
+@profiled("record-pr")
 def record_pr(
     args: argparse.Namespace, storage: StorageProtocol, mapping: ComponentMapping
 ) -> None:
@@ -615,54 +813,188 @@ def record_pr(
         labels=labels,
         files=file_records,
     )
+    add_rows(len(file_records))
+
+
+def _read_events(fmt: str, path: str) -> Iterable[Dict]:
+    """Return the parsed test records of one result file."""
+    if fmt == "junit":
+        from .ingest.junit import iter_junit
+
+        return iter_junit(path)
+    if fmt == "pytest-json":
+        from .ingest.pytest_json import iter_pytest_json
 
+        return iter_pytest_json(path)
+    if fmt == "jest-json":
+        from .ingest.jest_json import iter_jest_json
 
+        return iter_jest_json(path)
+    if fmt == "trx":
+        from .ingest.trx import iter_trx
+
+        return iter_trx(path)
+    if fmt == "custom":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    raise ValueError(f"Unsupported format {fmt}")
+
+
+# Files submitted to each ``--jobs`` worker ahead of the writer.
+FILES_IN_FLIGHT_PER_WORKER = 2
+
+
+def _parse_file(job: Tuple[str, str]) -> Tuple[List[Dict], float]:
+    """Worker entry point: parse one file, returning events and elapsed ms."""
+    fmt, path = job
+    start = time.perf_counter()
+    events = list(_read_events(fmt, path))
+    return events, (time.perf_counter() - start) * 1000
+
+
+@profiled("ingest-tests")
 def ingest_tests(
     args: argparse.Namespace, storage: StorageProtocol, mapping: ComponentMapping
 ) -> None:
-    """Ingest test results for a PR and record failing events."""
+    """Ingest test results for a PR and record failing events.
+
+    Events from every matching file are streamed lazily (JUnit reports are
+    parsed incrementally) and written through ``storage.record_test_events``
+    in batches, so the whole ingest is one transaction.
+
+    With ``--jobs N`` (N > 1) files are parsed in a process pool while this
+    process remains the only SQLite writer.  Results are consumed in sorted
+    file order regardless of which worker finishes first, so the stored
+    event order is deterministic, and each file's parse time is reported on
+    stderr.  Only ``FILES_IN_FLIGHT_PER_WORKER`` files per worker are queued
+    ahead of the file being written, so memory stays bounded by a few files'
+    events rather than the whole glob.
+
+    ``--format auto`` sniffs each file (see :mod:`codex_rules.ingest.detect`),
+    so one invocation can ingest a glob of mixed report types.  Files whose
+    format cannot be identified are listed on stderr and skipped.
+
+    Backends with ``ingested_hashes`` remember the SHA-256 of every file
+    ingested for a PR; files seen before for the same PR are skipped without
+    being parsed, so re-running an ingest for a CI run only costs hashing.
+    """
     pr_id = args.pr_id
     run_id = args.run_id or f"run-{datetime.now(timezone.utc).isoformat()}"
     commit_sha = args.commit or ""
+    chunk_size = getattr(args, "chunk_size", None) or DEFAULT_CHUNK_SIZE
+    jobs = getattr(args, "jobs", 1) or 1
     # Expand glob for result files
-    files = glob(args.path)
+    files = sorted(glob(args.path))
     if not files:
         print(f"No files match {args.path!r}", file=sys.stderr)
         return
-    for fpath in files:
-        if args.format == "junit":
-            events = parse_junit(fpath)
-        elif args.format == "pytest-json":
-            events = parse_pytest_json(fpath)
-        elif args.format == "jest-json":
-            events = parse_jest_json(fpath)
-        elif args.format == "custom":
-            with open(fpath, "r", encoding="utf-8") as f:
-                events = json.load(f)
-        else:
-            raise ValueError(f"Unsupported format {args.format}")
-        for evt in events:
+    hashes: Dict[str, str] = {}
+    if hasattr(storage, "ingested_hashes"):
+        hashes = {f: _file_sha256(f) for f in files}
+        seen = storage.ingested_hashes(pr_id, hashes.values())
+        if seen:
+            skipped = [f for f in files if hashes[f] in seen]
+            print(
+                f"[codex-rules] Skipping {len(skipped)} already-ingested file(s): "
+                + ", ".join(skipped),
+                file=sys.stderr,
+            )
+            files = [f for f in files if hashes[f] not in seen]
+    if args.format == "auto":
+        from .ingest.detect import sniff_format
+
+        detected = [(sniff_format(f), f) for f in files]
+        unknown = [f for fmt, f in detected if fmt is None]
+        if unknown:
+            print(
+                f"[codex-rules] Skipping {len(unknown)} file(s) of unrecognised format: "
+                + ", ".join(unknown),
+                file=sys.stderr,
+            )
+        sources = [(fmt, f) for fmt, f in detected if fmt is not None]
+        files = [f for _, f in sources]
+    else:
+        sources = [(args.format, f) for f in files]
+
+    def parsed() -> Iterable[Dict]:
+        if jobs <= 1 or len(files) <= 1:
+            for fmt, fpath in sources:
+                yield from _read_events(fmt, fpath)
+            return
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(jobs, len(files))
+        queue = iter(sources)
+        pending: deque = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+
+            def submit() -> None:
+                job = next(queue, None)
+                if job is not None:
+                    pending.append((job[1], pool.submit(_parse_file, job)))
+
+            for _ in range(workers * FILES_IN_FLIGHT_PER_WORKER):
+                submit()
+            while pending:
+                fpath, future = pending.popleft()
+                events, elapsed_ms = future.result()
+                submit()
+                print(
+                    f"[codex-rules] Parsed {fpath}: {len(events)} events in {elapsed_ms:.1f} ms",
+                    file=sys.stderr,
+                )
+                yield from events
+                del events
+
+    def records() -> Iterable[Dict]:
+        for evt in parsed():
             # Determine component based on file hint or fallback to 'unknown'
             hint = evt.get("file")
             comp = "unknown"
             if hint:
                 comp = mapping.component_for_path(hint)
-            storage.record_test_event(
-                run_id=run_id,
-                pr_id=pr_id,
-                commit_sha=commit_sha,
-                test_id=evt.get("test_id"),
-                suite=evt.get("suite"),
-                status=evt.get("status"),
-                duration_ms=evt.get("duration_ms", 0),
-                component=comp,
-                file_hint=hint or "",
-                ts=datetime.now(timezone.utc).isoformat(),
-            )
+            yield {
+                "run_id": run_id,
+                "pr_id": pr_id,
+                "commit_sha": commit_sha,
+                "test_id": evt.get("test_id"),
+                "suite": evt.get("suite"),
+                "status": evt.get("status"),
+                "duration_ms": evt.get("duration_ms", 0),
+                "component": comp,
+                "file_hint": hint or "",
+                "ts": datetime.now(timezone.utc).isoformat(),
+            }
 
+    add_rows(storage.record_test_events(records(), chunk_size=chunk_size) or 0)
+    if hashes:
+        storage.record_ingested_files(
+            {"sha256": hashes[f], "path": f, "pr_id": pr_id, "run_id": run_id} for f in files
+        )
 
+
+def _file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file, read in 1 MiB blocks."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@profiled("analyze")
 def analyze(args: argparse.Namespace, storage: StorageProtocol, config: Dict) -> None:
-    """Compute component/test correlations and update guidance table."""
+    """Compute component/test correlations and update guidance table.
+
+    Backends with ``analysis_snapshot`` record a high-water mark after each
+    run; ``--incremental`` then recomputes only the pairs touched since.
+    """
+    from .correlate import compute_candidates
+    from .guidance import create_guidance_entries
+
     # Retrieve thresholds from config
     thresh = {
         "min_occurrences": config.get("min_occurrences", 3),
@@ -673,7 +1005,20 @@ def analyze(args: argparse.Namespace, storage: StorageProtocol, config: Dict) ->
         "min_lift_for_flaky": config.get("min_lift_for_flaky", 3.0),
         "window_days": config.get("window_days", 30),
     }
-    candidates = compute_candidates(storage, thresh)
+    snapshot = None
+    if hasattr(storage, "analysis_snapshot"):
+        snapshot = storage.analysis_snapshot(
+            thresh["window_days"], incremental=getattr(args, "incremental", False)
+        )
+        if not snapshot["full"]:
+            print(
+                f"[codex-rules] Incremental analyze: recomputed {len(snapshot['recomputed'])} "
+                f"of {len(snapshot['tables'])} pairs",
+                file=sys.stderr,
+            )
+        candidates = compute_candidates(storage, thresh, tables=snapshot["tables"])
+    else:
+        candidates = compute_candidates(storage, thresh)
     # Load templates and commands from configuration
     tpl_path = config.get("templates_file", ".codex/guidance_templates.yml")
     if Path(tpl_path).suffix.lower() == ".json":
@@ -689,47 +1034,113 @@ def analyze(args: argparse.Namespace, storage: StorageProtocol, config: Dict) ->
     # Upsert guidance into storage
     for rule in guidance:
         storage.upsert_guidance(rule)
+    add_rows(len(guidance))
+    if snapshot is not None:
+        storage.save_analysis(snapshot)
+    _refresh_pr_guidance(storage, {rule["component"] for rule in guidance})
+
 
+def _refresh_pr_guidance(storage: StorageProtocol, components: Iterable[str]) -> None:
+    """Rebuild the per-PR guidance of PRs touching ``components``."""
+    components = set(components)
+    if components and hasattr(storage, "refresh_pr_guidance"):
+        storage.refresh_pr_guidance(storage.get_prs_for_components(components))
 
+
+@profiled("update-docs")
 def update_docs(
     args: argparse.Namespace, storage: StorageProtocol, config: Dict
 ) -> None:
     """Rewrite the AGENTS.md file with the current guidance rules."""
+    from .guidance import update_agents_md
+
     doc_file = args.file or config["docs"]["file"]
     # Read active guidance from storage
     guidance = storage.get_active_guidance()
     section_title = config["docs"].get("section_title", "Preventative Measures")
     update_agents_md(doc_file, guidance, section_title)
+    add_rows(len(guidance))
+
 
+def _manifest_path(args: argparse.Namespace, config: Dict) -> str | None:
+    return args.manifest or (config.get("compliance", {}) or {}).get("manifest_path")
 
+
+def evaluate_pr(
+    storage: StorageProtocol,
+    pr_id: int,
+    manifest_path: str | None = None,
+    require_any: bool = False,
+) -> Dict:
+    """Answer every per-PR question the warning/compliance paths ask.
+
+    Returns the PR's components and active guidance (one ``pr_guidance``
+    lookup when the backend materializes it), the required commands and, if
+    a manifest is given and guidance applies, the compliance verdict.  The
+    manifest is read at most once.
+    """
+    if hasattr(storage, "get_pr_guidance"):
+        answer = storage.get_pr_guidance(pr_id)
+    else:
+        components = storage.get_components_for_pr(pr_id)
+        answer = {
+            "components": components,
+            "guidance": storage.get_active_guidance_by_component(components),
+        }
+    required = sorted({g["command"] for g in answer["guidance"]})
+    ok, missing, checked = True, [], False
+    if manifest_path and answer["guidance"]:
+        from .compliance import check as check_compliance, load_manifest as load_exec_manifest
+
+        executed = load_exec_manifest(manifest_path)
+        ok, missing = check_compliance(
+            required, executed, mode="any" if require_any else "all"
+        )
+        checked = True
+    return {
+        "pr_id": pr_id,
+        "components": answer["components"],
+        "guidance": answer["guidance"],
+        "required": required,
+        "manifest_path": manifest_path,
+        "checked": checked,
+        "compliant": ok,
+        "missing": missing,
+    }
+
+
+@profiled("emit-warnings")
 def emit_warnings(
-    args: argparse.Namespace, storage: StorageProtocol, config: Dict
-) -> None:
-    """Emit preventative guidance warnings for a given PR."""
-    pr_id = args.pr_id
-    # Lookup components touched by this PR
-    components = storage.get_components_for_pr(pr_id)
-    guidance = storage.get_active_guidance_by_component(components)
+    args: argparse.Namespace,
+    storage: StorageProtocol,
+    config: Dict,
+    evaluation: Dict | None = None,
+) -> Dict:
+    """Emit preventative guidance warnings for a given PR.
+
+    Returns the :func:`evaluate_pr` result so callers can reuse it.
+    """
+    if evaluation is None:
+        evaluation = evaluate_pr(
+            storage, args.pr_id, _manifest_path(args, config), args.require_any
+        )
+    guidance = evaluation["guidance"]
+    add_rows(len(guidance))
     if not guidance:
-        return
-    messages = build_warnings(components, guidance)
+        return evaluation
+    from .warnings import build_warnings
+
+    messages = build_warnings(evaluation["components"], guidance)
     if args.stdout:
         for line in messages:
             sys.stdout.write(line + "\n")
     # Optional compliance gate using manifest
-    manifest_path = args.manifest or (config.get("compliance", {}) or {}).get(
-        "manifest_path"
-    )
-    if manifest_path:
-        executed = load_exec_manifest(manifest_path)
-        required = sorted({g["command"] for g in guidance})
-        mode = "any" if args.require_any else "all"
-        ok, missing = check_compliance(required, executed, mode=mode)
-        if not ok:
+    if evaluation["checked"]:
+        if not evaluation["compliant"]:
             sys.stdout.write(
                 "[codex-rules] Compliance violation: missing required pre‑emptive commands:\n"
             )
-            for m in missing:
+            for m in evaluation["missing"]:
                 sys.stdout.write(f"  - {m}\n")
             if args.fail_on_violation:
                 sys.exit(2)
@@ -738,13 +1149,97 @@ def emit_warnings(
                 "[codex-rules] Compliance OK (pre‑emptive commands satisfied).\n"
             )
     # If provider posting is desired, wire it here in a future revision.
+    return evaluation
+
 
+def _record_pr_telemetry(
+    args: argparse.Namespace, evaluation: Dict, source: str = ""
+) -> None:
+    """Append the telemetry entry for a PR check and stage the files."""
+    from .telemetry import record_telemetry_entry
 
+    pr_id = evaluation["pr_id"]
+    checks_skipped: List[str] = []
+    if args.manifest and not evaluation["compliant"]:
+        checks_skipped = evaluation["missing"]
+    entry = {
+        "pr_id": pr_id,
+        "modules_inspected": evaluation["components"],
+        "checks_skipped": checks_skipped,
+    }
+    if args.ci_log_paths:
+        entry["ci_log_paths"] = args.ci_log_paths
+    if args.failing_tests:
+        entry["failing_tests"] = args.failing_tests
+    profiler = active_profiler()
+    if profiler is not None:
+        entry["profile"] = profiler.summary()
+    try:
+        record_telemetry_entry(
+            entry,
+            agent_feedback=args.agent_feedback,
+            srs_ids=args.srs_ids,
+        )
+        subprocess.run(
+            ["git", "add", ".codex/telemetry.json", "telemetry/summary.json"],
+            check=False,
+        )
+    except Exception as exc:
+        print(
+            f"[codex-rules] Error recording telemetry for PR {pr_id}{source}: {exc}",
+            file=sys.stderr,
+        )
+
+
+@profiled("prune")
 def prune(args: argparse.Namespace, storage: StorageProtocol, config: Dict) -> None:
     """Mark stale guidance rules as inactive."""
     window_days = args.window_days or config.get("window_days", 30)
     last_n = args.last_n
-    storage.prune_guidance(window_days, last_n)
+    _refresh_pr_guidance(storage, storage.prune_guidance(window_days, last_n))
+
+
+def compact(args: argparse.Namespace, storage: StorageProtocol, config: Dict) -> None:
+    """Roll old test events into daily summaries and vacuum the database."""
+    if not hasattr(storage, "compact"):
+        print("[codex-rules] Storage backend does not support compaction", file=sys.stderr)
+        sys.exit(2)
+    window_days = config.get("window_days", 30)
+    retention_days = args.retention_days or config["storage"].get(
+        "retention_days", DEFAULT_RETENTION_DAYS
+    )
+    if retention_days < window_days:
+        print(
+            f"[codex-rules] Retention of {retention_days} days is shorter than the "
+            f"{window_days}-day analysis window",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    result = storage.compact(retention_days)
+    print(
+        f"[codex-rules] Compacted events before {result['cutoff']}: "
+        f"{result['events_deleted']} deleted, {result['summary_rows']} summary rows, "
+        f"{result['pages_freed']} pages freed",
+        file=sys.stderr,
+    )
+
+
+def merge(args: argparse.Namespace, storage: StorageProtocol) -> None:
+    """Merge the event history of ``--from`` databases into the store."""
+    if not hasattr(storage, "merge_from"):
+        print("[codex-rules] Storage backend does not support merging", file=sys.stderr)
+        sys.exit(2)
+    try:
+        result = storage.merge_from(args.sources)
+    except (FileNotFoundError, ValueError) as exc:
+        print(f"[codex-rules] {exc}", file=sys.stderr)
+        sys.exit(2)
+    print(
+        f"[codex-rules] Merged {result['sources']} databases: "
+        f"{result['events_added']} events added, {result['events_skipped']} duplicates skipped, "
+        f"{result['prs_added']} new PRs; run 'analyze' to refresh guidance",
+        file=sys.stderr,
+    )
 
 
 def memory_read(args: argparse.Namespace, config: Dict) -> None:
@@ -787,7 +1282,22 @@ def memory_append(args: argparse.Namespace, config: Dict) -> None:
 
 
 def export_data(args: argparse.Namespace, storage: StorageProtocol) -> None:
-    """Export guidance or stats to a JSON file."""
+    """Export guidance or stats to a JSON file, or stream the event history.
+
+    ``--what events`` writes the stored events chunk by chunk in the format
+    chosen by ``--format`` (see :mod:`codex_rules.exchange`).  PR metadata
+    and pass summaries are not included.
+    """
+    if args.what == "events":
+        fmt = args.format or format_for_path(args.out)
+        chunk_size = getattr(args, "chunk_size", None) or DEFAULT_CHUNK_SIZE
+        try:
+            written = write_events(storage.iter_events(chunk_size), args.out, fmt)
+        except ImportError as exc:
+            print(f"[codex-rules] {exc}", file=sys.stderr)
+            sys.exit(2)
+        print(f"[codex-rules] Exported {written} events to {args.out}", file=sys.stderr)
+        return
     if args.what == "guidance":
         data = storage.get_active_guidance()
     elif args.what == "stats":
@@ -798,34 +1308,46 @@ def export_data(args: argparse.Namespace, storage: StorageProtocol) -> None:
         json.dump(data, f, indent=2)
 
 
+def import_events(args: argparse.Namespace, storage: StorageProtocol) -> None:
+    """Append the events of an exported history file to the store.
+
+    Rows are streamed from the file straight into
+    ``storage.record_test_events``, so the import is one transaction.  The
+    PRs' changed files are not in the file, so imported PRs contribute no
+    component/test pairs until they are recorded with ``record-pr``.
+    """
+    fmt = args.format or format_for_path(args.path)
+    chunk_size = getattr(args, "chunk_size", None) or DEFAULT_CHUNK_SIZE
+    try:
+        imported = storage.record_test_events(
+            iter_events(args.path, fmt, chunk_size=chunk_size), chunk_size=chunk_size
+        )
+    except ImportError as exc:
+        print(f"[codex-rules] {exc}", file=sys.stderr)
+        sys.exit(2)
+    print(f"[codex-rules] Imported {imported} events from {args.path}", file=sys.stderr)
+
+
 def gate_compliance(
     args: argparse.Namespace, storage: StorageProtocol, config: Dict
 ) -> None:
     """Explicit compliance gate: fails if required commands missing."""
-    pr_id = args.pr_id
-    components = storage.get_components_for_pr(pr_id)
-    guidance = storage.get_active_guidance_by_component(components)
-    if not guidance:
+    manifest_path = _manifest_path(args, config)
+    evaluation = evaluate_pr(storage, args.pr_id, manifest_path, args.require_any)
+    if not evaluation["guidance"]:
         print("[codex-rules] No active guidance for this PR; nothing to check.")
         return
-    manifest_path = args.manifest or (config.get("compliance", {}) or {}).get(
-        "manifest_path"
-    )
     if not manifest_path:
         print(
             "[codex-rules] No manifest path provided or configured; cannot check compliance.",
             file=sys.stderr,
         )
         sys.exit(2)
-    executed = load_exec_manifest(manifest_path)
-    required = sorted({g["command"] for g in guidance})
-    mode = "any" if args.require_any else "all"
-    ok, missing = check_compliance(required, executed, mode=mode)
-    if not ok:
+    if not evaluation["compliant"]:
         print(
             "[codex-rules] Compliance violation: missing required pre‑emptive commands:"
         )
-        for m in missing:
+        for m in evaluation["missing"]:
             print(f"  - {m}")
         sys.exit(2)
     print("[codex-rules] Compliance OK (pre‑emptive commands satisfied).")
@@ -0,0 +1,148 @@
+"""Thin client for the ``codex_rules serve`` daemon.
+
+``python -m codex_rules.client <subcommand> [args...]`` takes the same
+arguments as ``python -m codex_rules``.  The request is sent to the daemon
+at ``$CODEX_RULES_DAEMON`` (default: ``.codex/cache/rules_engine.sock``)
+and its output replayed locally.  When no daemon answers within
+:data:`RESPONSE_TIMEOUT`, or the daemon declines the subcommand (it only
+serves a few read-only ones), the command runs in-process instead, so hooks
+can always call the client.
+
+Each connection carries one request: a JSON line in each direction::
+
+    -> {"argv": ["emit-warnings", "--pr", "5"], "cwd": "/repo"}
+    <- {"exit_code": 0, "stdout": "...", "stderr": ""}
+
+``{"op": "ping"}`` and ``{"op": "shutdown"}`` are also understood; a
+response of ``{"fallback": true}`` asks the client to run the command
+itself.  Unix sockets are protected by their file mode.  Any local user can
+reach a loopback TCP port, so over TCP every request also carries the
+daemon's secret from :data:`TOKEN_FILE` (``"token": "..."``).
+
+This module only imports the standard library pieces it needs, so calling
+the daemon costs little more than starting the interpreter.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from typing import Dict, List, Tuple
+
+ADDRESS_ENV = "CODEX_RULES_DAEMON"
+DEFAULT_ADDRESS = ".codex/cache/rules_engine.sock"
+TCP_PREFIX = "tcp://"
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost")
+# Written by a TCP daemon with owner-only permissions; clients send it back.
+TOKEN_FILE = ".codex/cache/rules_engine.token"
+
+# Seconds to wait for the daemon to accept a connection before falling back.
+CONNECT_TIMEOUT = 0.5
+# Seconds to wait for its answer (e.g. while it serves a stalled client).
+RESPONSE_TIMEOUT = 10.0
+
+
+def resolve_address(address: str | None = None) -> str:
+    """Return ``address``, else ``$CODEX_RULES_DAEMON``, else the default.
+
+    Platforms without Unix sockets default to ``tcp://127.0.0.1:8765``.
+    """
+    if address:
+        return address
+    if os.environ.get(ADDRESS_ENV):
+        return os.environ[ADDRESS_ENV]
+    return DEFAULT_ADDRESS if hasattr(socket, "AF_UNIX") else f"{TCP_PREFIX}127.0.0.1:8765"
+
+
+def parse_address(address: str) -> Tuple[str, object]:
+    """Split ``address`` into ``("unix", path)`` or ``("tcp", (host, port))``.
+
+    TCP addresses must name a loopback host: the daemon's token only keeps
+    out other local users and must never be exposed on a public interface.
+    """
+    if address.startswith(TCP_PREFIX):
+        host, sep, port = address[len(TCP_PREFIX) :].rpartition(":")
+        if not sep or not port.isdigit():
+            raise ValueError(f"Invalid daemon address {address!r}; expected tcp://HOST:PORT")
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"Daemon address {address!r} is not a loopback host")
+        return "tcp", (host, int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("Unix sockets are not available here; use tcp://127.0.0.1:PORT")
+    return "unix", address
+
+
+def connect(address: str | None = None, timeout: float = CONNECT_TIMEOUT) -> socket.socket:
+    """Open a connection to the daemon; raise ``OSError`` if none answers."""
+    kind, target = parse_address(resolve_address(address))
+    if kind == "tcp":
+        sock = socket.create_connection(target, timeout=timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(target)
+        except OSError:
+            sock.close()
+            raise
+    sock.settimeout(RESPONSE_TIMEOUT)
+    return sock
+
+
+def read_token(path: str = TOKEN_FILE) -> str:
+    """Return the TCP daemon's token; raise ``OSError`` if it is unreadable."""
+    with open(path, encoding="utf-8") as fh:
+        return fh.read().strip()
+
+
+def request(payload: Dict, address: str | None = None) -> Dict:
+    """Send one request to the daemon and return its response.
+
+    Requests to a TCP daemon carry the token from :data:`TOKEN_FILE`.
+    """
+    address = resolve_address(address)
+    if parse_address(address)[0] == "tcp":
+        payload = {**payload, "token": read_token()}
+    with connect(address) as sock:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection without answering")
+    return json.loads(line)
+
+
+def _run_in_process(argv: List[str]) -> int:
+    """Run the CLI in this process and return its exit code."""
+    from .cli import main as cli_main
+
+    try:
+        cli_main(argv)
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    return 0
+
+
+def run(argv: List[str], address: str | None = None) -> int:
+    """Run ``argv`` through the daemon if one answers, else in-process."""
+    try:
+        response = request({"argv": list(argv), "cwd": os.getcwd()}, address)
+    except (OSError, ValueError):
+        return _run_in_process(argv)
+    if response.get("fallback"):
+        return _run_in_process(argv)
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("exit_code", 1))
+
+
+def main(argv: List[str] | None = None) -> int:
+    return run(sys.argv[1:] if argv is None else argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
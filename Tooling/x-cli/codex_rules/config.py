@@ -10,6 +10,8 @@ import json
 from pathlib import Path
 from typing import Dict
 
+from .storage import DEFAULT_CHUNK_SIZE, DEFAULT_PRAGMAS, DEFAULT_RETENTION_DAYS
+
 
 def load_config(path: str | None = None) -> Dict:
     """Load configuration from the given path or from `.codex/rules.yml`.
@@ -35,7 +37,15 @@ def load_config(path: str | None = None) -> Dict:
             "bot_email": "codex-bot@example.com",
         },
         "provider": {"type": "none"},
-        "storage": {"sqlite_path": ".codex/cache/rules_engine.sqlite"},
+        "storage": {
+            "sqlite_path": ".codex/cache/rules_engine.sqlite",
+            "chunk_size": DEFAULT_CHUNK_SIZE,
+            "retention_days": DEFAULT_RETENTION_DAYS,
+            # "all" or "failures_plus_summary" (passes stored as per-suite counts)
+            "event_mode": "all",
+            # Per-connection SQLite tuning (cache_size in KiB when negative)
+            "pragmas": dict(DEFAULT_PRAGMAS),
+        },
         "components_file": ".codex/components.yml",
         "templates_file": ".codex/guidance_templates.yml",
     }
@@ -8,12 +8,27 @@ the configuration filter out weak or flaky associations.
 from __future__ import annotations
 
 import math
-from typing import Dict, Iterable, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+try:  # Optional: vectorizes long tail sums
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    np = None
 
 from .storage import StorageProtocol
 
+# Tails shorter than this are summed in pure Python; NumPy call overhead
+# outweighs its benefit on a handful of terms.
+_NUMPY_MIN_TERMS = 64
+
 
-def compute_candidates(storage: StorageProtocol, thresh: Dict) -> List[Dict]:
+def compute_candidates(
+    storage: StorageProtocol,
+    thresh: Dict,
+    *,
+    tables: Mapping[Tuple[str, str], Tuple[int, int, int, int]] | None = None,
+) -> List[Dict]:
     """Return a list of candidate guidance rules that meet the thresholds.
 
     Each candidate is a dictionary with keys:
@@ -24,6 +39,11 @@ def compute_candidates(storage: StorageProtocol, thresh: Dict) -> List[Dict]:
       - baseline
       - lift
       - p_value
+
+    Precomputed ``tables`` (e.g. from an incremental analysis snapshot) are
+    used as-is.  Otherwise storage backends that expose
+    ``contingency_table(window_days)`` have all counts computed in bulk, and
+    the rest look up each pair from ``distinct_pairs`` via ``contingency``.
     """
     window_days = thresh.get("window_days", 30)
     min_occ = thresh.get("min_occurrences", 3)
@@ -33,9 +53,9 @@ def compute_candidates(storage: StorageProtocol, thresh: Dict) -> List[Dict]:
     flaky_threshold = thresh.get("flaky_threshold", 0.04)
     min_lift_flaky = thresh.get("min_lift_for_flaky", 3.0)
 
-    results: List[Dict] = []
-    for component, test_id in storage.distinct_pairs(window_days):
-        A, B, C, D = storage.contingency(component, test_id, window_days)
+    candidates: List[Dict] = []
+    pairs = tables.items() if tables is not None else _iter_tables(storage, window_days)
+    for (component, test_id), (A, B, C, D) in pairs:
         total_prs = A + B + C + D
         if total_prs == 0:
             continue
@@ -54,10 +74,7 @@ def compute_candidates(storage: StorageProtocol, thresh: Dict) -> List[Dict]:
             continue
         if lift < min_lift:
             continue
-        p_value = fisher_exact_right_tail(A, B, C, D)
-        if p_value > alpha:
-            continue
-        results.append(
+        candidates.append(
             {
                 "component": component,
                 "test_id": test_id,
@@ -65,12 +82,114 @@ def compute_candidates(storage: StorageProtocol, thresh: Dict) -> List[Dict]:
                 "confidence": confidence,
                 "baseline": baseline,
                 "lift": lift,
-                "p_value": p_value,
+                "table": (A, B, C, D),
             }
         )
+    # Significance is evaluated last, only for pairs that survived the cheap
+    # filters; identical tables hit the memoized p-value.
+    results: List[Dict] = []
+    for cand in candidates:
+        p_value = fisher_exact_right_tail(*cand.pop("table"))
+        if p_value > alpha:
+            continue
+        cand["p_value"] = p_value
+        results.append(cand)
     return results
 
 
+def _iter_tables(
+    storage: StorageProtocol, window_days: int
+) -> Iterable[Tuple[Tuple[str, str], Tuple[int, int, int, int]]]:
+    """Yield ``((component, test_id), (A, B, C, D))`` for the window."""
+    contingency_table = getattr(storage, "contingency_table", None)
+    if callable(contingency_table):
+        yield from contingency_table(window_days).items()
+        return
+    for component, test_id in storage.distinct_pairs(window_days):
+        yield (component, test_id), storage.contingency(component, test_id, window_days)
+
+
+_LN_SQRT_2PI = 0.5 * math.log(2 * math.pi)
+
+
+def _stirlerr(n: int) -> float:
+    """Return ``log(n!) - log(sqrt(2*pi*n) * (n/e)**n)``, Stirling's error."""
+    if n <= 15:
+        return math.lgamma(n + 1.0) - (n + 0.5) * math.log(n) + n - _LN_SQRT_2PI
+    nn = n * n
+    if n > 500:
+        return (1 / 12 - (1 / 360) / nn) / n
+    if n > 80:
+        return (1 / 12 - (1 / 360 - (1 / 1260) / nn) / nn) / n
+    if n > 35:
+        return (1 / 12 - (1 / 360 - (1 / 1260 - (1 / 1680) / nn) / nn) / nn) / n
+    return (1 / 12 - (1 / 360 - (1 / 1260 - (1 / 1680 - (1 / 1188) / nn) / nn) / nn) / nn) / n
+
+
+def _bd0(x: float, mean: float) -> float:
+    """Return ``x*log(x/mean) + mean - x`` without cancellation near the mean."""
+    if abs(x - mean) < 0.1 * (x + mean):
+        v = (x - mean) / (x + mean)
+        s = (x - mean) * v
+        ej = 2 * x * v
+        v *= v
+        j = 1
+        while True:
+            ej *= v
+            s_next = s + ej / (2 * j + 1)
+            if s_next == s:
+                return s
+            s = s_next
+            j += 1
+    return x * math.log(x / mean) + mean - x
+
+
+def _binom_pmf(x: int, n: int, p: float, q: float) -> float:
+    """Binomial P(X = x) by Loader's saddle-point expansion."""
+    if p == 0.0:
+        return 1.0 if x == 0 else 0.0
+    if q == 0.0:
+        return 1.0 if x == n else 0.0
+    if x == 0:
+        if n == 0:
+            return 1.0
+        return math.exp(-_bd0(n, n * q) - n * p if p < 0.1 else n * math.log(q))
+    if x == n:
+        return math.exp(-_bd0(n, n * p) - n * q if q < 0.1 else n * math.log(p))
+    lc = _stirlerr(n) - _stirlerr(x) - _stirlerr(n - x) - _bd0(x, n * p) - _bd0(n - x, n * q)
+    return math.exp(lc) / math.sqrt(2 * math.pi * x * (1 - x / n))
+
+
+def _hypergeom_pmf(x: int, row1: int, row2: int, col1: int) -> float:
+    """Return P(X = x) for the table's marginals, to a few ulps.
+
+    ``lgamma`` differences lose about ``n * eps`` to cancellation, more than
+    1e-12 once tables reach thousands of PRs.  Loader's expansion (the one
+    behind R's ``dhyper``) keeps the small deviance terms separate instead.
+    """
+    n = row1 + row2
+    p, q = col1 / n, (n - col1) / n
+    return (
+        _binom_pmf(x, row1, p, q)
+        * _binom_pmf(col1 - x, row2, p, q)
+        / _binom_pmf(col1, n, p, q)
+    )
+
+
+def _sum_decreasing(start: float, ratios: Sequence[float]) -> float:
+    """Return ``start * (1 + r0 + r0*r1 + ...)`` for ratios of successive terms."""
+    if np is not None and len(ratios) >= _NUMPY_MIN_TERMS:
+        return float(start * (1.0 + np.cumprod(np.asarray(ratios, dtype=float)).sum()))
+    total = term = start
+    for r in ratios:
+        term *= r
+        if term == 0.0:
+            break
+        total += term
+    return total
+
+
+@lru_cache(maxsize=65536)
 def fisher_exact_right_tail(a: int, b: int, c: int, d: int) -> float:
     """Compute the one‑sided Fisher exact test p‑value for a 2x2 table.
 
@@ -78,25 +197,40 @@ def fisher_exact_right_tail(a: int, b: int, c: int, d: int) -> float:
         | a  b |
         | c  d |
     This returns the right‑tail probability P(X ≥ a) given fixed marginals.
+
+    One hypergeometric term is evaluated with Loader's saddle-point
+    expansion (:func:`_hypergeom_pmf`); the rest follow from the ratio of
+    successive terms, so no big-integer binomials are built.  Summation
+    always starts at the term closest to the mode and walks away from it,
+    which keeps every term in floating-point range: tails at or beyond the
+    mode are summed directly, otherwise the complementary left tail is
+    subtracted from one.  Results are memoized
+    because many (component, test) pairs share identical tables.
     """
     # Compute marginal totals
     row1 = a + b
     row2 = c + d
     col1 = a + c
-    col2 = b + d
     n = row1 + row2
-
-    def hypergeom(x: int) -> float:
-        return (
-            math.comb(row1, x)
-            * math.comb(row2, col1 - x)
-            / math.comb(n, col1)
-        )
-
-    # Enumerate all possible values ≥ a that satisfy the marginals
     min_x = max(0, col1 - row2)
     max_x = min(row1, col1)
-    p = 0.0
-    for x in range(a, max_x + 1):
-        p += hypergeom(x)
-    return min(1.0, p)
+    if a <= min_x:
+        return 1.0
+
+    mode = (row1 + 1) * (col1 + 1) // (n + 2)
+    if a >= mode:
+        # P(X >= a): terms decrease from x = a upward
+        ratios = [
+            (row1 - x) * (col1 - x) / ((x + 1) * (row2 - col1 + x + 1))
+            for x in range(a, max_x)
+        ]
+        p = _sum_decreasing(_hypergeom_pmf(a, row1, row2, col1), ratios)
+    else:
+        # 1 - P(X <= a - 1): terms decrease from x = a - 1 downward
+        ratios = [
+            x * (row2 - col1 + x) / ((row1 - x + 1) * (col1 - x + 1))
+            for x in range(a - 1, min_x, -1)
+        ]
+        p = 1.0 - _sum_decreasing(_hypergeom_pmf(a - 1, row1, row2, col1), ratios)
+    return min(1.0, max(0.0, p))
+
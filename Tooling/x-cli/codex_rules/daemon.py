@@ -0,0 +1,331 @@
+"""Long-running ``codex_rules serve`` daemon.
+
+Pre-commit hooks and editor tasks call ``emit-warnings`` and
+``check-compliance`` many times per session; each call would otherwise
+start Python, load the config and component mapping and open SQLite.  The
+daemon does that once and then answers requests (see
+:mod:`codex_rules.client` for the wire protocol) over a Unix socket or a
+loopback TCP port.  The socket is created owner-only.  A TCP daemon writes a
+random token to :data:`~codex_rules.client.TOKEN_FILE` (owner-only) and
+rejects requests that do not carry it.
+
+Only :data:`SERVED_COMMANDS` run in the daemon, against a read-only
+connection; anything else (including ``export``, which streams to its
+output file) gets ``{"fallback": true}`` and the client runs it in-process.
+Each connection carries one request, which must arrive within
+:data:`REQUEST_TIMEOUT` seconds, so a stalled client cannot block others.
+Requests are handled one at a time in the serving thread, in the client's
+working directory, with stdout/stderr captured into the response.  That
+directory, and the ``--profile`` file a request writes, must lie inside the
+directory the daemon was started in.  Before
+each request the daemon reloads the config and mapping if their files
+changed, and reopens the database if its file was replaced or the
+configured ``sqlite_path`` moved.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hmac
+import io
+import json
+import os
+import secrets
+import socketserver
+import sys
+import traceback
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from . import cli
+from .client import TOKEN_FILE, connect, parse_address, resolve_address
+from .config import load_config
+from .mapping import ComponentMapping
+from .profiling import Profiler
+from .storage import StorageProtocol
+
+SERVED_COMMANDS = ("emit-warnings", "check-compliance")
+CONFIG_FILE = ".codex/rules.yml"
+# Options of served commands naming a file the daemon writes.
+OUTPUT_OPTIONS = (("profile", "--profile"),)
+# Seconds a connection may take to send its request line.
+REQUEST_TIMEOUT = 2.0
+
+
+def _stamp(path: Path) -> Tuple[int, int] | None:
+    """Return ``(inode, mtime_ns)`` of ``path``, or ``None`` if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+class RulesDaemon:
+    """Warm state shared by every request: config, mapping and storage."""
+
+    def __init__(
+        self,
+        storage: StorageProtocol,
+        mapping: ComponentMapping,
+        config: Dict,
+        token: str | None = None,
+    ) -> None:
+        self.root = Path.cwd().resolve()
+        self.token = token
+        self.parser = cli.build_parser()
+        self.storage = storage
+        self.mapping = mapping
+        self.config = config
+        self.served = 0
+        self.stopping = False
+        self._stamps = self._file_stamps()
+        self._db_inode = self._inode(self._db_path())
+
+    # ------------------------------------------------------------------ #
+    def _db_path(self) -> Path | None:
+        path = getattr(self.storage, "path", None)
+        return (self.root / path).resolve() if path is not None else None
+
+    def _configured_db_path(self) -> Path | None:
+        path = self.config.get("storage", {}).get("sqlite_path")
+        return (self.root / path).resolve() if path else self._db_path()
+
+    def _inside_root(self, path: Path) -> bool:
+        """Return whether ``path`` (resolved against the cwd) is under the root."""
+        try:
+            path.resolve().relative_to(self.root)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def _inode(path: Path | None) -> int | None:
+        stamp = _stamp(path) if path is not None else None
+        return stamp[0] if stamp else None
+
+    def _file_stamps(self) -> Dict[str, Tuple[int, int] | None]:
+        components = self.config.get("components_file", ".codex/components.yml")
+        return {
+            "config": _stamp(self.root / CONFIG_FILE),
+            "mapping": _stamp(self.root / components),
+        }
+
+    def refresh(self) -> None:
+        """Reload config/mapping and reopen storage if their files changed.
+
+        Storage is reopened when the database file was replaced or the
+        reloaded config points ``sqlite_path`` at another file.
+        """
+        stamps = self._file_stamps()
+        if stamps != self._stamps:
+            self.config = load_config(str(self.root / CONFIG_FILE))
+            components = self.config.get("components_file", ".codex/components.yml")
+            self.mapping = ComponentMapping(self.root / components)
+            self._stamps = self._file_stamps()
+        db_path = self._db_path()
+        if db_path is None:
+            return
+        target = self._configured_db_path()
+        inode = self._inode(target)
+        # Replaced on disk (e.g. restored from a CI artifact) or moved: reopen.
+        if target != db_path or (inode is not None and inode != self._db_inode):
+            old = self.storage
+            storage_cfg = self.config["storage"]
+            self.storage = type(old)(
+                str(target),
+                event_mode=storage_cfg.get("event_mode", "all"),
+                read_only=True,
+                pragmas=storage_cfg.get("pragmas"),
+            )
+            old.close()
+            self._db_inode = self._inode(target)
+
+    # ------------------------------------------------------------------ #
+    def handle(self, payload: Dict) -> Dict:
+        """Answer one decoded request."""
+        if not isinstance(payload, dict):
+            return {"exit_code": 2, "stdout": "", "stderr": f"[codex-rules] Bad request {payload!r}\n"}
+        if self.token is not None and not hmac.compare_digest(
+            str(payload.get("token", "")), self.token
+        ):
+            return {"exit_code": 2, "stdout": "", "stderr": "[codex-rules] Request rejected: bad token\n"}
+        op = payload.get("op", "run")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "served": self.served}
+        if op == "shutdown":
+            self.stopping = True
+            return {"ok": True}
+        if op != "run" or not isinstance(payload.get("argv"), list):
+            return {"exit_code": 2, "stdout": "", "stderr": f"[codex-rules] Bad request {payload!r}\n"}
+        return self._run(payload["argv"], payload.get("cwd") or str(self.root))
+
+    def _run(self, argv: List[str], cwd: str) -> Dict:
+        if not self._inside_root(self.root / cwd):
+            return {
+                "exit_code": 2,
+                "stdout": "",
+                "stderr": f"[codex-rules] Working directory {cwd} is outside {self.root}\n",
+            }
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = 0
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    args = self.parser.parse_args(argv)
+                    if (
+                        args.command not in SERVED_COMMANDS
+                        or args.storage != "sqlite"
+                        or args.snapshot
+                    ):
+                        return {"fallback": True}
+                    self._check_outputs(args)
+                    self.refresh()
+                    self._dispatch(args)
+                except SystemExit as exc:
+                    if exc.code is None or isinstance(exc.code, int):
+                        exit_code = exc.code or 0
+                    else:
+                        print(exc.code, file=sys.stderr)
+                        exit_code = 1
+                except Exception:
+                    print("[codex-rules] Error in daemon request:", file=sys.stderr)
+                    traceback.print_exc()
+                    exit_code = 1
+        except OSError as exc:
+            return {"exit_code": 1, "stdout": "", "stderr": f"[codex-rules] {exc}\n"}
+        finally:
+            os.chdir(self.root)
+        self.served += 1
+        return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def _check_outputs(self, args: argparse.Namespace) -> None:
+        """Exit 2 if the request would write a file outside the root."""
+        for attr, option in OUTPUT_OPTIONS:
+            value = getattr(args, attr, None)
+            if value and value != "-" and not self._inside_root(Path(value)):
+                print(f"[codex-rules] {option} {value} is outside {self.root}", file=sys.stderr)
+                raise SystemExit(2)
+
+    def _dispatch(self, args: argparse.Namespace) -> None:
+        config = dict(self.config)
+        cli.apply_overrides(args, config)
+        if not args.profile:
+            cli._dispatch(self.parser, args, self.storage, self.mapping, config)
+            return
+        profiler = Profiler()
+        try:
+            with profiler:
+                cli._dispatch(self.parser, args, self.storage, self.mapping, config)
+        finally:
+            cli._write_profile(profiler, args.command, args.profile)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Read one JSON request line and write its response.
+
+    ``timeout`` bounds every socket operation, so a client that connects and
+    never sends (or never reads) is dropped instead of blocking the daemon.
+    """
+
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        daemon: RulesDaemon = self.server.rules_daemon  # type: ignore[attr-defined]
+        try:
+            line = self.rfile.readline()
+        except OSError:  # timed out waiting for the request
+            return
+        if not line.strip():
+            return
+        try:
+            payload = json.loads(line)
+        except ValueError as exc:
+            response = {"exit_code": 2, "stdout": "", "stderr": f"[codex-rules] {exc}\n"}
+        else:
+            response = daemon.handle(payload)
+        with contextlib.suppress(OSError):
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def _make_server(address: str) -> socketserver.BaseServer:
+    """Bind a server to ``address``, clearing a stale Unix socket first."""
+    kind, target = parse_address(address)
+    if kind == "tcp":
+        server = socketserver.TCPServer(target, _Handler, bind_and_activate=False)
+        server.allow_reuse_address = True
+        try:
+            server.server_bind()
+            server.server_activate()
+        except OSError:
+            server.server_close()
+            raise
+        return server
+    path = Path(target)  # type: ignore[arg-type]
+    if path.exists():
+        try:
+            connect(address).close()
+        except OSError:
+            path.unlink()  # left behind by a daemon that was killed
+        else:
+            raise SystemExit(f"[codex-rules] A daemon is already listening on {address}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Create the socket owner-only from the start; chmod after bind would
+    # leave a window in which other users could connect.
+    old_umask = os.umask(0o077)
+    try:
+        return socketserver.UnixStreamServer(str(path), _Handler)
+    finally:
+        os.umask(old_umask)
+
+
+def _write_token(path: Path) -> str:
+    """Write a fresh random token to ``path`` (owner-only) and return it."""
+    token = secrets.token_hex(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()  # O_CREAT keeps the mode of an existing file
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(token)
+    return token
+
+
+def serve(
+    args: argparse.Namespace,
+    storage: StorageProtocol,
+    mapping: ComponentMapping,
+    config: Dict,
+) -> None:
+    """Serve requests until shut down, interrupted or idle for too long."""
+    address = resolve_address(args.address)
+    try:
+        server = _make_server(address)
+    except (OSError, ValueError) as exc:
+        print(f"[codex-rules] Cannot serve on {address}: {exc}", file=sys.stderr)
+        sys.exit(2)
+    tcp = parse_address(address)[0] == "tcp"
+    token = _write_token(Path(TOKEN_FILE)) if tcp else None
+    daemon = RulesDaemon(storage, mapping, config, token)
+    server.rules_daemon = daemon  # type: ignore[attr-defined]
+    server.timeout = args.idle_timeout or None
+
+    def _idle() -> None:
+        print("[codex-rules] Idle timeout reached; stopping daemon", file=sys.stderr)
+        daemon.stopping = True
+
+    server.handle_timeout = _idle  # type: ignore[method-assign]
+    print(f"[codex-rules] Serving on {address} (pid {os.getpid()})", file=sys.stderr)
+    sys.stderr.flush()
+    try:
+        while not daemon.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(OSError):
+            (daemon.root / (TOKEN_FILE if tcp else address)).unlink()
+        if daemon.storage is not storage:
+            daemon.storage.close()
@@ -0,0 +1,135 @@
+"""Bulk export and import of the raw test-event history.
+
+Events are written one row per test event with the columns of
+:data:`~codex_rules.storage.TEST_EVENT_FIELDS`, so a history can be moved
+between runners or loaded into pandas/duckdb for offline analysis.  Only
+the ``test_events`` table is covered: PR metadata (``prs``, ``pr_files``)
+and the per-PR pass summaries stay behind, so an imported history has no
+component/test pairs to correlate until its PRs are recorded again.  Use
+``codex_rules merge`` to combine whole databases.  Three formats are
+supported:
+
+  - ``ndjson``: one JSON object per line; pure Python, always available.
+  - ``parquet``: columnar Parquet file (requires ``pyarrow``).
+  - ``arrow``: Arrow IPC file (requires ``pyarrow``).
+
+Both directions stream: the writer appends one row group / record batch per
+chunk handed to it and the reader yields rows batch by batch, so neither side
+holds the whole table in memory.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from .storage import DEFAULT_CHUNK_SIZE, TEST_EVENT_FIELDS
+
+EVENT_FORMATS = ("ndjson", "parquet", "arrow")
+
+_SUFFIX_FORMATS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+_INTEGER_FIELDS = ("pr_id", "duration_ms")
+
+
+def format_for_path(path: str | Path) -> str:
+    """Guess the event format from a file suffix, defaulting to NDJSON."""
+    return _SUFFIX_FORMATS.get(Path(path).suffix.lower(), "ndjson")
+
+
+def _pyarrow(fmt: str):
+    """Import pyarrow or explain how to do without it."""
+    try:
+        import pyarrow  # type: ignore
+    except ImportError as exc:
+        raise ImportError(
+            f"--format {fmt} requires pyarrow (pip install pyarrow); "
+            "use --format ndjson instead"
+        ) from exc
+    return pyarrow
+
+
+def _arrow_schema(pa):
+    return pa.schema(
+        [
+            (name, pa.int64() if name in _INTEGER_FIELDS else pa.string())
+            for name in TEST_EVENT_FIELDS
+        ]
+    )
+
+
+def write_events(chunks: Iterable[List[Dict]], path: str | Path, fmt: str) -> int:
+    """Write chunks of event dictionaries to ``path``; return the row count."""
+    if fmt not in EVENT_FORMATS:
+        raise ValueError(f"Unknown event format {fmt!r}")
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    if fmt == "ndjson":
+        with target.open("w", encoding="utf-8") as fh:
+            for chunk in chunks:
+                for evt in chunk:
+                    fh.write(json.dumps({k: evt.get(k) for k in TEST_EVENT_FIELDS}))
+                    fh.write("\n")
+                written += len(chunk)
+        return written
+
+    pa = _pyarrow(fmt)
+    schema = _arrow_schema(pa)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        writer = pq.ParquetWriter(str(target), schema)
+        write = writer.write_table
+        wrap = pa.Table.from_pylist
+    else:
+        writer = pa.ipc.new_file(str(target), schema)
+        write = writer.write_batch
+        wrap = pa.RecordBatch.from_pylist
+    try:
+        for chunk in chunks:
+            if chunk:
+                write(wrap(chunk, schema=schema))
+                written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+def iter_events(
+    path: str | Path, fmt: str | None = None, *, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict]:
+    """Yield event dictionaries from a file written by :func:`write_events`.
+
+    ``fmt`` defaults to :func:`format_for_path`.  Parquet files are read
+    ``chunk_size`` rows at a time; Arrow files are memory-mapped and read one
+    record batch at a time.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in EVENT_FORMATS:
+        raise ValueError(f"Unknown event format {fmt!r}")
+    if fmt == "ndjson":
+        with Path(path).open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    pa = _pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+
+        batches = pq.ParquetFile(str(path)).iter_batches(batch_size=chunk_size)
+        for batch in batches:
+            yield from batch.to_pylist()
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for idx in range(reader.num_record_batches):
+            yield from reader.get_batch(idx).to_pylist()
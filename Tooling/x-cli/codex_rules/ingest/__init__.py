@@ -1,2 +1,2 @@
 """Test result ingestors for the codex rules engine."""
-__all__ = ["junit", "pytest_json", "jest_json"]
+__all__ = ["detect", "junit", "pytest_json", "jest_json", "trx"]
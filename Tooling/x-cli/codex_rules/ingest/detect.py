@@ -0,0 +1,44 @@
+"""Content sniffing for ``ingest-tests --format auto``.
+
+Only the first bytes of a file are read.  XML reports are identified by
+their root element (``testsuites``/``testsuite`` for JUnit, ``TestRun`` for
+TRX) and JSON reports by the keys near the top of the document
+(``testResults`` for Jest, ``tests`` and friends for pytest-json-report,
+``test_id`` for pre-normalized custom events).
+"""
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+# Bytes read from the start of each file.
+SNIFF_BYTES = 64 * 1024
+
+_XML_ROOTS = {"testsuites": "junit", "testsuite": "junit", "TestRun": "trx"}
+
+# Skips the XML declaration, comments, processing instructions and DOCTYPE.
+_XML_ROOT = re.compile(r"<(?![?!])(?:[\w.-]+:)?([\w.-]+)")
+
+# Checked in order; the first key found decides the format.
+_JSON_KEYS = (
+    ("testResults", "jest-json"),
+    ("numTotalTests", "jest-json"),
+    ("tests", "pytest-json"),
+    ("collectors", "pytest-json"),
+    ("nodeid", "pytest-json"),
+    ("test_id", "custom"),
+)
+
+
+def sniff_format(path: str, head_bytes: int = SNIFF_BYTES) -> Optional[str]:
+    """Return the ingest format of ``path``, or ``None`` if unrecognised."""
+    with open(path, "rb") as fh:
+        head = fh.read(head_bytes).decode("utf-8", errors="ignore").lstrip("\ufeff \t\r\n")
+    if head.startswith("<"):
+        match = _XML_ROOT.search(head)
+        return _XML_ROOTS.get(match.group(1)) if match else None
+    if head[:1] in ("{", "["):
+        for key, fmt in _JSON_KEYS:
+            if re.search(rf'"{key}"\s*:', head):
+                return fmt
+    return None
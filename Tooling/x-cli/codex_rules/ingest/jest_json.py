@@ -2,35 +2,100 @@
 
 Parses output from `jest --json --outputFile=...`. It expects an object with a
 `testResults` array, each containing `assertionResults`.
+
+Reports are read incrementally: each assertion result is decoded on its own
+and reduced to a small record before the next one is read, so captured
+failure messages never accumulate.  ``ijson`` is used when installed;
+otherwise the built-in :class:`JsonStream` scanner.
 """
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
+
+try:  # Optional: C-accelerated incremental JSON parsing
+    import ijson  # type: ignore
+except ImportError:  # pragma: no cover - exercised when ijson is absent
+    ijson = None
+
+from .jsonstream import JsonStream, ijson_items
+
+_SUITE = "testResults.item"
+_ASSERTION = "testResults.item.assertionResults.item"
+
+
+def _assertion(ar: Dict) -> Tuple[str, str, int]:
+    """Reduce one assertion result to (status, title, duration_ms)."""
+    status = "failed" if (ar.get("status") or "").lower() == "failed" else "passed"
+    title = (ar.get("title") or "").strip() or "unknown"
+    return status, title, int(ar.get("duration") or 0)
+
+
+def _suite_events(file_path: str, assertions: List[Tuple[str, str, int]]) -> Iterator[Dict]:
+    # A suite's "name" usually follows its assertionResults in Jest output,
+    # so events are emitted once the suite object is complete.
+    suite_name = Path(file_path).name or "jest"
+    for status, title, duration_ms in assertions:
+        yield {
+            "test_id": f"{suite_name}#{title}",
+            "suite": suite_name,
+            "status": status,
+            "duration_ms": duration_ms,
+            "file": file_path,
+        }
+
+
+def _iter_ijson(fh) -> Iterator[Dict]:
+    names: Dict[str, str] = {}
+    assertions: List[Tuple[str, str, int]] = []
+    for prefix, event, value in ijson_items(ijson.parse(fh), _ASSERTION):
+        if event == "item":
+            assertions.append(_assertion(value))
+        elif prefix == _SUITE and event == "start_map":
+            names, assertions = {}, []
+        elif prefix in (f"{_SUITE}.name", f"{_SUITE}.testFilePath") and event == "string":
+            names[prefix.rsplit(".", 1)[1]] = value
+        elif prefix == _SUITE and event == "end_map":
+            file_path = names.get("name") or names.get("testFilePath") or ""
+            yield from _suite_events(file_path, assertions)
+
+
+def _iter_scan(fh) -> Iterator[Dict]:
+    stream = JsonStream(fh)
+    if stream.peek() != "{":
+        return
+    for key in stream.members():
+        if key != "testResults" or stream.peek() != "[":
+            stream.value()
+            continue
+        for _ in stream.elements():
+            if stream.peek() != "{":
+                stream.value()
+                continue
+            names: Dict[str, str] = {}
+            assertions: List[Tuple[str, str, int]] = []
+            for field in stream.members():
+                if field == "assertionResults" and stream.peek() == "[":
+                    for _ in stream.elements():
+                        assertions.append(_assertion(stream.value()))
+                elif field in ("name", "testFilePath"):
+                    names[field] = stream.value()
+                else:
+                    stream.value()
+            file_path = names.get("name") or names.get("testFilePath") or ""
+            yield from _suite_events(file_path, assertions)
+
+
+def iter_jest_json(path: str) -> Iterator[Dict]:
+    """Yield one normalized event per assertion in a Jest JSON report."""
+    if ijson is not None:
+        with open(path, "rb") as fh:
+            yield from _iter_ijson(fh)
+        return
+    with open(path, "r", encoding="utf-8") as fh:
+        yield from _iter_scan(fh)
 
 
 def parse_jest_json(path: str) -> List[Dict]:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
-    events: List[Dict] = []
-    suites = data.get("testResults") if isinstance(data, dict) else None
-    if not isinstance(suites, list):
-        return events
-    for suite in suites:
-        file_path = suite.get("name") or suite.get("testFilePath") or ""
-        suite_name = Path(file_path).name or "jest"
-        for ar in suite.get("assertionResults", []) or []:
-            status = "failed" if (ar.get("status") or "").lower() == "failed" else "passed"
-            title = (ar.get("title") or "").strip() or "unknown"
-            duration_ms = int(ar.get("duration") or 0)
-            test_id = f"{suite_name}#{title}"
-            events.append(
-                {
-                    "test_id": test_id,
-                    "suite": suite_name,
-                    "status": status,
-                    "duration_ms": duration_ms,
-                    "file": file_path,
-                }
-            )
-    return events
+    """Return the events of :func:`iter_jest_json` as a list."""
+    return list(iter_jest_json(path))
@@ -0,0 +1,155 @@
+"""Incremental JSON reading for large test reports.
+
+:class:`JsonStream` walks a JSON document from a text file without loading
+it whole.  Containers the caller is interested in are entered with
+:meth:`~JsonStream.members` / :meth:`~JsonStream.elements`; every other
+value is decoded in one piece with :meth:`json.JSONDecoder.raw_decode`.
+Memory is therefore bounded by the largest single value that is actually
+decoded (e.g. one test record), not by the size of the file.
+
+The ingestors prefer ``ijson`` when it is installed and fall back to this
+scanner otherwise.
+"""
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Iterator
+
+# Characters read from the file per refill.
+DEFAULT_READ_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class JsonStream:
+    """Pull-style reader over a JSON text stream.
+
+    ``members()`` yields the keys of an object and ``elements()`` yields once
+    per array element; after each yield the caller must consume exactly one
+    value (with :meth:`value`, or by entering it with ``members``/
+    ``elements``) before resuming the generator.
+    """
+
+    def __init__(self, fh: IO[str], read_size: int = DEFAULT_READ_SIZE) -> None:
+        self._fh = fh
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _more(self, size: int) -> bool:
+        """Append up to ``size`` characters to the buffer, dropping consumed text."""
+        if self._eof:
+            return False
+        data = self._fh.read(size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of input)."""
+        while True:
+            buf = self._buf
+            while self._pos < len(buf) and buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buf):
+                return buf[self._pos]
+            if not self._more(self._read_size):
+                return ""
+
+    def _take(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode and return the next complete value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Incomplete value: grow the buffer geometrically so a value
+                # spanning many reads is re-scanned a logarithmic number of times.
+                if not self._more(max(self._read_size, len(self._buf) - self._pos)):
+                    raise
+                continue
+            # A number cut by the buffer edge ("12." or "1e") decodes as its
+            # prefix; refill and decode it again until it is complete.
+            if (
+                isinstance(obj, (int, float))
+                and not isinstance(obj, bool)
+                and all(ch in _NUMBER_CHARS for ch in self._buf[end:])
+                and self._more(self._read_size)
+            ):
+                continue
+            self._pos = end
+            return obj
+
+    def members(self) -> Iterator[str]:
+        """Enter an object, yielding each key before its value is consumed."""
+        self._take("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._take(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self._take("}")
+            return
+
+    def elements(self) -> Iterator[None]:
+        """Enter an array, yielding once per element before it is consumed."""
+        self._take("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self._take("]")
+            return
+
+
+def ijson_items(events: Iterator[tuple], prefix: str) -> Iterator[tuple]:
+    """Assemble the values at ``prefix`` from an ``ijson.parse`` event stream.
+
+    Yields ``(prefix, "item", value)`` once per complete value found at
+    ``prefix`` and passes every event outside those values through unchanged,
+    so callers can pick up sibling fields in the same single pass.
+    """
+    import ijson  # type: ignore
+
+    builder = None
+    depth = 0
+    for event_prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    yield prefix, "item", builder.value
+                    builder = None
+            continue
+        if event_prefix == prefix and event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        elif event_prefix == prefix and event not in ("map_key", "end_map", "end_array"):
+            yield prefix, "item", value
+        else:
+            yield event_prefix, event, value
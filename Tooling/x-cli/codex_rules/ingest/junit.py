@@ -1,17 +1,20 @@
 """JUnit XML ingestor for the codex rules engine.
 
 Parses JUnit XML files (as produced by Maven/Surefire, pytest‑junit, etc.) and
-emits a list of normalized test case records.  Only failing test cases are
-relevant for rule generation; however, passed tests are included for completeness.
+emits normalized test case records.  Only failing test cases are relevant for
+rule generation; however, passed tests are included for completeness.
+
+Reports are read incrementally with ``iterparse`` so that multi-hundred-MB
+result files can be ingested with flat memory usage.
 """
 from __future__ import annotations
 
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 
-def parse_junit(path: str) -> List[Dict]:
-    """Parse a JUnit XML file and return a list of test case dictionaries.
+def iter_junit(path: str) -> Iterator[Dict]:
+    """Yield one test case dictionary per ``<testcase>`` in a JUnit XML file.
 
     Each dictionary has the keys:
       - test_id: ``classname#name``
@@ -19,38 +22,51 @@ def parse_junit(path: str) -> List[Dict]:
       - status: 'failed' or 'passed'
       - duration_ms: runtime in milliseconds (if provided)
       - file: file hint (if provided in the testcase attributes)
+
+    Finished ``<testcase>`` elements are detached from their parent once
+    yielded, so captured output and failure bodies do not accumulate.
     """
-    results: List[Dict] = []
-    tree = ET.parse(path)
-    root = tree.getroot()
-    for tc in root.iter("testcase"):
-        class_name = tc.attrib.get("classname", "")
-        name = tc.attrib.get("name", "")
-        test_id = f"{class_name}#{name}"
-        suite = class_name
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag != "testcase":
+            continue
+        class_name = elem.attrib.get("classname", "")
+        name = elem.attrib.get("name", "")
         # duration in seconds; convert to ms
         dur_ms = 0
-        if "time" in tc.attrib:
+        if "time" in elem.attrib:
             try:
-                dur_ms = int(float(tc.attrib["time"]) * 1000)
+                dur_ms = int(float(elem.attrib["time"]) * 1000)
             except ValueError:
                 pass
-        # Determine file hint if present
-        file_hint = tc.attrib.get("file", "")
         status = "passed"
         # Check for failures or errors
-        for child in tc:
-            tag = child.tag.lower()
-            if tag in {"failure", "error"}:
+        for child in elem:
+            if child.tag.lower() in {"failure", "error"}:
                 status = "failed"
                 break
-        results.append(
-            {
-                "test_id": test_id,
-                "suite": suite,
-                "status": status,
-                "duration_ms": dur_ms,
-                "file": file_hint,
-            }
-        )
-    return results
+        record = {
+            "test_id": f"{class_name}#{name}",
+            "suite": class_name,
+            "status": status,
+            "duration_ms": dur_ms,
+            # Determine file hint if present
+            "file": elem.attrib.get("file", ""),
+        }
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+        yield record
+
+
+def parse_junit(path: str) -> List[Dict]:
+    """Parse a JUnit XML file and return a list of test case dictionaries.
+
+    See :func:`iter_junit` for the record layout; this helper simply
+    materializes the stream for callers that want a list.
+    """
+    return list(iter_junit(path))
@@ -3,51 +3,90 @@
 Supports the `pytest-json-report` plugin format (top-level key `tests`) as well
 as simple arrays of test case dicts. Falls back gracefully when fields are
 missing.
+
+Reports are read incrementally, one test record at a time, so reports with
+hundreds of MB of captured logs are ingested with flat memory usage.  ``ijson``
+is used when installed; otherwise the built-in :class:`JsonStream` scanner.
 """
 from __future__ import annotations
 
-import json
-from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
+try:  # Optional: C-accelerated incremental JSON parsing
+    import ijson  # type: ignore
+except ImportError:  # pragma: no cover - exercised when ijson is absent
+    ijson = None
 
-def parse_pytest_json(path: str) -> List[Dict]:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
-    events: List[Dict] = []
+from .jsonstream import JsonStream, ijson_items
+
+
+def _event(t: Dict) -> Dict:
+    """Normalize one pytest test record."""
+    nodeid = t.get("nodeid") or t.get("id") or ""
+    outcome = (t.get("outcome") or "").lower()
+    status = "failed" if outcome == "failed" else "passed"
+    # duration is seconds; fall back to 0
+    dur_s = t.get("duration") or (t.get("call") or {}).get("duration") or 0
+    try:
+        duration_ms = int(float(dur_s) * 1000)
+    except Exception:
+        duration_ms = 0
+    # nodeid looks like: "tests/test_logging.py::TestLogger::test_no_deadlock"
+    parts = nodeid.split("::") if nodeid else []
+    file_hint = parts[0] if parts else ""
+    suite = parts[0] if parts else "pytest"
+    test_name = parts[-1] if parts else nodeid or "unknown"
+    return {
+        "test_id": f"{suite}#{test_name}",
+        "suite": suite,
+        "status": status,
+        "duration_ms": duration_ms,
+        "file": file_hint,
+    }
+
+
+def _iter_records_ijson(fh) -> Iterator[Dict]:
+    events = ijson.parse(fh)
+    first = next(events, None)
+    if first is None:
+        return
+    # Format A: {"tests": [...]}; Format B: a bare array.
+    prefix = "item" if first[1] == "start_array" else "tests.item"
+    for _, event, value in ijson_items(events, prefix):
+        if event == "item":
+            yield value
 
+
+def _iter_records_scan(fh) -> Iterator[Dict]:
+    stream = JsonStream(fh)
+    first = stream.peek()
+    if first == "[":  # Format B: simplified array of dicts
+        for _ in stream.elements():
+            yield stream.value()
+        return
+    if first != "{":
+        return
     # Format A: {"tests": [{ "nodeid": "path::Class::test", "outcome": "failed", "duration": 0.12 }, ...]}
-    tests = None
-    if isinstance(data, dict) and isinstance(data.get("tests"), list):
-        tests = data["tests"]
-    elif isinstance(data, list):  # Format B: simplified array of dicts
-        tests = data
-
-    if not tests:
-        return events
-
-    for t in tests:
-        nodeid = t.get("nodeid") or t.get("id") or ""
-        outcome = (t.get("outcome") or "").lower()
-        status = "failed" if outcome == "failed" else "passed"
-        # duration is seconds; fall back to 0
-        dur_s = t.get("duration") or t.get("call", {}).get("duration") or 0
-        try:
-            duration_ms = int(float(dur_s) * 1000)
-        except Exception:
-            duration_ms = 0
-        # nodeid looks like: "tests/test_logging.py::TestLogger::test_no_deadlock"
-        parts = nodeid.split("::") if nodeid else []
-        file_hint = parts[0] if parts else ""
-        suite = parts[0] if parts else "pytest"
-        test_name = parts[-1] if parts else nodeid or "unknown"
-        test_id = f"{suite}#{test_name}"
-        events.append(
-            {
-                "test_id": test_id,
-                "suite": suite,
-                "status": status,
-                "duration_ms": duration_ms,
-                "file": file_hint,
-            }
-        )
-    return events
+    for key in stream.members():
+        if key == "tests" and stream.peek() == "[":
+            for _ in stream.elements():
+                yield stream.value()
+        else:
+            stream.value()
+
+
+def iter_pytest_json(path: str) -> Iterator[Dict]:
+    """Yield one normalized event per test in a pytest JSON report."""
+    if ijson is not None:
+        with open(path, "rb") as fh:
+            for record in _iter_records_ijson(fh):
+                yield _event(record)
+        return
+    with open(path, "r", encoding="utf-8") as fh:
+        for record in _iter_records_scan(fh):
+            yield _event(record)
+
+
+def parse_pytest_json(path: str) -> List[Dict]:
+    """Return the events of :func:`iter_pytest_json` as a list."""
+    return list(iter_pytest_json(path))
@@ -0,0 +1,104 @@
+"""TRX (Visual Studio / ``dotnet test``) ingestor for the codex rules engine.
+
+A TRX file lists per-test outcomes as ``<UnitTestResult>`` elements under
+``<Results>`` and describes each test once under ``<TestDefinitions>``
+(``<UnitTest id=...><TestMethod className=... codeBase=.../>``).  Since
+``dotnet test`` writes the results before the definitions, the file is read
+in two ``iterparse`` passes:
+
+  1. collect ``testId -> (className, codeBase)`` from the definitions;
+  2. stream the results, joining each one to its definition.
+
+Elements are cleared as soon as they are processed, so memory is bounded by
+the definitions map (a few short strings per test), not by captured output.
+"""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Tuple
+
+# Outcomes recorded as failures; everything else (Passed, NotExecuted,
+# Inconclusive, ...) counts as passed, as skipped JUnit cases do.
+FAILED_OUTCOMES = {"failed", "error", "timeout", "aborted"}
+
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace from ``tag``."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _duration_ms(value: str) -> int:
+    """Convert a TRX ``hh:mm:ss.fffffff`` duration to milliseconds."""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000)
+    except ValueError:
+        return 0
+
+
+def _iter_elements(path: str) -> Iterator[Tuple[ET.Element, List[ET.Element]]]:
+    """Yield each finished element with its open ancestors, then discard it.
+
+    Like :func:`codex_rules.ingest.junit.iter_junit`, finished elements are
+    cleared and detached from their parent once the caller resumes.
+    """
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        yield elem, stack
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def _definitions(path: str) -> Dict[str, Tuple[str, str]]:
+    """Pass 1: map each ``UnitTest`` id to its class name and code base."""
+    definitions: Dict[str, Tuple[str, str]] = {}
+    for elem, stack in _iter_elements(path):
+        if _local(elem.tag) == "TestMethod" and stack and _local(stack[-1].tag) == "UnitTest":
+            definitions[stack[-1].attrib.get("id", "")] = (
+                elem.attrib.get("className", ""),
+                elem.attrib.get("codeBase", ""),
+            )
+    return definitions
+
+
+def iter_trx(path: str) -> Iterator[Dict]:
+    """Yield one test case dictionary per top-level ``<UnitTestResult>``.
+
+    Records have the same keys as :func:`codex_rules.ingest.junit.iter_junit`:
+      - test_id: ``className#method`` (the test name without its class prefix)
+      - suite:  the class name
+      - status: 'failed' or 'passed'
+      - duration_ms: runtime in milliseconds
+      - file: the test assembly's code base
+
+    Data-driven rows nested under ``<InnerResults>`` are folded into their
+    parent result, which already carries the aggregate outcome.
+    """
+    definitions = _definitions(path)
+    for elem, stack in _iter_elements(path):
+        if _local(elem.tag) != "UnitTestResult":
+            continue
+        if any(_local(parent.tag) == "InnerResults" for parent in stack):
+            continue
+        class_name, code_base = definitions.get(elem.attrib.get("testId", ""), ("", ""))
+        name = elem.attrib.get("testName", "")
+        if class_name and name.startswith(class_name + "."):
+            name = name[len(class_name) + 1 :]
+        outcome = elem.attrib.get("outcome", "").lower()
+        yield {
+            "test_id": f"{class_name}#{name}",
+            "suite": class_name,
+            "status": "failed" if outcome in FAILED_OUTCOMES else "passed",
+            "duration_ms": _duration_ms(elem.attrib.get("duration", "")),
+            "file": code_base,
+        }
+
+
+def parse_trx(path: str) -> List[Dict]:
+    """Parse a TRX file and return a list of test case dictionaries."""
+    return list(iter_trx(path))
@@ -3,19 +3,29 @@
 Component mapping is defined in `.codex/components.yml`.  Each component
 specifies a list of globs that match files belonging to that component.  The
 mapping also supports retrieving a default pre‑emptive command and owners.
+
+All globs are compiled once into a single alternation regex, so resolving a
+path costs one ``re.match`` instead of one ``fnmatch`` call per glob, and
+results are memoized per normalized path.
 """
 from __future__ import annotations
 
 import fnmatch
 import json
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
+# Distinct paths remembered by ``component_for_path``.
+DEFAULT_CACHE_SIZE = 8192
+
 
 class ComponentMapping:
     """Resolves file paths to component names based on YAML globs."""
 
-    def __init__(self, mapping_file: str | Path):
+    def __init__(self, mapping_file: str | Path, cache_size: int = DEFAULT_CACHE_SIZE):
         self.components: Dict[str, Dict] = {}
         if Path(mapping_file).exists():
             content = Path(mapping_file).read_text(encoding="utf-8")
@@ -26,6 +36,35 @@ class ComponentMapping:
             except Exception:
                 data = json.loads(content)
             self.components = data.get("components", {})
+        self._compile()
+        self._lookup = lru_cache(maxsize=cache_size)(self._match)
+
+    def _compile(self) -> None:
+        """Build one regex with a named group per glob, in declaration order.
+
+        Regex alternation tries branches left to right, so the first glob
+        (in component order, then glob order) that matches wins, exactly as
+        the nested ``fnmatch`` loop did.  Globs are normalized with
+        ``os.path.normcase`` to mirror ``fnmatch.fnmatch``.
+        """
+        self._group_components: Dict[str, str] = {}
+        branches: List[str] = []
+        for comp, spec in self.components.items():
+            for pat in spec.get("globs", []) or []:
+                group = f"_glob{len(branches)}"
+                self._group_components[group] = comp
+                branches.append(
+                    f"(?P<{group}>{fnmatch.translate(os.path.normcase(pat))})"
+                )
+        self._pattern = re.compile("|".join(branches)) if branches else None
+
+    def _match(self, norm: str) -> str:
+        if self._pattern is None:
+            return "unknown"
+        m = self._pattern.match(norm)
+        if m is None:
+            return "unknown"
+        return self._group_components[m.lastgroup]
 
     def component_for_path(self, path: str) -> str:
         """Return the component name for the given file path.
@@ -33,12 +72,7 @@ class ComponentMapping:
         The first component whose glob matches the path is returned.  If no
         mapping matches, ``unknown`` is returned.
         """
-        norm = path.replace("\\", "/")
-        for comp, spec in self.components.items():
-            for pat in spec.get("globs", []):
-                if fnmatch.fnmatch(norm, pat):
-                    return comp
-        return "unknown"
+        return self._lookup(os.path.normcase(path.replace("\\", "/")))
 
     def default_command_for(self, component: str) -> Optional[str]:
         """Return the default pre‑emptive command for the component."""
@@ -4,47 +4,89 @@ This module reads and writes a memory file located at `.codex/memory.json`
 within the repository root. The file holds a list of entries. Each entry is
 a dictionary with at least a `timestamp` and a `summary` key, and optionally
 `author` or arbitrary data fields.
+
+``REPO_ROOT`` and ``MEMORY_PATH`` are resolved on first access (through the
+module ``__getattr__``), so importing this module never spawns ``git``.  The
+detected root is cached by :func:`_repo_root`; call
+``_repo_root.cache_clear()`` to detect it again.  Assigning either global
+overrides it.
 """
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
-from subprocess import CalledProcessError, check_output
 from typing import Any, Dict, List
 
+# Overrides repository-root detection, e.g. in CI or pre-commit hooks.
+REPO_ROOT_ENV = "CODEX_REPO_ROOT"
+
+
+def _find_git_marker(start: Path) -> Path | None:
+    """Return the nearest directory at or above ``start`` holding ``.git``."""
+    for parent in [start, *start.parents]:
+        if (parent / ".git").exists():
+            return parent
+    return None
+
 
 def _detect_repo_root() -> Path:
     """Return the repository root directory.
 
-    The function first attempts to query `git` for the top-level directory.
-    If that fails (e.g., `git` is unavailable), it falls back to searching
-    parent directories for a `.git` marker. As a last resort, the current
-    working directory is returned.
+    In order: the ``CODEX_REPO_ROOT`` environment variable; the nearest
+    parent of the current directory containing a `.git` marker (a directory,
+    or a file for worktrees); `git rev-parse --show-toplevel`, which also
+    honours ``GIT_DIR``/``GIT_WORK_TREE``; a `.git` marker above this file.
+    As a last resort, the current working directory is returned.
     """
+    env_root = os.environ.get(REPO_ROOT_ENV)
+    if env_root:
+        return Path(env_root).resolve()
+    cwd = Path.cwd()
+    found = _find_git_marker(cwd)
+    if found is not None:
+        return found
+    from subprocess import DEVNULL, CalledProcessError, check_output
 
     try:
-        return Path(check_output(["git", "rev-parse", "--show-toplevel"], text=True).strip())
+        return Path(
+            check_output(["git", "rev-parse", "--show-toplevel"], text=True, stderr=DEVNULL).strip()
+        )
     except (CalledProcessError, FileNotFoundError):
-        path = Path(__file__).resolve()
-        for parent in [path, *path.parents]:
-            if (parent / ".git").exists():
-                return parent
-        return Path.cwd()
+        return _find_git_marker(Path(__file__).resolve()) or cwd
+
+
+@functools.cache
+def _repo_root() -> Path:
+    """Return the detected repository root, computed once per process."""
+    return _detect_repo_root()
+
+
+def __getattr__(name: str) -> Path:
+    """Resolve ``REPO_ROOT``/``MEMORY_PATH`` when they are not assigned."""
+    if name == "REPO_ROOT":
+        return _repo_root()
+    if name == "MEMORY_PATH":
+        return _global("REPO_ROOT") / ".codex" / "memory.json"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-REPO_ROOT = _detect_repo_root()
-MEMORY_PATH = REPO_ROOT / ".codex" / "memory.json"
+def _global(name: str) -> Path:
+    """Return an assigned module global, else its resolved default."""
+    assigned = globals().get(name)
+    return assigned if assigned is not None else __getattr__(name)
 
 
 def load_memory() -> List[Dict[str, Any]]:
     """Return the list of memory entries (empty list if file missing)."""
-    if not MEMORY_PATH.exists():
+    memory_path = _global("MEMORY_PATH")
+    if not memory_path.exists():
         return []
     try:
-        data = json.loads(MEMORY_PATH.read_text(encoding="utf-8"))
+        data = json.loads(memory_path.read_text(encoding="utf-8"))
     except Exception:
         return []
     entries = data.get("entries", [])
@@ -67,6 +109,7 @@ def append_entry(entry: Dict[str, Any]) -> None:
         else:
             entry["timestamp"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
     memory.append(entry)
-    MEMORY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with MEMORY_PATH.open("w", encoding="utf-8") as f:
+    memory_path = _global("MEMORY_PATH")
+    memory_path.parent.mkdir(parents=True, exist_ok=True)
+    with memory_path.open("w", encoding="utf-8") as f:
         json.dump({"entries": memory}, f, indent=2)
@@ -0,0 +1,165 @@
+"""Lightweight stage timers for the codex rules engine.
+
+Code marks its hot paths with :func:`span` (a context manager) or
+:func:`profiled` (a decorator)::
+
+    with span("ingest") as sp:
+        sp.rows = storage.record_test_events(records)
+
+While a :class:`Profiler` is active (``with Profiler() as prof:``, or the
+CLI's ``--profile`` flag) each finished span records its wall time, CPU
+time, row count and the process's peak RSS.  Spans nest; a nested span's
+name is prefixed with its parents' (``run-workflow/ingest``).
+
+When no profiler is active :func:`span` returns a shared no-op object, so
+instrumented code pays one global lookup per call.
+"""
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:  # Unix only
+    import resource
+except Exception:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+_ACTIVE: Optional["Profiler"] = None
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Return the peak resident set size of this process in KiB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class _NullSpan:
+    """Stand-in returned by :func:`span` while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+    def add_rows(self, count: int) -> None:
+        pass
+
+    @property
+    def rows(self) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """A running span; set ``rows`` or call :meth:`add_rows` to count rows."""
+
+    __slots__ = ("profiler", "name", "rows", "_wall", "_cpu")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.rows: Optional[int] = None
+
+    def add_rows(self, count: int) -> None:
+        self.rows = (self.rows or 0) + count
+
+    def __enter__(self) -> "_Span":
+        stack = self.profiler._stack
+        if stack:
+            self.name = f"{stack[-1].name}/{self.name}"
+        stack.append(self)
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self.profiler._stack.pop()
+        self.profiler.spans.append(
+            {
+                "name": self.name,
+                "wall_ms": round(wall * 1000, 3),
+                "cpu_ms": round(cpu * 1000, 3),
+                "rows": self.rows,
+                "peak_rss_kb": peak_rss_kb(),
+            }
+        )
+
+
+class Profiler:
+    """Collect the spans finished while it is active.
+
+    Entering the profiler makes it the target of :func:`span`; the previous
+    profiler (normally none) is restored on exit.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Dict] = []
+        self._stack: List[_Span] = []
+        self._previous: Optional[Profiler] = None
+
+    def __enter__(self) -> "Profiler":
+        global _ACTIVE
+        self._previous, _ACTIVE = _ACTIVE, self
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        global _ACTIVE
+        _ACTIVE = self._previous
+
+    def summary(self) -> Dict:
+        """Return the spans recorded so far, in completion order."""
+        return {"spans": list(self.spans), "peak_rss_kb": peak_rss_kb()}
+
+
+def active() -> Optional[Profiler]:
+    """Return the active profiler, or ``None`` when profiling is off."""
+    return _ACTIVE
+
+
+def add_rows(count: int) -> None:
+    """Add ``count`` to the rows of the innermost running span, if any."""
+    if _ACTIVE is not None and _ACTIVE._stack:
+        _ACTIVE._stack[-1].add_rows(count)
+
+
+def span(name: str) -> Any:
+    """Return a context manager timing the enclosed block as ``name``."""
+    if _ACTIVE is None:
+        return _NULL_SPAN
+    return _Span(_ACTIVE, name)
+
+
+def profiled(name: str | None = None) -> Callable[[Callable], Callable]:
+    """Decorate a function so each call runs inside :func:`span`.
+
+    ``name`` defaults to the function's ``__name__``.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _ACTIVE is None:
+                return func(*args, **kwargs)
+            with _Span(_ACTIVE, label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
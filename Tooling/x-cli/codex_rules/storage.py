@@ -4,15 +4,95 @@ This module manages the underlying SQLite database used by the engine.  It
 stores PR metadata, touched files, test events, and guidance rules.  It
 provides methods to record events, query statistics, and perform basic
 aggregation for association analysis.
+
+Test, suite and component names are interned in small lookup tables and
+referenced by integer id from the event tables; public methods accept and
+return names.
 """
 from __future__ import annotations
 
 import json
 import os
+import re
 import sqlite3
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple, Protocol
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Protocol
+
+# Number of rows handed to ``executemany`` per round trip when bulk inserting.
+DEFAULT_CHUNK_SIZE = 1000
+
+# How ``record_test_events`` stores passed events: ``all`` keeps one row per
+# event; ``failures_plus_summary`` folds passes into ``test_pass_summary``.
+EVENT_MODES = ("all", "failures_plus_summary")
+
+# Days of raw test events kept by ``compact`` unless configured otherwise.
+DEFAULT_RETENTION_DAYS = 90
+
+# Per-connection tuning applied on open; ``storage.pragmas`` in the config
+# overrides individual entries.  A negative cache_size is in KiB.
+DEFAULT_PRAGMAS = {
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+}
+
+_PRAGMA_VALUE = re.compile(r"-?\w+")
+
+# Lookup tables interning the names repeated across event rows.
+LOOKUP_TABLES = ("tests", "suites", "components")
+
+# Bulk ingests at least this large refresh the query planner statistics.
+ANALYZE_MIN_ROWS = 5000
+
+TEST_EVENT_FIELDS = (
+    "run_id",
+    "pr_id",
+    "commit_sha",
+    "test_id",
+    "suite",
+    "status",
+    "duration_ms",
+    "component",
+    "file_hint",
+    "ts",
+)
+
+
+# Columns returned by ``get_active_guidance``.
+GUIDANCE_FIELDS = (
+    "rule_id",
+    "component",
+    "test_id",
+    "support_prs",
+    "confidence",
+    "baseline",
+    "lift",
+    "p_value",
+    "template",
+    "command",
+)
+
+
+def _window_cutoff(window_days: int) -> str:
+    """Return the ISO timestamp at which a ``window_days`` window starts."""
+    return (datetime.now(timezone.utc) - timedelta(days=window_days)).isoformat()
+
+
+def _pragma_statements(overrides: Dict | None) -> List[str]:
+    """Return ``PRAGMA`` statements for the defaults merged with ``overrides``.
+
+    Only the keys of :data:`DEFAULT_PRAGMAS` are accepted, and values must be
+    a single (optionally negative) word, since they are spliced into SQL.
+    """
+    statements = []
+    for name, value in {**DEFAULT_PRAGMAS, **(overrides or {})}.items():
+        if name not in DEFAULT_PRAGMAS or not _PRAGMA_VALUE.fullmatch(str(value)):
+            raise ValueError(f"Unsupported storage pragma {name}={value!r}")
+        statements.append(f"PRAGMA {name}={value}")
+    return statements
 
 
 class StorageProtocol(Protocol):
@@ -43,6 +123,10 @@ class StorageProtocol(Protocol):
         ts: str,
     ) -> None: ...
 
+    def record_test_events(
+        self, events: Iterable[Dict], *, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int: ...
+
     def distinct_pairs(self, window_days: int) -> Iterable[Tuple[str, str]]: ...
 
     def contingency(
@@ -59,27 +143,105 @@ class StorageProtocol(Protocol):
 
     def get_active_guidance(self) -> List[Dict]: ...
 
-    def prune_guidance(self, window_days: int, last_n: int | None) -> None: ...
+    def prune_guidance(self, window_days: int, last_n: int | None) -> List[str]: ...
 
     def export_stats(self) -> Dict: ...
 
 
 class Storage:
-    """Encapsulates an SQLite database used by the rules engine."""
+    """Encapsulates an SQLite database used by the rules engine.
+
+    With ``read_only=True`` the file is opened through a ``mode=ro`` URI, so
+    readers never take the write lock and can run alongside a writer under
+    WAL.  A missing or outdated database is first created or migrated through
+    a short read-write connection.  ``pragmas`` overrides entries of
+    :data:`DEFAULT_PRAGMAS`.  Instances are context managers that close the
+    connection on exit.
+    """
 
-    def __init__(self, path: str) -> None:
+    def __init__(
+        self,
+        path: str,
+        *,
+        event_mode: str = "all",
+        read_only: bool = False,
+        pragmas: Dict | None = None,
+    ) -> None:
+        if event_mode not in EVENT_MODES:
+            raise ValueError(f"Unknown event_mode {event_mode!r}")
+        self.event_mode = event_mode
+        self.read_only = read_only
+        self._pragmas = _pragma_statements(pragmas)
         self.path = Path(path)
+        self._forget_refs()
+        if read_only:
+            if path == ":memory:":
+                raise ValueError("An in-memory database cannot be opened read-only")
+            if not self._schema_current():
+                Storage(path, event_mode=event_mode).close()
+            uri = f"{self.path.resolve().as_uri()}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+            self._apply_pragmas()
+            return
         # Ensure parent directory exists
         self.path.parent.mkdir(parents=True, exist_ok=True)
         # Enable WAL to avoid locking issues under concurrent writes
         self.conn = sqlite3.connect(self.path.as_posix(), isolation_level=None)
+        # Only takes effect on a new file (it must precede WAL and the first
+        # table); existing databases are converted by ``compact``.
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
         self.conn.execute("PRAGMA journal_mode=WAL;")
+        self._apply_pragmas()
         self._init_schema()
 
+    def _schema_current(self) -> bool:
+        """Return whether the file exists with every migration applied."""
+        if not self.path.exists():
+            return False
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] >= len(self._MIGRATIONS)
+        finally:
+            conn.close()
+
+    def _apply_pragmas(self) -> None:
+        for stmt in self._pragmas:
+            self.conn.execute(stmt)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self.conn.close()
+
+    def __enter__(self) -> "Storage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _init_schema(self) -> None:
-        """Create tables if they do not exist."""
+        """Bring the schema up to date by applying pending migrations.
+
+        ``PRAGMA user_version`` records how many entries of ``_MIGRATIONS``
+        have been applied.  Each pending migration runs in its own
+        transaction together with the version bump, so an interrupted upgrade
+        resumes from the last completed step.
+        """
         cur = self.conn.cursor()
-        cur.executescript(
+        cur.execute("PRAGMA user_version")
+        version = cur.fetchone()[0]
+        for number, migration in enumerate(self._MIGRATIONS[version:], start=version + 1):
+            cur.execute("BEGIN")
+            try:
+                migration(self, cur)
+                cur.execute(f"PRAGMA user_version = {number}")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            cur.execute("COMMIT")
+
+    def _migrate_base_schema(self, cur: sqlite3.Cursor) -> None:
+        """v1: create the base tables; rename the legacy 'commit' column."""
+        for stmt in (
             """
             CREATE TABLE IF NOT EXISTS prs (
                 pr_id INTEGER PRIMARY KEY,
@@ -87,16 +249,18 @@ class Storage:
                 base TEXT,
                 labels TEXT,
                 created_at TEXT
-            );
-
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS pr_files (
                 pr_id INTEGER,
                 path TEXT,
                 status TEXT,
                 component TEXT,
                 PRIMARY KEY (pr_id, path)
-            );
-
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS test_events (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 run_id TEXT,
@@ -109,8 +273,9 @@ class Storage:
                 component TEXT,
                 file_hint TEXT,
                 ts TEXT
-            );
-
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS guidance (
                 rule_id TEXT PRIMARY KEY,
                 component TEXT,
@@ -125,26 +290,40 @@ class Storage:
                 created_at TEXT,
                 template TEXT,
                 command TEXT
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_test_events_pr ON test_events (pr_id);
-            CREATE INDEX IF NOT EXISTS idx_test_events_component ON test_events (component);
-            CREATE INDEX IF NOT EXISTS idx_test_events_test ON test_events (test_id, status);
-            CREATE INDEX IF NOT EXISTS idx_pr_files_component ON pr_files (component);
+            )
+            """,
             """
-        )
+            CREATE TABLE IF NOT EXISTS analysis_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS pair_stats (
+                component TEXT,
+                test_id TEXT,
+                a INTEGER,
+                b INTEGER,
+                c INTEGER,
+                d INTEGER,
+                universe INTEGER,
+                PRIMARY KEY (component, test_id)
+            )
+            """,
+        ):
+            cur.execute(stmt)
 
-        # --- Migration: rename reserved 'commit' column to 'commit_sha' ---
+        # Rename reserved 'commit' column to 'commit_sha' in legacy databases
         cur.execute("PRAGMA table_info(test_events)")
         cols = [row[1] for row in cur.fetchall()]
         if "commit" in cols and "commit_sha" not in cols:
             try:
-                cur.execute("ALTER TABLE test_events RENAME COLUMN commit TO commit_sha")
+                cur.execute('ALTER TABLE test_events RENAME COLUMN "commit" TO commit_sha')
             except sqlite3.OperationalError:
                 # Fallback for old SQLite versions without RENAME COLUMN
-                cur.executescript(
+                for stmt in (
                     """
-                    CREATE TABLE IF NOT EXISTS test_events_new (
+                    CREATE TABLE test_events_new (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         run_id TEXT,
                         pr_id INTEGER,
@@ -156,18 +335,303 @@ class Storage:
                         component TEXT,
                         file_hint TEXT,
                         ts TEXT
-                    );
+                    )
+                    """,
+                    """
                     INSERT INTO test_events_new
                         (id, run_id, pr_id, commit_sha, test_id, suite, status, duration_ms, component, file_hint, ts)
                     SELECT id, run_id, pr_id, "commit", test_id, suite, status, duration_ms, component, file_hint, ts
-                    FROM test_events;
-                    DROP TABLE test_events;
-                    ALTER TABLE test_events_new RENAME TO test_events;
-                    CREATE INDEX IF NOT EXISTS idx_test_events_pr ON test_events (pr_id);
-                    CREATE INDEX IF NOT EXISTS idx_test_events_component ON test_events (component);
-                    CREATE INDEX IF NOT EXISTS idx_test_events_test ON test_events (test_id, status);
-                    """
-                )
+                    FROM test_events
+                    """,
+                    "DROP TABLE test_events",
+                    "ALTER TABLE test_events_new RENAME TO test_events",
+                ):
+                    cur.execute(stmt)
+
+        for stmt in (
+            "CREATE INDEX IF NOT EXISTS idx_test_events_pr ON test_events (pr_id)",
+            "CREATE INDEX IF NOT EXISTS idx_test_events_component ON test_events (component)",
+            "CREATE INDEX IF NOT EXISTS idx_test_events_test ON test_events (test_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_pr_files_component ON pr_files (component)",
+        ):
+            cur.execute(stmt)
+
+    def _migrate_hot_path_indexes(self, cur: sqlite3.Cursor) -> None:
+        """v2: covering indexes for the analyze/prune predicates.
+
+        - ``status, ts, ...``: failed events in the window (distinct_pairs,
+          contingency_table, prune_guidance) without touching table rows.
+        - ``ts, pr_id``: the PR universe of the window.
+        - ``pr_id, ts``: per-PR recency for ``prune_guidance`` and ordered
+          ``DISTINCT pr_id`` scans (supersedes the ``pr_id`` prefix index).
+        - ``test_id, status, ts, pr_id``: per-test failures in ``contingency``
+          (supersedes the ``test_id, status`` prefix index).
+        - ``pr_files (component, pr_id)``: touched PRs per component
+          (supersedes the ``component`` prefix index).
+        - ``prs (created_at)``: PRs recorded since the last analysis.
+        """
+        for stmt in (
+            "CREATE INDEX IF NOT EXISTS idx_test_events_status_ts"
+            " ON test_events (status, ts, component, test_id, pr_id)",
+            "CREATE INDEX IF NOT EXISTS idx_test_events_ts_pr ON test_events (ts, pr_id)",
+            "CREATE INDEX IF NOT EXISTS idx_test_events_pr_ts ON test_events (pr_id, ts)",
+            "DROP INDEX IF EXISTS idx_test_events_pr",
+            "CREATE INDEX IF NOT EXISTS idx_test_events_test_ts"
+            " ON test_events (test_id, status, ts, pr_id)",
+            "DROP INDEX IF EXISTS idx_test_events_test",
+            "CREATE INDEX IF NOT EXISTS idx_pr_files_component_pr ON pr_files (component, pr_id)",
+            "DROP INDEX IF EXISTS idx_pr_files_component",
+            "CREATE INDEX IF NOT EXISTS idx_prs_created_at ON prs (created_at)",
+        ):
+            cur.execute(stmt)
+
+    def _migrate_daily_summary(self, cur: sqlite3.Cursor) -> None:
+        """v3: per-day failure counts for events rolled up by ``compact``."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS test_event_daily (
+                day TEXT,
+                component TEXT,
+                test_id TEXT,
+                pr_id INTEGER,
+                failures INTEGER,
+                PRIMARY KEY (day, component, test_id, pr_id)
+            )
+            """
+        )
+
+    def _migrate_pass_summary(self, cur: sqlite3.Cursor) -> None:
+        """v4: per-(run, PR, suite) pass counts for ``failures_plus_summary``."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS test_pass_summary (
+                run_id TEXT,
+                pr_id INTEGER,
+                suite TEXT,
+                passed INTEGER,
+                duration_ms INTEGER,
+                ts TEXT,
+                PRIMARY KEY (run_id, pr_id, suite)
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_test_pass_summary_ts_pr"
+            " ON test_pass_summary (ts, pr_id)"
+        )
+
+    def _migrate_interned_names(self, cur: sqlite3.Cursor) -> None:
+        """v5: dictionary-encode test, suite and component names.
+
+        ``tests``, ``suites`` and ``components`` map each distinct name to an
+        integer id; ``test_events``, ``pr_files``, ``test_event_daily`` and
+        ``test_pass_summary`` are rebuilt to store those ids (``*_ref``
+        columns) instead of repeating the text on every row.
+        """
+        for kind in LOOKUP_TABLES:
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {kind} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+            )
+        for stmt in (
+            """
+            INSERT OR IGNORE INTO tests (name)
+            SELECT test_id FROM test_events WHERE test_id IS NOT NULL
+            UNION
+            SELECT test_id FROM test_event_daily WHERE test_id IS NOT NULL
+            """,
+            """
+            INSERT OR IGNORE INTO suites (name)
+            SELECT suite FROM test_events WHERE suite IS NOT NULL
+            UNION
+            SELECT suite FROM test_pass_summary WHERE suite IS NOT NULL
+            """,
+            """
+            INSERT OR IGNORE INTO components (name)
+            SELECT component FROM test_events WHERE component IS NOT NULL
+            UNION
+            SELECT component FROM pr_files WHERE component IS NOT NULL
+            UNION
+            SELECT component FROM test_event_daily WHERE component IS NOT NULL
+            """,
+            """
+            CREATE TABLE test_events_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                pr_id INTEGER,
+                commit_sha TEXT,
+                test_ref INTEGER REFERENCES tests (id),
+                suite_ref INTEGER REFERENCES suites (id),
+                status TEXT,
+                duration_ms INTEGER,
+                component_ref INTEGER REFERENCES components (id),
+                file_hint TEXT,
+                ts TEXT
+            )
+            """,
+            """
+            INSERT INTO test_events_new
+                (id, run_id, pr_id, commit_sha, test_ref, suite_ref, status, duration_ms,
+                 component_ref, file_hint, ts)
+            SELECT e.id, e.run_id, e.pr_id, e.commit_sha, t.id, s.id, e.status, e.duration_ms,
+                   c.id, e.file_hint, e.ts
+            FROM test_events e
+            LEFT JOIN tests t ON t.name = e.test_id
+            LEFT JOIN suites s ON s.name = e.suite
+            LEFT JOIN components c ON c.name = e.component
+            """,
+            "DROP TABLE test_events",
+            "ALTER TABLE test_events_new RENAME TO test_events",
+            """
+            CREATE TABLE pr_files_new (
+                pr_id INTEGER,
+                path TEXT,
+                status TEXT,
+                component_ref INTEGER REFERENCES components (id),
+                PRIMARY KEY (pr_id, path)
+            )
+            """,
+            """
+            INSERT INTO pr_files_new (pr_id, path, status, component_ref)
+            SELECT f.pr_id, f.path, f.status, c.id
+            FROM pr_files f LEFT JOIN components c ON c.name = f.component
+            """,
+            "DROP TABLE pr_files",
+            "ALTER TABLE pr_files_new RENAME TO pr_files",
+            """
+            CREATE TABLE test_event_daily_new (
+                day TEXT,
+                component_ref INTEGER REFERENCES components (id),
+                test_ref INTEGER REFERENCES tests (id),
+                pr_id INTEGER,
+                failures INTEGER,
+                PRIMARY KEY (day, component_ref, test_ref, pr_id)
+            )
+            """,
+            """
+            INSERT INTO test_event_daily_new (day, component_ref, test_ref, pr_id, failures)
+            SELECT d.day, c.id, t.id, d.pr_id, d.failures
+            FROM test_event_daily d
+            LEFT JOIN components c ON c.name = d.component
+            LEFT JOIN tests t ON t.name = d.test_id
+            """,
+            "DROP TABLE test_event_daily",
+            "ALTER TABLE test_event_daily_new RENAME TO test_event_daily",
+            """
+            CREATE TABLE test_pass_summary_new (
+                run_id TEXT,
+                pr_id INTEGER,
+                suite_ref INTEGER REFERENCES suites (id),
+                passed INTEGER,
+                duration_ms INTEGER,
+                ts TEXT,
+                PRIMARY KEY (run_id, pr_id, suite_ref)
+            )
+            """,
+            """
+            INSERT INTO test_pass_summary_new (run_id, pr_id, suite_ref, passed, duration_ms, ts)
+            SELECT p.run_id, p.pr_id, s.id, p.passed, p.duration_ms, p.ts
+            FROM test_pass_summary p LEFT JOIN suites s ON s.name = p.suite
+            """,
+            "DROP TABLE test_pass_summary",
+            "ALTER TABLE test_pass_summary_new RENAME TO test_pass_summary",
+            # Dropping the tables dropped their indexes; recreate them on the refs.
+            "CREATE INDEX idx_test_events_status_ts"
+            " ON test_events (status, ts, component_ref, test_ref, pr_id)",
+            "CREATE INDEX idx_test_events_ts_pr ON test_events (ts, pr_id)",
+            "CREATE INDEX idx_test_events_pr_ts ON test_events (pr_id, ts)",
+            "CREATE INDEX idx_test_events_test_ts ON test_events (test_ref, status, ts, pr_id)",
+            "CREATE INDEX idx_pr_files_component_pr ON pr_files (component_ref, pr_id)",
+            "CREATE INDEX idx_test_pass_summary_ts_pr ON test_pass_summary (ts, pr_id)",
+        ):
+            cur.execute(stmt)
+
+    def _migrate_pr_guidance(self, cur: sqlite3.Cursor) -> None:
+        """v6: materialized per-PR components and active guidance."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pr_guidance (
+                pr_id INTEGER PRIMARY KEY,
+                components TEXT,
+                guidance TEXT
+            )
+            """
+        )
+        self._refresh_pr_guidance(cur, None)
+
+    def _migrate_idempotent_ingest(self, cur: sqlite3.Cursor) -> None:
+        """v7: make (run_id, test, commit_sha) unique; track ingested files.
+
+        The unique run-key index is what ``record_test_events`` and
+        ``merge_from`` dedupe on.  Duplicate events left by re-run ingests are
+        deleted before it is created, keeping the earliest failure of each key
+        (else its earliest row), and the analysis state is reset so the next
+        ``analyze`` recounts without them.
+        """
+        for stmt in (
+            """
+            DELETE FROM test_events
+            WHERE run_id IS NOT NULL AND test_ref IS NOT NULL AND commit_sha IS NOT NULL
+              AND id NOT IN (
+                SELECT COALESCE(MIN(CASE WHEN status = 'failed' THEN id END), MIN(id))
+                FROM test_events GROUP BY run_id, test_ref, commit_sha
+              )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_test_events_run_key"
+            " ON test_events (run_id, test_ref, commit_sha)",
+            "DELETE FROM analysis_state",
+            """
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                sha256 TEXT,
+                pr_id INTEGER,
+                path TEXT,
+                run_id TEXT,
+                ingested_at TEXT,
+                PRIMARY KEY (sha256, pr_id)
+            )
+            """,
+        ):
+            cur.execute(stmt)
+
+    _MIGRATIONS = (
+        _migrate_base_schema,
+        _migrate_hot_path_indexes,
+        _migrate_daily_summary,
+        _migrate_pass_summary,
+        _migrate_interned_names,
+        _migrate_pr_guidance,
+        _migrate_idempotent_ingest,
+    )
+
+    # ------------------------- Name Interning ------------------------- #
+    def _ref(self, kind: str, name: str | None) -> int | None:
+        """Return the id of ``name`` in lookup table ``kind``, adding it if new.
+
+        Ids are memoized per connection.  Inside a transaction a rollback
+        may discard freshly assigned ids, so callers that roll back must
+        call :meth:`_forget_refs`.
+        """
+        if name is None:
+            return None
+        cache = self._refs[kind]
+        ref = cache.get(name)
+        if ref is None:
+            cur = self.conn.cursor()
+            cur.execute(f"INSERT OR IGNORE INTO {kind} (name) VALUES (?)", (name,))
+            cur.execute(f"SELECT id FROM {kind} WHERE name = ?", (name,))
+            ref = cache[name] = cur.fetchone()[0]
+        return ref
+
+    def _lookup_ref(self, kind: str, name: str) -> int | None:
+        """Return the id of ``name`` in ``kind`` without adding it."""
+        ref = self._refs[kind].get(name)
+        if ref is None:
+            row = self.conn.execute(f"SELECT id FROM {kind} WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                ref = self._refs[kind][name] = row[0]
+        return ref
+
+    def _forget_refs(self) -> None:
+        self._refs = {kind: {} for kind in LOOKUP_TABLES}
 
     # -------------------------- PR Metadata --------------------------- #
     def record_pr(
@@ -191,11 +655,17 @@ class Storage:
         for f in files:
             cur.execute(
                 """
-                INSERT OR REPLACE INTO pr_files (pr_id, path, status, component)
+                INSERT OR REPLACE INTO pr_files (pr_id, path, status, component_ref)
                 VALUES (?, ?, ?, ?)
                 """,
-                (pr_id, f["path"], f.get("status", ""), f.get("component", "unknown")),
+                (
+                    pr_id,
+                    f["path"],
+                    f.get("status", ""),
+                    self._ref("components", f.get("component", "unknown")),
+                ),
             )
+        self._refresh_pr_guidance(cur, [pr_id])
 
     # ------------------------- Test Events ---------------------------- #
     def record_test_event(
@@ -212,36 +682,205 @@ class Storage:
         ts: str,
     ) -> None:
         """Record a single test event for a given PR."""
-        self.conn.execute(
+        self.record_test_events(
+            [
+                {
+                    "run_id": run_id,
+                    "pr_id": pr_id,
+                    "commit_sha": commit_sha,
+                    "test_id": test_id,
+                    "suite": suite,
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    "component": component,
+                    "file_hint": file_hint,
+                    "ts": ts,
+                }
+            ]
+        )
+
+    def record_test_events(
+        self, events: Iterable[Dict], *, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """Record many test events inside a single transaction.
+
+        ``events`` is any iterable of dictionaries keyed like the arguments of
+        :meth:`record_test_event`; it is consumed lazily, ``chunk_size`` rows
+        at a time, so generators are never fully materialized.  Either every
+        event is stored or, on error, none are.  Each (run_id, test_id,
+        commit_sha) is stored once, so re-ingesting a run is a no-op; when one
+        run reports a test more than once (e.g. per-platform result files),
+        the failure wins over any other status, whatever the file order.  A
+        failure replacing a stored event is inserted as a new row, so
+        incremental analysis sees it.  Returns the number of events recorded.  Ingests of at least
+        ``ANALYZE_MIN_ROWS`` events refresh the planner statistics with a
+        sampled ``ANALYZE``.
+
+        In ``failures_plus_summary`` mode passed events are not stored
+        individually; they are counted per (run_id, pr_id, suite) and added to
+        ``test_pass_summary`` in the same transaction.  Those counts cannot be
+        deduplicated per test, which is why callers skip already-ingested
+        result files (:meth:`ingested_hashes`).
+
+        Test, suite and component names are stored as ids from the lookup
+        tables (see :meth:`_ref`).
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        summaries: Dict[Tuple, List] = {}
+        if self.event_mode == "failures_plus_summary":
+            events = self._fold_passes(events, summaries)
+        rows = (
+            (
+                evt.get("run_id"),
+                evt.get("pr_id"),
+                evt.get("commit_sha"),
+                self._ref("tests", evt.get("test_id")),
+                self._ref("suites", evt.get("suite")),
+                evt.get("status"),
+                evt.get("duration_ms"),
+                self._ref("components", evt.get("component")),
+                evt.get("file_hint"),
+                evt.get("ts"),
+            )
+            for evt in events
+        )
+        inserted = 0
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            while True:
+                chunk = self._worst_per_run_key(list(islice(rows, chunk_size)))
+                if not chunk:
+                    break
+                cur.executemany(
+                    """
+                    DELETE FROM test_events
+                    WHERE run_id = ? AND test_ref = ? AND commit_sha = ? AND status <> 'failed'
+                    """,
+                    [(row[0], row[3], row[2]) for row in chunk if row[5] == "failed"],
+                )
+                cur.executemany(
+                    """
+                    INSERT INTO test_events
+                      (run_id, pr_id, commit_sha, test_ref, suite_ref, status, duration_ms,
+                       component_ref, file_hint, ts)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (run_id, test_ref, commit_sha) DO NOTHING
+                    """,
+                    chunk,
+                )
+                inserted += cur.rowcount
+            self._add_pass_summaries(cur, summaries)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            self._forget_refs()
+            raise
+        cur.execute("COMMIT")
+        inserted += sum(summary[0] for summary in summaries.values())
+        if inserted >= ANALYZE_MIN_ROWS:
+            cur.execute("PRAGMA analysis_limit = 1000")
+            cur.execute("ANALYZE")
+        return inserted
+
+    @staticmethod
+    def _worst_per_run_key(rows: List[Tuple]) -> List[Tuple]:
+        """Collapse event rows sharing a run key, keeping a failure if any."""
+        kept: List[Tuple] = []
+        positions: Dict[Tuple, int] = {}
+        for row in rows:
+            key = (row[0], row[3], row[2])
+            if None in key:
+                kept.append(row)
+            elif key not in positions:
+                positions[key] = len(kept)
+                kept.append(row)
+            elif row[5] == "failed" and kept[positions[key]][5] != "failed":
+                kept[positions[key]] = row
+        return kept
+
+    @staticmethod
+    def _fold_passes(events: Iterable[Dict], summaries: Dict[Tuple, List]) -> Iterator[Dict]:
+        """Yield non-passing events; tally passes into ``summaries``."""
+        for evt in events:
+            if evt.get("status") != "passed":
+                yield evt
+                continue
+            key = (evt.get("run_id"), evt.get("pr_id"), evt.get("suite"))
+            summary = summaries.setdefault(key, [0, 0, evt.get("ts")])
+            summary[0] += 1
+            summary[1] += evt.get("duration_ms") or 0
+            summary[2] = max(summary[2] or "", evt.get("ts") or "")
+
+    def _add_pass_summaries(self, cur: sqlite3.Cursor, summaries: Dict[Tuple, List]) -> None:
+        cur.executemany(
             """
-            INSERT INTO test_events
-              (run_id, pr_id, commit_sha, test_id, suite, status, duration_ms, component, file_hint, ts)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO test_pass_summary (run_id, pr_id, suite_ref, passed, duration_ms, ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (run_id, pr_id, suite_ref) DO UPDATE SET
+              passed = passed + excluded.passed,
+              duration_ms = duration_ms + excluded.duration_ms,
+              ts = max(ts, excluded.ts)
             """,
-            (
-                run_id,
-                pr_id,
-                commit_sha,
-                test_id,
-                suite,
-                status,
-                duration_ms,
-                component,
-                file_hint,
-                ts,
-            ),
+            [
+                (run_id, pr_id, self._ref("suites", suite), *summary)
+                for (run_id, pr_id, suite), summary in summaries.items()
+            ],
         )
 
+    def ingested_hashes(self, pr_id: int, hashes: Iterable[str]) -> Set[str]:
+        """Return the subset of ``hashes`` already ingested for ``pr_id``.
+
+        Files are keyed per PR: identical reports from different PRs (e.g. an
+        all-green suite without timestamps) are separate evidence.
+        """
+        wanted = list(hashes)
+        seen: Set[str] = set()
+        cur = self.conn.cursor()
+        # Stay below SQLite's default limit of 999 bound parameters.
+        for start in range(0, len(wanted), 900):
+            batch = wanted[start : start + 900]
+            cur.execute(
+                "SELECT sha256 FROM ingested_files"
+                f" WHERE pr_id = ? AND sha256 IN ({','.join('?' * len(batch))})",
+                [pr_id, *batch],
+            )
+            seen.update(row[0] for row in cur.fetchall())
+        return seen
+
+    def record_ingested_files(self, files: Iterable[Dict]) -> None:
+        """Remember result files (``sha256``, ``path``, ``pr_id``, ``run_id``)."""
+        now = datetime.now(timezone.utc).isoformat()
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            cur.executemany(
+                """
+                INSERT OR IGNORE INTO ingested_files (sha256, pr_id, path, run_id, ingested_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(f["sha256"], f["pr_id"], f.get("path"), f.get("run_id"), now) for f in files],
+            )
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
     # ------------------------- Association Stats ---------------------- #
     def distinct_pairs(self, window_days: int) -> List[Tuple[str, str]]:
         """Return distinct (component, test_id) pairs in the window."""
-        cutoff = (datetime.now(timezone.utc) - timedelta(days=window_days)).isoformat()
+        cutoff = _window_cutoff(window_days)
         cur = self.conn.cursor()
         cur.execute(
             """
-            SELECT DISTINCT component, test_id
-            FROM test_events
-            WHERE ts >= ? AND status = 'failed'
+            SELECT c.name, t.name
+            FROM (
+                SELECT DISTINCT component_ref, test_ref
+                FROM test_events
+                WHERE ts >= ? AND status = 'failed'
+            ) p
+            JOIN components c ON c.id = p.component_ref
+            JOIN tests t ON t.id = p.test_ref
             """,
             (cutoff,),
         )
@@ -257,16 +896,16 @@ class Storage:
         C: PRs that did NOT touch component BUT failed the test.
         D: PRs that neither touched component nor failed the test.
         """
-        cutoff = (datetime.now(timezone.utc) - timedelta(days=window_days)).isoformat()
+        cutoff = _window_cutoff(window_days)
         cur = self.conn.cursor()
         # PRs that touched the component
         cur.execute(
             """
             SELECT DISTINCT pr_id
             FROM pr_files
-            WHERE component = ?
+            WHERE component_ref = ?
             """,
-            (component,),
+            (self._lookup_ref("components", component),),
         )
         touched = {row[0] for row in cur.fetchall()}
         # PRs that failed this test
@@ -274,19 +913,19 @@ class Storage:
             """
             SELECT DISTINCT pr_id
             FROM test_events
-            WHERE ts >= ? AND test_id = ? AND status = 'failed'
+            WHERE ts >= ? AND test_ref = ? AND status = 'failed'
             """,
-            (cutoff, test_id),
+            (cutoff, self._lookup_ref("tests", test_id)),
         )
         failed = {row[0] for row in cur.fetchall()}
         # Universe: PRs seen in the window (i.e. with test events)
         cur.execute(
             """
-            SELECT DISTINCT pr_id
-            FROM test_events
-            WHERE ts >= ?
+            SELECT pr_id FROM test_events WHERE ts >= :cutoff
+            UNION
+            SELECT pr_id FROM test_pass_summary WHERE ts >= :cutoff
             """,
-            (cutoff,),
+            {"cutoff": cutoff},
         )
         universe = {row[0] for row in cur.fetchall()}
         # Compute counts
@@ -296,6 +935,259 @@ class Storage:
         D = len(universe - touched - failed)
         return A, B, C, D
 
+    def contingency_table(
+        self,
+        window_days: int,
+        *,
+        components: Iterable[str] | None = None,
+        test_ids: Iterable[str] | None = None,
+    ) -> Dict[Tuple[str, str], Tuple[int, int, int, int]]:
+        """Compute (A,B,C,D) counts for every pair from ``distinct_pairs``.
+
+        Equivalent to calling :meth:`contingency` for each pair, but the
+        counts are aggregated in SQL so the whole table costs one statement
+        instead of three queries per pair.  The per-component touched counts
+        (T), the portion of those within the window universe (TU), the
+        per-test failure counts (F) and the universe size (N) give:
+
+          B = T - A,  C = F - A,  D = N - TU - F + A
+
+        When ``components`` or ``test_ids`` is given, only pairs whose
+        component or test appears in either collection are computed.
+        """
+        cutoff = _window_cutoff(window_days)
+        restrict = components is not None or test_ids is not None
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            WITH window_events AS (
+                SELECT pr_id, test_ref, component_ref, status
+                FROM test_events
+                WHERE ts >= :cutoff
+            ),
+            universe AS (
+                SELECT pr_id FROM window_events
+                UNION
+                SELECT pr_id FROM test_pass_summary WHERE ts >= :cutoff
+            ),
+            failed AS (
+                SELECT DISTINCT pr_id, test_ref
+                FROM window_events
+                WHERE status = 'failed'
+            ),
+            pairs AS (
+                SELECT DISTINCT component_ref, test_ref
+                FROM window_events
+                WHERE status = 'failed'
+                  AND component_ref IS NOT (SELECT id FROM components WHERE name = 'unknown')
+                  AND (
+                    :restrict = 0
+                    OR component_ref IN (
+                        SELECT c.id FROM components c
+                        JOIN json_each(:components) j ON j.value = c.name
+                    )
+                    OR test_ref IN (
+                        SELECT t.id FROM tests t
+                        JOIN json_each(:test_ids) j ON j.value = t.name
+                    )
+                  )
+            ),
+            touched AS (
+                SELECT DISTINCT component_ref, pr_id FROM pr_files
+            ),
+            touched_n AS (
+                SELECT t.component_ref,
+                       COUNT(*) AS t_all,
+                       COUNT(u.pr_id) AS t_universe
+                FROM touched t
+                LEFT JOIN universe u ON u.pr_id = t.pr_id
+                WHERE t.component_ref IN (SELECT component_ref FROM pairs)
+                GROUP BY t.component_ref
+            ),
+            failed_n AS (
+                SELECT test_ref, COUNT(*) AS f
+                FROM failed
+                GROUP BY test_ref
+            ),
+            both_n AS (
+                SELECT p.component_ref, p.test_ref, COUNT(*) AS a
+                FROM pairs p
+                JOIN failed f ON f.test_ref = p.test_ref
+                JOIN touched t ON t.pr_id = f.pr_id AND t.component_ref = p.component_ref
+                GROUP BY p.component_ref, p.test_ref
+            )
+            SELECT c.name,
+                   t.name,
+                   COALESCE(b.a, 0),
+                   COALESCE(tn.t_all, 0),
+                   COALESCE(tn.t_universe, 0),
+                   COALESCE(fn.f, 0),
+                   (SELECT COUNT(*) FROM universe)
+            FROM pairs p
+            JOIN components c ON c.id = p.component_ref
+            JOIN tests t ON t.id = p.test_ref
+            LEFT JOIN both_n b ON b.component_ref = p.component_ref AND b.test_ref = p.test_ref
+            LEFT JOIN touched_n tn ON tn.component_ref = p.component_ref
+            LEFT JOIN failed_n fn ON fn.test_ref = p.test_ref
+            """,
+            {
+                "cutoff": cutoff,
+                "restrict": int(restrict),
+                "components": json.dumps(sorted(components or [])),
+                "test_ids": json.dumps(sorted(test_ids or [])),
+            },
+        )
+        table: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {}
+        for component, test_id, a, t_all, t_universe, f, n in cur.fetchall():
+            table[(component, test_id)] = (a, t_all - a, f - a, n - t_universe - f + a)
+        return table
+
+    def universe_size(self, window_days: int) -> int:
+        """Return the number of distinct PRs with test events in the window."""
+        cutoff = _window_cutoff(window_days)
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT pr_id FROM test_events WHERE ts >= :cutoff
+                UNION
+                SELECT pr_id FROM test_pass_summary WHERE ts >= :cutoff
+            )
+            """,
+            {"cutoff": cutoff},
+        )
+        return cur.fetchone()[0]
+
+    # ------------------------- Incremental Analysis ------------------- #
+    def _analysis_state(self) -> Dict:
+        cur = self.conn.cursor()
+        cur.execute("SELECT key, value FROM analysis_state")
+        return {k: json.loads(v) for k, v in cur.fetchall()}
+
+    def _changed_since(self, state: Dict) -> Tuple[List[str], List[str]]:
+        """Return components and test IDs affected by data newer than ``state``.
+
+        Affected components are those of new test events plus every component
+        touched by a PR that received new events or pass summaries, or was
+        recorded after the last analysis; affected tests are those of new test
+        events.
+        """
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            WITH new_events AS (
+                SELECT pr_id, component_ref FROM test_events WHERE id > :last_id
+            ),
+            changed_prs AS (
+                SELECT pr_id FROM new_events
+                UNION
+                SELECT pr_id FROM test_pass_summary WHERE rowid > :last_summary_id
+                UNION
+                SELECT pr_id FROM prs WHERE created_at > :analyzed_at
+            )
+            SELECT name FROM components WHERE id IN (
+                SELECT component_ref FROM new_events
+                UNION
+                SELECT component_ref FROM pr_files WHERE pr_id IN (SELECT pr_id FROM changed_prs)
+            )
+            """,
+            {
+                "last_id": state["last_event_id"],
+                "last_summary_id": state.get("last_summary_id", 0),
+                "analyzed_at": state["analyzed_at"],
+            },
+        )
+        components = [row[0] for row in cur.fetchall()]
+        cur.execute(
+            "SELECT name FROM tests WHERE id IN (SELECT test_ref FROM test_events WHERE id > ?)",
+            (state["last_event_id"],),
+        )
+        test_ids = [row[0] for row in cur.fetchall()]
+        return components, test_ids
+
+    def analysis_snapshot(self, window_days: int, *, incremental: bool = False) -> Dict:
+        """Return contingency tables plus the high-water mark they reflect.
+
+        A full snapshot recomputes every pair.  An incremental snapshot reads
+        the mark left by :meth:`save_analysis` and recomputes only pairs whose
+        component or test appears in data recorded since; every other pair
+        reuses its cached counts, with ``D`` shifted by the growth of the PR
+        universe (new PRs touch neither its component nor its test, or the
+        pair would have been recomputed).  Events that age out of the window
+        are only accounted for by a full run, so schedule one periodically.
+
+        Falls back to a full snapshot when no mark exists or it was taken with
+        a different ``window_days``.
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM test_events")
+        last_event_id = cur.fetchone()[0]
+        cur.execute("SELECT COALESCE(MAX(rowid), 0) FROM test_pass_summary")
+        last_summary_id = cur.fetchone()[0]
+        analyzed_at = datetime.now(timezone.utc).isoformat()
+        universe = self.universe_size(window_days)
+        state = self._analysis_state() if incremental else {}
+        if state.get("window_days") != window_days:
+            tables = self.contingency_table(window_days)
+            return {
+                "tables": tables,
+                "recomputed": list(tables),
+                "full": True,
+                "last_event_id": last_event_id,
+                "last_summary_id": last_summary_id,
+                "analyzed_at": analyzed_at,
+                "universe": universe,
+                "window_days": window_days,
+            }
+        components, test_ids = self._changed_since(state)
+        fresh = self.contingency_table(
+            window_days, components=components, test_ids=test_ids
+        )
+        tables: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {}
+        cur.execute("SELECT component, test_id, a, b, c, d, universe FROM pair_stats")
+        for component, test_id, a, b, c, d, cached_universe in cur.fetchall():
+            tables[(component, test_id)] = (a, b, c, d + universe - cached_universe)
+        tables.update(fresh)
+        return {
+            "tables": tables,
+            "recomputed": list(fresh),
+            "full": False,
+            "last_event_id": last_event_id,
+            "last_summary_id": last_summary_id,
+            "analyzed_at": analyzed_at,
+            "universe": universe,
+            "window_days": window_days,
+        }
+
+    def save_analysis(self, snapshot: Dict) -> None:
+        """Persist recomputed pair counts and advance the high-water mark."""
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            if snapshot["full"]:
+                cur.execute("DELETE FROM pair_stats")
+            cur.executemany(
+                """
+                INSERT OR REPLACE INTO pair_stats (component, test_id, a, b, c, d, universe)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (*pair, *snapshot["tables"][pair], snapshot["universe"])
+                    for pair in snapshot["recomputed"]
+                ],
+            )
+            cur.executemany(
+                "INSERT OR REPLACE INTO analysis_state (key, value) VALUES (?, ?)",
+                [
+                    (key, json.dumps(snapshot[key]))
+                    for key in ("last_event_id", "last_summary_id", "analyzed_at", "window_days")
+                ],
+            )
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
     # -------------------------- Guidance ------------------------------ #
     def upsert_guidance(self, rule: Dict) -> None:
         """Insert or update a guidance record."""
@@ -379,78 +1271,486 @@ class Storage:
         )
         return [{"component": c, "test_id": t, "command": cmd} for c, t, cmd in cur.fetchall()]
 
+    def get_pr_guidance(self, pr_id: int) -> Dict:
+        """Return the components touched by a PR and their active guidance.
+
+        The answer is read from ``pr_guidance`` with a single primary-key
+        lookup: ``{"components": [...], "guidance": [{component, test_id,
+        command}, ...]}``.  PRs missing from the table are computed live.
+        """
+        cur = self.conn.cursor()
+        cur.execute("SELECT components, guidance FROM pr_guidance WHERE pr_id = ?", (pr_id,))
+        row = cur.fetchone()
+        if row is None:
+            components = self.get_components_for_pr(pr_id)
+            return {
+                "components": components,
+                "guidance": self.get_active_guidance_by_component(components),
+            }
+        return {"components": json.loads(row[0]), "guidance": json.loads(row[1])}
+
+    def refresh_pr_guidance(self, pr_ids: Iterable[int] | None = None) -> None:
+        """Rebuild ``pr_guidance`` rows for ``pr_ids`` (every PR when ``None``).
+
+        Call after guidance changes (analyze, prune); :meth:`record_pr`
+        refreshes its own PR.
+        """
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            self._refresh_pr_guidance(cur, pr_ids)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
+    @staticmethod
+    def _refresh_pr_guidance(cur: sqlite3.Cursor, pr_ids: Iterable[int] | None) -> None:
+        params = {
+            "all": int(pr_ids is None),
+            "pr_ids": json.dumps(sorted(set(pr_ids or []))),
+        }
+        cur.execute(
+            """
+            WITH selected AS (
+                SELECT pr_id FROM prs
+                WHERE :all = 1 OR pr_id IN (SELECT value FROM json_each(:pr_ids))
+                UNION
+                SELECT pr_id FROM pr_files
+                WHERE :all = 1 OR pr_id IN (SELECT value FROM json_each(:pr_ids))
+            ),
+            pr_components AS (
+                SELECT DISTINCT f.pr_id, c.name AS component
+                FROM pr_files f
+                JOIN components c ON c.id = f.component_ref
+                WHERE f.pr_id IN (SELECT pr_id FROM selected) AND c.name != 'unknown'
+            )
+            SELECT s.pr_id, pc.component, g.test_id, g.command
+            FROM selected s
+            LEFT JOIN pr_components pc ON pc.pr_id = s.pr_id
+            LEFT JOIN guidance g ON g.component = pc.component AND g.active = 1
+            ORDER BY s.pr_id, pc.component, g.rule_id
+            """,
+            params,
+        )
+        answers: Dict[int, Dict] = {}
+        for pr_id, component, test_id, command in cur.fetchall():
+            answer = answers.setdefault(pr_id, {"components": [], "guidance": []})
+            if component is None:
+                continue
+            if component not in answer["components"][-1:]:
+                answer["components"].append(component)
+            if test_id is not None:
+                answer["guidance"].append(
+                    {"component": component, "test_id": test_id, "command": command}
+                )
+        if pr_ids is None:
+            cur.execute("DELETE FROM pr_guidance")
+        cur.executemany(
+            "INSERT OR REPLACE INTO pr_guidance (pr_id, components, guidance) VALUES (?, ?, ?)",
+            [
+                (pr_id, json.dumps(a["components"]), json.dumps(a["guidance"]))
+                for pr_id, a in answers.items()
+            ],
+        )
+
+    def get_prs_for_components(self, components: Iterable[str]) -> List[int]:
+        """Return the ids of PRs touching any of ``components``."""
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT DISTINCT f.pr_id
+            FROM pr_files f
+            JOIN components c ON c.id = f.component_ref
+            WHERE c.name IN (SELECT value FROM json_each(?))
+            ORDER BY f.pr_id
+            """,
+            (json.dumps(sorted(set(components))),),
+        )
+        return [row[0] for row in cur.fetchall()]
+
     def get_components_for_pr(self, pr_id: int) -> List[str]:
         """Return a list of distinct components touched by the PR."""
         cur = self.conn.cursor()
         cur.execute(
             """
-            SELECT DISTINCT component
-            FROM pr_files
-            WHERE pr_id = ?
+            SELECT DISTINCT c.name
+            FROM pr_files f
+            JOIN components c ON c.id = f.component_ref
+            WHERE f.pr_id = ?
             """,
             (pr_id,),
         )
         return [row[0] for row in cur.fetchall() if row[0] != "unknown"]
 
-    def prune_guidance(self, window_days: int, last_n: int) -> None:
+    def prune_guidance(self, window_days: int, last_n: int | None) -> List[str]:
         """Deactivate guidance rules with insufficient recent evidence.
 
         A rule becomes inactive if:
-          - It has no failures in the last ``last_n`` PRs, OR
+          - It has no failures in the last ``last_n`` PRs (the PRs with the
+            most recent test events in the window; all of them when
+            ``last_n`` is ``None``), OR
           - Its lift drops below 1.5 when recomputed with current data.
+
+        Failure counts for every active rule come from one aggregate query,
+        lifts from the bulk :meth:`contingency_table`, and all deactivations
+        are applied in a single transaction.  Returns the sorted components
+        of the deactivated rules.
         """
-        cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=window_days)).isoformat()
+        cutoff_ts = _window_cutoff(window_days)
+        limit = last_n if last_n and last_n > 0 else -1
         cur = self.conn.cursor()
-        # Gather rule IDs
-        cur.execute("SELECT rule_id, component, test_id FROM guidance WHERE active = 1")
+        cur.execute(
+            """
+            WITH recent AS (
+                SELECT pr_id
+                FROM (
+                    SELECT pr_id, ts FROM test_events WHERE ts >= :cutoff
+                    UNION ALL
+                    SELECT pr_id, ts FROM test_pass_summary WHERE ts >= :cutoff
+                )
+                GROUP BY pr_id
+                ORDER BY MAX(ts) DESC, pr_id DESC
+                LIMIT :limit
+            ),
+            recent_failures AS (
+                SELECT DISTINCT component_ref, test_ref, pr_id
+                FROM test_events
+                WHERE ts >= :cutoff AND status = 'failed'
+                  AND pr_id IN (SELECT pr_id FROM recent)
+            )
+            SELECT g.rule_id, g.component, g.test_id, COUNT(f.pr_id)
+            FROM guidance g
+            LEFT JOIN components c ON c.name = g.component
+            LEFT JOIN tests t ON t.name = g.test_id
+            LEFT JOIN recent_failures f
+              ON f.component_ref = c.id AND f.test_ref = t.id
+            WHERE g.active = 1
+            GROUP BY g.rule_id, g.component, g.test_id
+            """,
+            {"cutoff": cutoff_ts, "limit": limit},
+        )
         rows = cur.fetchall()
-        for rule_id, component, test_id in rows:
-            # Count failures in window
+        stale = [rule_id for rule_id, _, _, cnt in rows if cnt < 1]
+        evidenced = [(rule_id, comp, test_id) for rule_id, comp, test_id, cnt in rows if cnt >= 1]
+        if evidenced:
+            tables = self.contingency_table(
+                window_days,
+                components={comp for _, comp, _ in evidenced},
+                test_ids={test_id for _, _, test_id in evidenced},
+            )
+            for rule_id, component, test_id in evidenced:
+                # Recompute lift with current data
+                A, B, C, D = tables.get((component, test_id)) or self.contingency(
+                    component, test_id, window_days
+                )
+                conf = A / max(A + B, 1)
+                base = C / max(C + D, 1)
+                lift = conf / max(base, 1e-6)
+                if lift < 1.5:
+                    stale.append(rule_id)
+        if not stale:
+            return []
+        cur.execute("BEGIN")
+        try:
+            for i in range(0, len(stale), 500):
+                chunk = stale[i : i + 500]
+                q = ",".join("?" for _ in chunk)
+                cur.execute(f"UPDATE guidance SET active = 0 WHERE rule_id IN ({q})", chunk)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        components = {rule_id: comp for rule_id, comp, _, _ in rows}
+        return sorted({components[rule_id] for rule_id in stale})
+
+    # --------------------------- Compaction ----------------------------- #
+    def compact(self, retention_days: int) -> Dict:
+        """Roll events older than ``retention_days`` into ``test_event_daily``.
+
+        Failures are summed per (day, component, test_id, pr_id); passed
+        events carry no signal once outside every analysis window and are
+        simply dropped.  The roll-up and the delete share one transaction.
+        Freed pages are then returned to the filesystem with an incremental
+        vacuum, converting the file to ``auto_vacuum=INCREMENTAL`` with a
+        one-off full ``VACUUM`` if it predates that setting.
+
+        Callers must keep ``retention_days`` at or above the analysis window
+        so that window queries still see every raw event.
+        """
+        if retention_days < 1:
+            raise ValueError("retention_days must be at least 1")
+        cutoff = _window_cutoff(retention_days)
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
             cur.execute(
                 """
-                SELECT COUNT(DISTINCT pr_id)
+                INSERT INTO test_event_daily (day, component_ref, test_ref, pr_id, failures)
+                SELECT substr(ts, 1, 10), component_ref, test_ref, pr_id, COUNT(*)
                 FROM test_events
-                WHERE ts >= ? AND component = ? AND test_id = ? AND status = 'failed'
+                WHERE ts < ? AND status = 'failed'
+                GROUP BY substr(ts, 1, 10), component_ref, test_ref, pr_id
+                ON CONFLICT (day, component_ref, test_ref, pr_id)
+                DO UPDATE SET failures = failures + excluded.failures
                 """,
-                (cutoff_ts, component, test_id),
+                (cutoff,),
             )
-            cnt = cur.fetchone()[0]
-            if cnt < 1:
-                self.conn.execute(
-                    "UPDATE guidance SET active = 0 WHERE rule_id = ?", (rule_id,)
-                )
-                continue
-            # Recompute lift with current data
-            A, B, C, D = self.contingency(component, test_id, window_days)
-            conf = A / max(A + B, 1)
-            base = C / max(C + D, 1)
-            lift = conf / max(base, 1e-6)
-            if lift < 1.5:
-                self.conn.execute(
-                    "UPDATE guidance SET active = 0 WHERE rule_id = ?", (rule_id,)
-                )
+            rolled_up = cur.rowcount
+            cur.execute("DELETE FROM test_events WHERE ts < ?", (cutoff,))
+            deleted = cur.rowcount
+            cur.execute("DELETE FROM test_pass_summary WHERE ts < ?", (cutoff,))
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+
+        cur.execute("PRAGMA page_count")
+        pages_before = cur.fetchone()[0]
+        cur.execute("PRAGMA auto_vacuum")
+        if cur.fetchone()[0] != 2:
+            cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            cur.execute("VACUUM")
+        cur.execute("PRAGMA incremental_vacuum")
+        cur.fetchall()
+        cur.execute("PRAGMA page_count")
+        pages_after = cur.fetchone()[0]
+        return {
+            "cutoff": cutoff,
+            "events_deleted": deleted,
+            "summary_rows": rolled_up,
+            "pages_freed": max(pages_before - pages_after, 0),
+        }
+
+    # ----------------------------- Merging ------------------------------ #
+    def merge_from(self, paths: Iterable[str | Path]) -> Dict:
+        """Copy the history of other rules-engine databases into this one.
+
+        Each source is attached with ``ATTACH DATABASE`` and copied with
+        set-based ``INSERT ... SELECT`` statements in one transaction per
+        source; lookup ids are remapped by name, since every database numbers
+        its tests, suites and components independently.
+
+          - test events already present under the same ``(run_id, test_id,
+            commit_sha)`` are skipped by the unique key, so overlapping copies
+            of one run are stored once, except that a failure replaces a
+            stored event of any other status (as in :meth:`record_test_events`);
+          - ``prs`` keep the existing row, filling in an empty branch/base and
+            the earliest ``created_at``; ``pr_files`` rows are added when the
+            (pr_id, path) is new;
+          - pass summaries and daily roll-ups are keyed by run or day, so
+            overlapping copies are not counted twice.
+
+        Guidance is not copied: the analysis state is reset so the next
+        ``analyze`` recomputes every pair on the merged data.  Returns
+        ``{"sources", "events_added", "events_skipped", "prs_added"}``.
+        """
+        totals = {"sources": 0, "events_added": 0, "events_skipped": 0, "prs_added": 0}
+        cur = self.conn.cursor()
+        for path in paths:
+            source = Path(path)
+            if not source.exists():
+                raise FileNotFoundError(f"No rules database at {source}")
+            if source.resolve() == self.path.resolve():
+                raise ValueError(f"Cannot merge {source} into itself")
+            # Bring the source up to the current schema before reading it.
+            Storage(str(source), read_only=True).close()
+            cur.execute("ATTACH DATABASE ? AS src", (source.as_posix(),))
+            try:
+                counts = self._merge_attached(cur)
+            finally:
+                cur.execute("DETACH DATABASE src")
+            totals["sources"] += 1
+            for key, value in counts.items():
+                totals[key] += value
+        self._forget_refs()
+        return totals
+
+    def _merge_attached(self, cur: sqlite3.Cursor) -> Dict:
+        """Copy the attached ``src`` database into ``main`` (one transaction)."""
+        cur.execute("BEGIN")
+        try:
+            for kind in LOOKUP_TABLES:
+                cur.execute(f"INSERT OR IGNORE INTO main.{kind} (name) SELECT name FROM src.{kind}")
+            cur.execute("SELECT COUNT(*) FROM main.prs")
+            prs_before = cur.fetchone()[0]
+            cur.execute(
+                """
+                INSERT INTO main.prs (pr_id, branch, base, labels, created_at)
+                SELECT pr_id, branch, base, labels, created_at FROM src.prs WHERE true
+                ON CONFLICT (pr_id) DO UPDATE SET
+                    branch = COALESCE(NULLIF(prs.branch, ''), excluded.branch),
+                    base = COALESCE(NULLIF(prs.base, ''), excluded.base),
+                    created_at = MIN(COALESCE(prs.created_at, excluded.created_at),
+                                     COALESCE(excluded.created_at, prs.created_at))
+                """
+            )
+            cur.execute("SELECT COUNT(*) FROM main.prs")
+            prs_added = cur.fetchone()[0] - prs_before
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO main.pr_files (pr_id, path, status, component_ref)
+                SELECT f.pr_id, f.path, f.status, mc.id
+                FROM src.pr_files f
+                LEFT JOIN src.components sc ON sc.id = f.component_ref
+                LEFT JOIN main.components mc ON mc.name = sc.name
+                """
+            )
+            cur.execute("SELECT COUNT(*) FROM src.test_events")
+            offered = cur.fetchone()[0]
+            cur.execute(
+                """
+                INSERT INTO main.test_events
+                    (run_id, pr_id, commit_sha, test_ref, suite_ref, status, duration_ms,
+                     component_ref, file_hint, ts)
+                SELECT e.run_id, e.pr_id, e.commit_sha, mt.id, ms.id, e.status, e.duration_ms,
+                       mc.id, e.file_hint, e.ts
+                FROM src.test_events e
+                LEFT JOIN src.tests st ON st.id = e.test_ref
+                LEFT JOIN main.tests mt ON mt.name = st.name
+                LEFT JOIN src.suites ss ON ss.id = e.suite_ref
+                LEFT JOIN main.suites ms ON ms.name = ss.name
+                LEFT JOIN src.components sc ON sc.id = e.component_ref
+                LEFT JOIN main.components mc ON mc.name = sc.name
+                WHERE true
+                ORDER BY e.id
+                ON CONFLICT (run_id, test_ref, commit_sha) DO UPDATE SET
+                    pr_id = excluded.pr_id,
+                    suite_ref = excluded.suite_ref,
+                    status = excluded.status,
+                    duration_ms = excluded.duration_ms,
+                    component_ref = excluded.component_ref,
+                    file_hint = excluded.file_hint,
+                    ts = excluded.ts
+                WHERE excluded.status = 'failed' AND test_events.status <> 'failed'
+                """
+            )
+            # Counts new rows and failures that replaced a stored event.
+            added = cur.rowcount
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO main.test_pass_summary
+                    (run_id, pr_id, suite_ref, passed, duration_ms, ts)
+                SELECT p.run_id, p.pr_id, ms.id, p.passed, p.duration_ms, p.ts
+                FROM src.test_pass_summary p
+                LEFT JOIN src.suites ss ON ss.id = p.suite_ref
+                LEFT JOIN main.suites ms ON ms.name = ss.name
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO main.test_event_daily (day, component_ref, test_ref, pr_id, failures)
+                SELECT d.day, mc.id, mt.id, d.pr_id, d.failures
+                FROM src.test_event_daily d
+                LEFT JOIN src.components sc ON sc.id = d.component_ref
+                LEFT JOIN main.components mc ON mc.name = sc.name
+                LEFT JOIN src.tests st ON st.id = d.test_ref
+                LEFT JOIN main.tests mt ON mt.name = st.name
+                WHERE true
+                ON CONFLICT (day, component_ref, test_ref, pr_id)
+                DO UPDATE SET failures = MAX(failures, excluded.failures)
+                """
+            )
+            cur.execute("DELETE FROM main.analysis_state")
+            self._refresh_pr_guidance(cur, None)
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        cur.execute("COMMIT")
+        return {"events_added": added, "events_skipped": offered - added, "prs_added": prs_added}
 
     # -------------------------- Export ------------------------------- #
     def export_stats(self) -> Dict:
-        """Return basic statistics about test events and guidance."""
+        """Return basic statistics about test events and guidance.
+
+        Passes folded into ``test_pass_summary`` count towards the total.
+        """
         cur = self.conn.cursor()
         cur.execute("SELECT COUNT(*) FROM test_events WHERE status='failed'")
         failed = cur.fetchone()[0]
-        cur.execute("SELECT COUNT(*) FROM test_events")
+        cur.execute(
+            "SELECT (SELECT COUNT(*) FROM test_events)"
+            " + (SELECT COALESCE(SUM(passed), 0) FROM test_pass_summary)"
+        )
         total = cur.fetchone()[0]
         cur.execute("SELECT COUNT(*) FROM guidance WHERE active=1")
         active = cur.fetchone()[0]
         return {"events_total": total, "events_failed": failed, "guidance_active": active}
 
+    def iter_events(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        """Yield stored test events, oldest first, ``chunk_size`` at a time.
+
+        Pages are fetched by ``id`` (keyset pagination), so each query is an
+        index range scan and memory stays bounded by one chunk.  Passes folded
+        into ``test_pass_summary`` are not individual events and are skipped.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        last_id = 0
+        while True:
+            rows = self.conn.execute(
+                """
+                SELECT e.id, e.run_id, e.pr_id, e.commit_sha, t.name, s.name,
+                       e.status, e.duration_ms, c.name, e.file_hint, e.ts
+                FROM test_events e
+                LEFT JOIN tests t ON t.id = e.test_ref
+                LEFT JOIN suites s ON s.id = e.suite_ref
+                LEFT JOIN components c ON c.id = e.component_ref
+                WHERE e.id > ?
+                ORDER BY e.id
+                LIMIT ?
+                """,
+                (last_id, chunk_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [dict(zip(TEST_EVENT_FIELDS, row[1:])) for row in rows]
+
 
 class InMemoryStorage(StorageProtocol):
-    """Simple in-memory storage used for tests."""
+    """Complete in-process backend with the same answers as :class:`Storage`.
+
+    Nothing touches the disk unless :meth:`save_snapshot` is called, which
+    makes it suitable for ephemeral CI jobs.  Besides the raw ``test_events``
+    list, ingestion maintains dict-of-set/dict indexes so the association
+    queries never scan events:
+
+      - ``_touched``: component -> PRs whose files map to it
+      - ``_failures``: test_id -> {pr_id: latest failure ts}
+      - ``_pair_failures``: (component, test_id) -> {pr_id: latest failure ts}
+      - ``_pr_last_seen``: pr_id -> latest event ts (the window universe)
+
+    Window membership is a comparison against the latest timestamp, so each
+    marginal is one pass over a single index entry, and
+    :meth:`contingency_table` computes the universe and each test's failures
+    once per call.
+    """
 
-    def __init__(self, path: str | None = None) -> None:
-        self.pr_files: Dict[int, List[Dict]] = {}
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        event_mode: str = "all",
+        read_only: bool = False,
+        pragmas: Dict | None = None,
+    ) -> None:
+        if event_mode not in EVENT_MODES:
+            raise ValueError(f"Unknown event_mode {event_mode!r}")
+        self.event_mode = event_mode
+        self.prs: Dict[int, Dict] = {}
+        self.pr_files: Dict[int, Dict[str, Dict]] = {}
         self.test_events: List[Dict] = []
-        self.guidance: List[Dict] = []
+        self.pass_summary: Dict[Tuple, List] = {}
+        self.guidance: Dict[str, Dict] = {}
+        self._touched: Dict[str, Set[int]] = {}
+        self._failures: Dict[str, Dict[int, str]] = {}
+        self._pair_failures: Dict[Tuple[str, str], Dict[int, str]] = {}
+        self._pr_last_seen: Dict[int, str] = {}
+        self._event_keys: Dict[Tuple, Dict] = {}
+        self.ingested_files: Dict[Tuple[str, int], Dict] = {}
 
+    # -------------------------- PR Metadata --------------------------- #
     def record_pr(
         self,
         *,
@@ -460,8 +1760,25 @@ class InMemoryStorage(StorageProtocol):
         labels: List[str],
         files: List[Dict],
     ) -> None:
-        self.pr_files[pr_id] = files
+        self.prs[pr_id] = {
+            "branch": branch,
+            "base": base,
+            "labels": list(labels),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        pr_files = self.pr_files.setdefault(pr_id, {})
+        for f in files:
+            pr_files[f["path"]] = {
+                "path": f["path"],
+                "status": f.get("status", ""),
+                "component": f.get("component", "unknown"),
+            }
+        for component, prs in self._touched.items():
+            prs.discard(pr_id)
+        for f in pr_files.values():
+            self._touched.setdefault(f["component"], set()).add(pr_id)
 
+    # ------------------------- Test Events ---------------------------- #
     def record_test_event(
         self,
         *,
@@ -476,49 +1793,265 @@ class InMemoryStorage(StorageProtocol):
         file_hint: str,
         ts: str,
     ) -> None:
-        self.test_events.append(
-            {
-                "run_id": run_id,
-                "pr_id": pr_id,
-                "commit_sha": commit_sha,
-                "test_id": test_id,
-                "suite": suite,
-                "status": status,
-                "duration_ms": duration_ms,
-                "component": component,
-                "file_hint": file_hint,
-                "ts": ts,
-            }
+        self.record_test_events(
+            [
+                {
+                    "run_id": run_id,
+                    "pr_id": pr_id,
+                    "commit_sha": commit_sha,
+                    "test_id": test_id,
+                    "suite": suite,
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    "component": component,
+                    "file_hint": file_hint,
+                    "ts": ts,
+                }
+            ]
         )
 
-    def distinct_pairs(self, window_days: int) -> Iterable[Tuple[str, str]]:
-        return []
+    def record_test_events(
+        self, events: Iterable[Dict], *, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        batch = [{k: evt.get(k) for k in TEST_EVENT_FIELDS} for evt in events]
+        return sum(self._index_event(evt) for evt in batch)
+
+    def _index_event(self, evt: Dict) -> bool:
+        """Index one event; return False if its run key was already stored.
+
+        A failure replaces a stored event of any other status under the same
+        key and moves to the end of ``test_events``, as the new row does in
+        :class:`Storage`.
+        """
+        pr_id, ts = evt["pr_id"], evt["ts"] or ""
+        if evt["status"] == "passed" and self.event_mode == "failures_plus_summary":
+            summary = self.pass_summary.setdefault(
+                (evt["run_id"], pr_id, evt["suite"]), [0, 0, ts]
+            )
+            summary[0] += 1
+            summary[1] += evt["duration_ms"] or 0
+            summary[2] = max(summary[2], ts)
+        else:
+            key = (evt["run_id"], evt["test_id"], evt["commit_sha"])
+            if None not in key:
+                stored = self._event_keys.get(key)
+                if stored is not None:
+                    if evt["status"] != "failed" or stored["status"] == "failed":
+                        return False
+                    # Rare (a test reported twice in one run), so the scan is fine.
+                    self.test_events.remove(stored)
+                self._event_keys[key] = evt
+            self.test_events.append(evt)
+        if ts > self._pr_last_seen.get(pr_id, ""):
+            self._pr_last_seen[pr_id] = ts
+        if evt["status"] != "failed":
+            return True
+        for index, key in (
+            (self._failures, evt["test_id"]),
+            (self._pair_failures, (evt["component"], evt["test_id"])),
+        ):
+            prs = index.setdefault(key, {})
+            if ts > prs.get(pr_id, ""):
+                prs[pr_id] = ts
+        return True
+
+    def ingested_hashes(self, pr_id: int, hashes: Iterable[str]) -> Set[str]:
+        return {sha for sha in hashes if (sha, pr_id) in self.ingested_files}
+
+    def record_ingested_files(self, files: Iterable[Dict]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        for f in files:
+            self.ingested_files.setdefault((f["sha256"], f["pr_id"]), {**f, "ingested_at": now})
+
+    # ------------------------- Association Stats ---------------------- #
+    def _universe(self, cutoff: str) -> Set[int]:
+        return {pr for pr, ts in self._pr_last_seen.items() if ts >= cutoff}
+
+    def _failed(self, test_id: str, cutoff: str) -> Set[int]:
+        return {pr for pr, ts in self._failures.get(test_id, {}).items() if ts >= cutoff}
+
+    def distinct_pairs(self, window_days: int) -> List[Tuple[str, str]]:
+        cutoff = _window_cutoff(window_days)
+        return [
+            pair
+            for pair, prs in self._pair_failures.items()
+            if pair[0] not in ("unknown", None) and max(prs.values()) >= cutoff
+        ]
 
     def contingency(
         self, component: str, test_id: str, window_days: int
     ) -> Tuple[int, int, int, int]:
-        return (0, 0, 0, 0)
+        cutoff = _window_cutoff(window_days)
+        return self._counts(
+            self._touched.get(component, set()),
+            self._failed(test_id, cutoff),
+            self._universe(cutoff),
+        )
 
+    @staticmethod
+    def _counts(
+        touched: Set[int], failed: Set[int], universe: Set[int]
+    ) -> Tuple[int, int, int, int]:
+        A = len(touched & failed)
+        B = len(touched - failed)
+        C = len(failed - touched)
+        D = len(universe - touched - failed)
+        return A, B, C, D
+
+    def contingency_table(
+        self,
+        window_days: int,
+        *,
+        components: Iterable[str] | None = None,
+        test_ids: Iterable[str] | None = None,
+    ) -> Dict[Tuple[str, str], Tuple[int, int, int, int]]:
+        """Counts for every pair of :meth:`distinct_pairs` (see ``Storage``)."""
+        cutoff = _window_cutoff(window_days)
+        pairs = self.distinct_pairs(window_days)
+        if components is not None or test_ids is not None:
+            comps, tests = set(components or []), set(test_ids or [])
+            pairs = [(c, t) for c, t in pairs if c in comps or t in tests]
+        universe = self._universe(cutoff)
+        failed: Dict[str, Set[int]] = {}
+        table: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {}
+        for component, test_id in pairs:
+            if test_id not in failed:
+                failed[test_id] = self._failed(test_id, cutoff)
+            table[(component, test_id)] = self._counts(
+                self._touched.get(component, set()), failed[test_id], universe
+            )
+        return table
+
+    def universe_size(self, window_days: int) -> int:
+        return len(self._universe(_window_cutoff(window_days)))
+
+    # -------------------------- Guidance ------------------------------ #
     def upsert_guidance(self, rule: Dict) -> None:
-        self.guidance.append(rule)
+        rule_id = rule.get("rule_id") or f"{rule.get('component')}::{rule.get('test_id')}"
+        now = datetime.now(timezone.utc).isoformat()
+        created_at = self.guidance.get(rule_id, {}).get("created_at", now)
+        self.guidance[rule_id] = {
+            **rule,
+            "rule_id": rule_id,
+            "active": 1,
+            "last_seen": now,
+            "created_at": created_at,
+        }
 
     def get_components_for_pr(self, pr_id: int) -> List[str]:
-        return [f["component"] for f in self.pr_files.get(pr_id, [])]
+        components: List[str] = []
+        for f in self.pr_files.get(pr_id, {}).values():
+            if f["component"] != "unknown" and f["component"] not in components:
+                components.append(f["component"])
+        return components
 
     def get_active_guidance_by_component(
         self, components: Iterable[str]
     ) -> List[Dict]:
-        return [g for g in self.guidance if g.get("component") in set(components)]
+        wanted = set(components)
+        return [
+            {"component": g["component"], "test_id": g["test_id"], "command": g.get("command")}
+            for g in self.guidance.values()
+            if g["active"] and g.get("component") in wanted
+        ]
 
     def get_active_guidance(self) -> List[Dict]:
-        return list(self.guidance)
+        active = [g for g in self.guidance.values() if g["active"]]
+        active.sort(key=lambda g: (g.get("component") or "", -(g.get("lift") or 0)))
+        return [{key: g.get(key) for key in GUIDANCE_FIELDS} for g in active]
 
-    def prune_guidance(self, window_days: int, last_n: int | None) -> None:
+    def prune_guidance(self, window_days: int, last_n: int | None) -> List[str]:
+        """Same rules and result as :meth:`Storage.prune_guidance`."""
+        cutoff = _window_cutoff(window_days)
+        recent = sorted(
+            self._universe(cutoff),
+            key=lambda pr: (self._pr_last_seen[pr], pr),
+            reverse=True,
+        )
+        if last_n and last_n > 0:
+            recent = recent[:last_n]
+        recent_set = set(recent)
+        tables = self.contingency_table(window_days)
+        pruned = set()
+        for rule in self.guidance.values():
+            if not rule["active"]:
+                continue
+            key = (rule.get("component"), rule.get("test_id"))
+            seen = self._pair_failures.get(key, {})
+            if not any(pr in recent_set and ts >= cutoff for pr, ts in seen.items()):
+                rule["active"] = 0
+                pruned.add(rule.get("component"))
+                continue
+            A, B, C, D = tables.get(key) or self.contingency(*key, window_days)
+            conf = A / max(A + B, 1)
+            base = C / max(C + D, 1)
+            if conf / max(base, 1e-6) < 1.5:
+                rule["active"] = 0
+                pruned.add(rule.get("component"))
+        return sorted(pruned)
+
+    # ------------------------- Snapshots ------------------------------ #
+    def save_snapshot(self, path: str | Path) -> None:
+        """Write the complete state to a JSON file."""
+        data = {
+            "event_mode": self.event_mode,
+            "prs": [
+                {"pr_id": pr_id, **meta, "files": list(self.pr_files.get(pr_id, {}).values())}
+                for pr_id, meta in self.prs.items()
+            ],
+            "test_events": self.test_events,
+            "pass_summary": [
+                [run_id, pr_id, suite, *summary]
+                for (run_id, pr_id, suite), summary in self.pass_summary.items()
+            ],
+            "guidance": list(self.guidance.values()),
+            "ingested_files": list(self.ingested_files.values()),
+        }
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def load_snapshot(self, path: str | Path) -> None:
+        """Merge the state saved by :meth:`save_snapshot` into this instance."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        for pr in data.get("prs", []):
+            self.record_pr(
+                pr_id=pr["pr_id"],
+                branch=pr.get("branch", ""),
+                base=pr.get("base", ""),
+                labels=pr.get("labels", []),
+                files=pr.get("files", []),
+            )
+            self.prs[pr["pr_id"]]["created_at"] = pr.get("created_at")
+        self.record_test_events(data.get("test_events", []))
+        for run_id, pr_id, suite, passed, duration_ms, ts in data.get("pass_summary", []):
+            summary = self.pass_summary.setdefault((run_id, pr_id, suite), [0, 0, ts])
+            summary[0] += passed
+            summary[1] += duration_ms
+            summary[2] = max(summary[2], ts)
+            if ts > self._pr_last_seen.get(pr_id, ""):
+                self._pr_last_seen[pr_id] = ts
+        for rule in data.get("guidance", []):
+            self.guidance[rule["rule_id"]] = rule
+        for f in data.get("ingested_files", []):
+            self.ingested_files.setdefault((f["sha256"], f["pr_id"]), f)
+
+    def close(self) -> None:
         return None
 
+    # -------------------------- Export ------------------------------- #
+    def iter_events(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        for start in range(0, len(self.test_events), chunk_size):
+            yield self.test_events[start : start + chunk_size]
+
     def export_stats(self) -> Dict:
         return {
-            "events_total": len(self.test_events),
+            "events_total": len(self.test_events)
+            + sum(summary[0] for summary in self.pass_summary.values()),
             "events_failed": len([e for e in self.test_events if e["status"] == "failed"]),
-            "guidance_active": len(self.guidance),
+            "guidance_active": len([g for g in self.guidance.values() if g["active"]]),
         }
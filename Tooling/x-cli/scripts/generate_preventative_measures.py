@@ -15,8 +15,8 @@ from scripts.lib.storage import Storage
 def render_section() -> str:
     """Return the Preventative Measures section as markdown."""
     config = load_config()
-    storage = Storage(config["storage"]["sqlite_path"])
-    guidance = storage.get_active_guidance()
+    with Storage(config["storage"]["sqlite_path"]) as storage:
+        guidance = storage.get_active_guidance()
     title = config.get("docs", {}).get("section_title", "Preventative Measures")
     lines = [f"## {title}", ""]
     for rule in guidance:
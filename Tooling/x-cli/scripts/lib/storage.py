@@ -44,7 +44,8 @@ def append_jsonl(path: str | Path, entry: dict[str, Any]) -> None:
 class Storage:
     """Guidance storage shim.
 
-    When codex_rules.storage is present, proxy to it. Otherwise, expose a
+    When codex_rules.storage is present, proxy to it (opened read-only, so
+    concurrent readers never wait on the write lock). Otherwise, expose a
     minimal API with empty responses so callers can proceed without failure.
     """
 
@@ -53,10 +54,21 @@ class Storage:
         try:
             from codex_rules.storage import Storage as _S  # type: ignore
 
-            self._impl = _S(sqlite_path)
+            self._impl = _S(sqlite_path, read_only=True)
         except Exception:
             self._impl = None
 
+    def close(self) -> None:
+        if self._impl is not None:
+            self._impl.close()
+            self._impl = None
+
+    def __enter__(self) -> "Storage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     def get_active_guidance(self) -> list[dict[str, Any]]:
         if self._impl is not None:
             try:
@@ -97,13 +97,20 @@ def reset_modules():
     for name in ("codex_rules.memory", "cli"):
         if name in sys.modules:
             targets.append(sys.modules[name])
-    try:
+    def _reset():
         for mod in targets:
+            # ``importlib.reload`` keeps the old namespace, so drop paths a
+            # test assigned before re-running the module body.
+            if mod.__name__ == "codex_rules.memory":
+                vars(mod).pop("REPO_ROOT", None)
+                vars(mod).pop("MEMORY_PATH", None)
             importlib.reload(mod)
+
+    try:
+        _reset()
         yield
     finally:
-        for mod in targets:
-            importlib.reload(mod)
+        _reset()
 
 
 @pytest.fixture
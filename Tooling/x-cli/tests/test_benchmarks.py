@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks import run_codex_rules
+from benchmarks.synthetic import generate_history
+
+
+def test_generate_history_is_seeded():
+    first = generate_history(prs=5, components=3, tests=6, seed=1)
+    assert first == generate_history(prs=5, components=3, tests=6, seed=1)
+    assert first != generate_history(prs=5, components=3, tests=6, seed=2)
+    assert [pr["pr_id"] for pr in first["prs"]] == [1, 2, 3, 4, 5]
+
+
+def test_run_times_every_stage_and_flags_regressions():
+    report = run_codex_rules.run(prs=4, components=2, tests=4, seed=3)
+
+    assert set(report["results"]) == set(run_codex_rules.BACKENDS)
+    for stages in report["results"].values():
+        assert list(stages) == list(run_codex_rules.STAGES)
+        assert stages["record-pr"]["ops"] == 4
+        assert stages["analyze"]["ops"] == 1
+
+    assert run_codex_rules.compare(report, report) == []
+    slower = {**report, "results": {"memory": {"analyze": {"per_op_ms": 1e9}}}}
+    regressions = run_codex_rules.compare(slower, report)
+    assert len(regressions) == 1 and regressions[0].startswith("memory/analyze: 1000000000.00 ms/op")
+    # Baselines recorded with other generator parameters are not comparable.
+    with pytest.raises(ValueError, match="baseline params"):
+        run_codex_rules.compare(slower, {**report, "params": {}})
+
+
+def test_repeat_is_not_a_generator_param():
+    report = run_codex_rules.run(prs=2, components=2, tests=2, seed=3, repeat=2, backends=["memory"])
+
+    assert report["repeat"] == 2
+    assert "repeat" not in report["params"]
+
+
+def test_main_fails_on_a_baseline_with_other_params(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    argv = ["--prs", "2", "--components", "2", "--tests", "2", "--backend", "memory"]
+    assert run_codex_rules.main([*argv, "--baseline", str(baseline), "--update-baseline"]) == 0
+
+    assert run_codex_rules.main([*argv, "--seed", "1", "--baseline", str(baseline)]) == 2
+    assert "Cannot compare with" in capsys.readouterr().err
+    # A different --repeat still compares.
+    assert run_codex_rules.main([*argv, "--repeat", "2", "--baseline", str(baseline), "--threshold", "1e9"]) == 0
@@ -0,0 +1,232 @@
+import argparse
+import json
+
+import pytest
+
+from codex_rules import cli
+from codex_rules.mapping import ComponentMapping
+from codex_rules.storage import InMemoryStorage
+
+
+def _write_reports(tmp_path, count: int) -> None:
+    for idx in range(count):
+        cases = "\n".join(
+            f'<testcase classname="suite{idx}" name="case{n}"'
+            + (' ><failure>boom</failure></testcase>' if n == idx else " />")
+            for n in range(3)
+        )
+        (tmp_path / f"report-{idx:02d}.xml").write_text(
+            f"<testsuite>{cases}</testsuite>", encoding="utf-8"
+        )
+
+
+def _ingest(tmp_path, jobs: int) -> InMemoryStorage:
+    storage = InMemoryStorage()
+    args = argparse.Namespace(
+        pr_id=7,
+        format="junit",
+        path=str(tmp_path / "report-*.xml"),
+        commit="abc",
+        run_id="run-1",
+        chunk_size=2,
+        jobs=jobs,
+    )
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+    return storage
+
+
+def test_parallel_ingest_matches_sequential_order(tmp_path, capsys):
+    _write_reports(tmp_path, 5)
+
+    sequential = _ingest(tmp_path, jobs=1)
+    capsys.readouterr()
+    parallel = _ingest(tmp_path, jobs=3)
+    err = capsys.readouterr().err
+
+    def key(storage):
+        return [(e["test_id"], e["status"]) for e in storage.test_events]
+
+    assert len(sequential.test_events) == 15
+    assert key(parallel) == key(sequential)
+    assert key(sequential)[:3] == [
+        ("suite0#case0", "failed"),
+        ("suite0#case1", "passed"),
+        ("suite0#case2", "passed"),
+    ]
+    assert err.count("[codex-rules] Parsed") == 5
+    assert err.index("report-00.xml") < err.index("report-04.xml")
+
+
+def test_parallel_ingest_bounds_files_in_flight(tmp_path, monkeypatch):
+    import concurrent.futures
+
+    _write_reports(tmp_path, 12)
+    submitted = []
+
+    class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            return super().submit(fn, *args)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", CountingExecutor)
+    storage = InMemoryStorage()
+    record = storage.record_test_events
+    in_flight = []
+
+    def tracked(events, **kwargs):
+        def watch():
+            for evt in events:
+                # report-NN.xml holds suiteNN; files before it are written.
+                written = int(evt["suite"][len("suite"):])
+                in_flight.append(len(submitted) - written)
+                yield evt
+
+        return record(watch(), **kwargs)
+
+    storage.record_test_events = tracked
+    args = argparse.Namespace(
+        pr_id=7, format="junit", path=str(tmp_path / "report-*.xml"), commit="abc",
+        run_id="run-1", chunk_size=2, jobs=2,
+    )
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+
+    assert len(storage.test_events) == 36
+    assert len(submitted) == 12
+    # The file being written plus the ones queued ahead of it.
+    assert max(in_flight) == 2 * cli.FILES_IN_FLIGHT_PER_WORKER + 1
+
+
+def test_compact_rejects_retention_shorter_than_window(tmp_path, capsys):
+    args = argparse.Namespace(retention_days=7, window_days=None)
+    config = {"window_days": 30, "storage": {}}
+    with pytest.raises(SystemExit) as exc:
+        cli.compact(args, cli.Storage(str(tmp_path / "rules.sqlite")), config)
+    assert exc.value.code == 2
+    assert "shorter than the 30-day analysis window" in capsys.readouterr().err
+
+
+def test_memory_storage_persists_through_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snapshot = tmp_path / "state.json"
+    for run_id, reports in (("run-1", 3), ("run-2", 4)):
+        # The second run only adds report-03; the snapshot remembers the rest.
+        _write_reports(tmp_path, reports)
+        cli.main(
+            [
+                "--storage", "memory", "--snapshot", str(snapshot),
+                "ingest-tests", "--pr", "7", "--run-id", run_id,
+                "--path", str(tmp_path / "report-*.xml"),
+            ]
+        )
+    out = tmp_path / "stats.json"
+    cli.main(
+        ["--storage", "memory", "--snapshot", str(snapshot), "export", "--what", "stats", "--out", str(out)]
+    )
+
+    stats = json.loads(out.read_text(encoding="utf-8"))
+    assert (stats["events_total"], stats["events_failed"]) == (12, 3)
+    assert not (tmp_path / ".codex" / "cache" / "rules_engine.sqlite").exists()
+
+
+def test_snapshot_requires_memory_storage(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["--snapshot", str(tmp_path / "s.json"), "prune"])
+    assert "--snapshot requires --storage memory" in capsys.readouterr().err
+
+
+def test_auto_format_ingests_mixed_reports_and_reports_unknown(tmp_path, capsys):
+    (tmp_path / "a.xml").write_text(
+        '<?xml version="1.0"?>\n<!-- junit --><testsuites><testsuite><testcase classname="j" name="x" />'
+        "</testsuite></testsuites>",
+        encoding="utf-8",
+    )
+    (tmp_path / "b.trx").write_text(
+        '<TestRun xmlns="http://microsoft.com/schemas/VisualStudio/TeamTest/2010"><Results>'
+        '<UnitTestResult testId="1" testName="T" outcome="Failed" /></Results></TestRun>',
+        encoding="utf-8",
+    )
+    (tmp_path / "c.json").write_text(
+        json.dumps({"created": 1, "tests": [{"nodeid": "t.py::test_a", "outcome": "passed"}]}), encoding="utf-8"
+    )
+    (tmp_path / "d.json").write_text(
+        json.dumps({"numTotalTests": 1, "testResults": [{"name": "s.js", "assertionResults": [{"title": "y"}]}]}),
+        encoding="utf-8",
+    )
+    (tmp_path / "e.txt").write_text("not a report", encoding="utf-8")
+    storage = InMemoryStorage()
+    args = argparse.Namespace(
+        pr_id=7, format="auto", path=str(tmp_path / "*.*"), commit="", run_id="r", chunk_size=100, jobs=1
+    )
+
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+
+    assert [(e["test_id"], e["status"]) for e in storage.test_events] == [
+        ("j#x", "passed"),
+        ("#T", "failed"),
+        ("t.py#test_a", "passed"),
+        ("s.js#y", "passed"),
+    ]
+    assert "unrecognised format: " + str(tmp_path / "e.txt") in capsys.readouterr().err
+
+
+def test_reingesting_a_run_is_idempotent(tmp_path, capsys):
+    _write_reports(tmp_path, 3)
+    storage = cli.Storage(str(tmp_path / "rules.sqlite"))
+    args = argparse.Namespace(
+        pr_id=7, format="junit", path=str(tmp_path / "report-*.xml"), commit="abc", run_id="run-1",
+        chunk_size=100, jobs=1,
+    )
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+    assert "Skipping 3 already-ingested file(s)" in capsys.readouterr().err
+    # The same report content is still new evidence for another PR.
+    other_pr = argparse.Namespace(**{**vars(args), "pr_id": 8, "commit": "def", "run_id": "run-2"})
+    cli.ingest_tests(other_pr, storage, ComponentMapping(tmp_path / "missing.yml"))
+    assert "already-ingested" not in capsys.readouterr().err
+
+    # Without the file hashes, the unique run key still drops the duplicates.
+    storage.conn.execute("DELETE FROM ingested_files")
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+
+    assert storage.export_stats()["events_total"] == 18
+    storage.close()
+
+
+@pytest.mark.parametrize("failing", ["a_x86.xml", "b_x64.xml"])
+def test_per_platform_reports_of_one_run_keep_the_failure(tmp_path, failing):
+    for name in ("a_x86.xml", "b_x64.xml"):
+        case = '<testcase classname="suite" name="case"'
+        case += "><failure>boom</failure></testcase>" if name == failing else " />"
+        (tmp_path / name).write_text(f"<testsuite>{case}</testsuite>", encoding="utf-8")
+    storage = cli.Storage(str(tmp_path / "rules.sqlite"))
+    args = argparse.Namespace(
+        pr_id=7, format="junit", path=str(tmp_path / "*.xml"), commit="abc", run_id="r1",
+        chunk_size=100, jobs=1,
+    )
+    cli.ingest_tests(args, storage, ComponentMapping(tmp_path / "missing.yml"))
+
+    assert storage.export_stats()["events_failed"] == 1
+    storage.close()
+
+
+def test_prune_refreshes_only_prs_of_pruned_components(tmp_path, monkeypatch):
+    storage = cli.Storage(str(tmp_path / "rules.sqlite"))
+    for pr_id, component in ((1, "core"), (2, "ui"), (3, "core")):
+        storage.record_pr(
+            pr_id=pr_id, branch="", base="", labels=[], files=[{"path": f"src/{pr_id}", "component": component}]
+        )
+    # No test events back the core rule, so prune deactivates it.
+    storage.upsert_guidance(
+        {
+            "rule_id": "r1", "component": "core", "test_id": "suite#t", "support_prs": 3,
+            "confidence": 1.0, "baseline": 0.0, "lift": 10.0, "p_value": 0.001,
+            "template": "t", "command": "make core",
+        }
+    )
+    refreshed = []
+    monkeypatch.setattr(storage, "refresh_pr_guidance", refreshed.append)
+
+    cli.prune(argparse.Namespace(window_days=None, last_n=None), storage, {})
+
+    assert refreshed == [[1, 3]]
+    storage.close()
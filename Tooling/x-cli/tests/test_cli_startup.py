@@ -0,0 +1,57 @@
+"""Startup-time checks for ``python -m codex_rules``."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+X_CLI_ROOT = Path(__file__).resolve().parents[1]
+
+# Wall-clock budget for ``--help``, generous enough for slow CI runners.
+HELP_BUDGET_S = 1.0
+
+# Modules ``--help`` must not import; subcommands load them on demand.
+LAZY_MODULES = (
+    "codex_rules.ingest.junit",
+    "codex_rules.ingest.jest_json",
+    "codex_rules.ingest.pytest_json",
+    "codex_rules.ingest.trx",
+    "codex_rules.compliance",
+    "codex_rules.correlate",
+    "codex_rules.guidance",
+    "codex_rules.memory",
+    "codex_rules.telemetry",
+    "concurrent.futures.process",
+)
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(X_CLI_ROOT))
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def test_help_imports_no_subcommand_modules():
+    probe = (
+        "import sys\n"
+        "from codex_rules import cli\n"
+        "try:\n"
+        "    cli.main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('\\n'.join(sorted(sys.modules)))\n"
+    )
+    loaded = set(_python("-c", probe).stdout.split())
+    assert not loaded & set(LAZY_MODULES)
+
+
+def test_help_finishes_within_budget():
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        out = _python("-m", "codex_rules", "--help").stdout
+        best = min(best, time.perf_counter() - start)
+    assert "codex rules engine" in out
+    assert best < HELP_BUDGET_S, f"--help took {best:.3f}s (budget {HELP_BUDGET_S}s)"
@@ -1,7 +1,90 @@
-import pytest
+"""Focused tests for ``codex_rules.storage.Storage.prune_guidance`` paths."""
 
+from datetime import datetime, timedelta, UTC
 
-@pytest.mark.skip(reason="Scaffold: add focused tests for codex_rules.storage prune_guidance paths")
-def test_prune_guidance_scaffold():
-    pass
+from codex_rules.storage import Storage
 
+
+def _rule(rule_id: str, component: str, test_id: str) -> dict:
+    return {
+        "rule_id": rule_id,
+        "component": component,
+        "test_id": test_id,
+        "support_prs": 1,
+        "confidence": 1.0,
+        "baseline": 0.0,
+        "lift": 10.0,
+        "p_value": 0.001,
+        "template": "t",
+        "command": f"run {component}",
+    }
+
+
+def _event(pr_id: int, status: str, component: str, test_id: str, age_minutes: int) -> dict:
+    ts = (datetime.now(UTC) - timedelta(minutes=age_minutes)).isoformat()
+    return {
+        "run_id": f"run-{pr_id}",
+        "pr_id": pr_id,
+        "commit_sha": "",
+        "test_id": test_id,
+        "suite": "s",
+        "status": status,
+        "duration_ms": 0,
+        "component": component,
+        "file_hint": "",
+        "ts": ts,
+    }
+
+
+def _seed(tmp_path) -> Storage:
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    # PRs 1-3 touched core and failed core#t long ago; PRs 4-9 are recent,
+    # touched ui, and only PR 9 failed ui#t.
+    for pr_id in range(1, 10):
+        comp = "core" if pr_id <= 3 else "ui"
+        store.record_pr(
+            pr_id=pr_id, branch="", base="", labels=[], files=[{"path": f"{comp}/{pr_id}", "component": comp}]
+        )
+    events = []
+    for pr_id in range(1, 10):
+        age = 1000 - pr_id  # higher PR ids are more recent
+        events.append(_event(pr_id, "failed" if pr_id <= 3 else "passed", "core", "core#t", age))
+        events.append(_event(pr_id, "failed" if pr_id == 9 else "passed", "ui", "ui#t", age))
+    store.record_test_events(events)
+    store.upsert_guidance(_rule("core", "core", "core#t"))
+    store.upsert_guidance(_rule("ui", "ui", "ui#t"))
+    store.upsert_guidance(_rule("gone", "docs", "docs#t"))
+    return store
+
+
+def test_prune_guidance_honors_last_n(tmp_path):
+    store = _seed(tmp_path)
+
+    # Only the 4 most recent PRs (6-9) count: core#t has no failures there.
+    store.prune_guidance(window_days=30, last_n=4)
+
+    assert [r["rule_id"] for r in store.get_active_guidance()] == ["ui"]
+    store.conn.close()
+
+
+def test_prune_guidance_without_last_n_uses_whole_window(tmp_path):
+    store = _seed(tmp_path)
+
+    store.prune_guidance(window_days=30, last_n=None)
+
+    assert sorted(r["rule_id"] for r in store.get_active_guidance()) == ["core", "ui"]
+    store.conn.close()
+
+
+def test_prune_guidance_deactivates_low_lift_rules(tmp_path):
+    store = _seed(tmp_path)
+    # core#t now also fails on every recent ui PR, so touching core no longer
+    # predicts the failure.
+    store.record_test_events(
+        _event(pr_id, "failed", "core", "core#t", 10) for pr_id in range(4, 10)
+    )
+
+    store.prune_guidance(window_days=30, last_n=None)
+
+    assert [r["rule_id"] for r in store.get_active_guidance()] == ["ui"]
+    store.conn.close()
@@ -42,3 +42,28 @@ def test_check_all_and_any_modes():
     compliant_any, missing_any = compliance.check(required, ["npm ci"], mode="any")
     assert compliant_any is False
     assert missing_any == required
+
+
+def test_evaluate_pr_reads_manifest_once(tmp_path, monkeypatch):
+    from codex_rules import cli
+    from codex_rules.storage import InMemoryStorage
+
+    storage = InMemoryStorage()
+    storage.record_pr(
+        pr_id=5, branch="", base="", labels=[], files=[{"path": "a", "component": "core"}]
+    )
+    storage.upsert_guidance({"component": "core", "test_id": "t", "command": "make core"})
+    manifest = tmp_path / "ran.json"
+    manifest.write_text(json.dumps({"ran": ["make core --fast"]}), encoding="utf-8")
+    calls = []
+    load_manifest = compliance.load_manifest
+    monkeypatch.setattr(
+        compliance, "load_manifest", lambda path: calls.append(path) or load_manifest(path)
+    )
+
+    evaluation = cli.evaluate_pr(storage, 5, str(manifest))
+
+    assert calls == [str(manifest)]
+    assert evaluation["components"] == ["core"]
+    assert evaluation["required"] == ["make core"]
+    assert evaluation["checked"] and evaluation["compliant"]
@@ -64,3 +64,90 @@ def test_fisher_exact_right_tail_matches_manual_values(table, expected):
     assert pytest.approx(calculated, rel=1e-9) == expected
     assert 0.0 <= calculated <= 1.0
 
+
+class BulkStorage(FakeStorage):
+    def __init__(self, tables):
+        super().__init__(tables)
+        self.bulk_calls: List[int] = []
+
+    def contingency_table(self, window_days: int) -> Dict[Tuple[str, str], Tuple[int, int, int, int]]:
+        self.bulk_calls.append(window_days)
+        return dict(self._tables)
+
+    def contingency(self, component: str, test_id: str, window_days: int) -> Tuple[int, int, int, int]:
+        raise AssertionError("per-pair lookup should not be used when contingency_table exists")
+
+
+def test_compute_candidates_prefers_bulk_contingency_table():
+    storage = BulkStorage({("compA", "testA"): (4, 1, 2, 30)})
+    thresholds = {"window_days": 14, "min_occurrences": 2, "min_lift": 2.0, "alpha": 0.05}
+
+    results = correlate.compute_candidates(storage, thresholds)
+
+    assert storage.bulk_calls == [14]
+    assert storage.window_days_calls == []
+    assert [(r["component"], r["test_id"]) for r in results] == [("compA", "testA")]
+
+
+def _exact_right_tail(a: int, b: int, c: int, d: int) -> float:
+    """Big-integer reference: the original ``math.comb`` sum, done exactly."""
+    from fractions import Fraction
+
+    row1, row2, col1 = a + b, c + d, a + c
+    n = row1 + row2
+    max_x = min(row1, col1)
+    if a > max_x:
+        return 0.0
+    term = math.comb(row1, a) * math.comb(row2, col1 - a)
+    numerator = term
+    for x in range(a, max_x):
+        # Successive products of binomials divide exactly.
+        term = term * (row1 - x) * (col1 - x) // ((x + 1) * (row2 - col1 + x + 1))
+        numerator += term
+    return float(min(Fraction(1), Fraction(numerator, math.comb(n, col1))))
+
+
+GOLDEN_TABLES = [
+    (0, 0, 0, 0),
+    (0, 5, 3, 9),
+    (1, 0, 0, 1),
+    (2, 8, 30, 40),
+    (3, 0, 10, 50),
+    (4, 1, 2, 30),
+    (5, 0, 500, 500),
+    (7, 3, 1, 12),
+    (10, 10, 10, 10),
+    (12, 2, 3, 140),
+    (20, 180, 35, 300),
+    (25, 5, 60, 410),
+    (40, 2, 9, 249),
+    (0, 120, 80, 300),
+    (60, 40, 90, 310),
+    # Thousands of PRs, where lgamma cancellation used to exceed 1e-12.
+    (2522, 164, 435, 26),
+    (3, 2018, 1, 2732),
+    (1480, 1520, 1500, 1500),
+    (35, 2965, 12, 2988),
+    (600, 2400, 550, 2450),
+]
+
+
+@pytest.mark.parametrize("table", GOLDEN_TABLES)
+def test_fisher_log_space_matches_exact_golden_values(table):
+    assert abs(correlate.fisher_exact_right_tail(*table) - _exact_right_tail(*table)) <= 1e-12
+
+
+def test_fisher_handles_large_tables():
+    # Strong association on thousands of PRs: tiny but neither NaN nor negative.
+    assert 0.0 <= correlate.fisher_exact_right_tail(900, 1100, 400, 2600) < 1e-100
+
+
+def test_fisher_numpy_path_matches_pure_python(monkeypatch):
+    np = pytest.importorskip("numpy")
+    table = (60, 40, 90, 310)
+    monkeypatch.setattr(correlate, "np", None)
+    correlate.fisher_exact_right_tail.cache_clear()
+    pure = correlate.fisher_exact_right_tail(*table)
+    monkeypatch.setattr(correlate, "np", np)
+    correlate.fisher_exact_right_tail.cache_clear()
+    assert abs(correlate.fisher_exact_right_tail(*table) - pure) <= 1e-12
@@ -0,0 +1,235 @@
+"""Tests for the ``serve`` daemon and its client shim."""
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+import pytest
+
+from codex_rules import client
+from codex_rules.config import load_config
+from codex_rules.daemon import RulesDaemon
+from codex_rules.mapping import ComponentMapping
+from codex_rules.storage import Storage
+
+X_CLI_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _seed(root: Path) -> None:
+    storage = Storage(str(root / ".codex" / "cache" / "rules_engine.sqlite"))
+    storage.record_pr(
+        pr_id=5, branch="", base="", labels=[], files=[{"path": "a", "component": "core"}]
+    )
+    storage.upsert_guidance(
+        {
+            "rule_id": "core::t",
+            "component": "core",
+            "test_id": "t",
+            "support_prs": 3,
+            "confidence": 0.5,
+            "baseline": 0.1,
+            "lift": 5.0,
+            "p_value": 0.001,
+            "template": "",
+            "command": "make core",
+        }
+    )
+    storage.refresh_pr_guidance()
+    storage.close()
+
+
+def _call(argv, address):
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        code = client.run(argv, address)
+    return code, out.getvalue(), err.getvalue()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def daemon(request, tmp_path, monkeypatch):
+    if request.param == "unix" and not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets unavailable")
+    monkeypatch.chdir(tmp_path)
+    _seed(tmp_path)
+    address = "d.sock" if request.param == "unix" else f"tcp://127.0.0.1:{_free_port()}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "codex_rules", "serve", "--address", address],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=str(X_CLI_ROOT)),
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            client.request({"op": "ping"}, address)
+            break
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                pytest.fail(f"daemon did not start: {proc.stderr.read()}")
+            time.sleep(0.05)
+    yield address
+    try:
+        client.request({"op": "shutdown"}, address)
+        proc.wait(timeout=10)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stderr.close()
+
+
+def test_daemon_answers_like_the_cli(daemon):
+    served = _call(["emit-warnings", "--pr", "5", "--stdout"], daemon)
+    assert served[0] == 0
+    assert "make core" in served[1]
+    assert client.request({"op": "ping"}, daemon)["served"] == 1
+
+    # Argument errors come back with argparse's exit code.
+    code, _, err = _call(["emit-warnings"], daemon)
+    assert code == 2 and "--pr" in err
+
+
+def test_warm_requests_are_fast(daemon):
+    _call(["emit-warnings", "--pr", "5"], daemon)
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        assert _call(["emit-warnings", "--pr", "5", "--stdout"], daemon)[0] == 0
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    # Typically ~1 ms; the bound leaves room for slow CI runners.
+    assert timings[len(timings) // 2] < 0.05
+
+
+def test_write_commands_fall_back_to_in_process(daemon, tmp_path):
+    (tmp_path / "files.json").write_text(json.dumps([{"path": "b", "status": "added"}]))
+
+    assert _call(["record-pr", "--pr", "6", "--files-json", "files.json"], daemon)[0] == 0
+
+    assert client.request({"op": "ping"}, daemon)["served"] == 0
+    storage = Storage(str(tmp_path / ".codex" / "cache" / "rules_engine.sqlite"), read_only=True)
+    assert storage.conn.execute("SELECT COUNT(*) FROM pr_files WHERE pr_id = 6").fetchone()[0] == 1
+    storage.close()
+
+
+def test_client_runs_in_process_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _seed(tmp_path)
+
+    code, out, _ = _call(["emit-warnings", "--pr", "5", "--stdout"], "missing.sock")
+
+    assert code == 0 and "make core" in out
+
+
+def test_tcp_addresses_must_be_loopback():
+    with pytest.raises(ValueError):
+        client.parse_address("tcp://0.0.0.0:8765")
+    assert client.parse_address("tcp://127.0.0.1:8765") == ("tcp", ("127.0.0.1", 8765))
+
+
+def _raw_request(payload, address):
+    """Send ``payload`` without the token the client would add."""
+    with client.connect(address) as sock:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def test_tcp_daemon_requires_its_token(daemon, tmp_path):
+    if not daemon.startswith(client.TCP_PREFIX):
+        pytest.skip("Unix sockets are protected by their file mode")
+    token_file = tmp_path / client.TOKEN_FILE
+    assert token_file.stat().st_mode & 0o077 == 0
+
+    for payload in ({"op": "ping"}, {"op": "shutdown", "token": "guess"}):
+        response = _raw_request(payload, daemon)
+        assert response["exit_code"] == 2 and "bad token" in response["stderr"]
+    assert client.request({"op": "ping"}, daemon)["ok"] is True
+
+
+def test_unix_socket_is_owner_only(daemon, tmp_path):
+    if daemon.startswith(client.TCP_PREFIX):
+        pytest.skip("TCP daemons are protected by their token")
+    assert (tmp_path / daemon).stat().st_mode & 0o077 == 0
+
+
+def test_daemon_confines_requests_to_its_root(daemon, tmp_path):
+    outside = tmp_path.parent / f"{tmp_path.name}-outside"
+    outside.mkdir()
+    argv = ["emit-warnings", "--pr", "5"]
+
+    response = client.request({"argv": argv, "cwd": str(outside)}, daemon)
+    assert response["exit_code"] == 2 and "outside" in response["stderr"]
+
+    for target in (str(outside / "profile.json"), "../escape.json"):
+        code, _, err = _call(["--profile", target, *argv], daemon)
+        assert code == 2 and "is outside" in err
+    assert list(outside.iterdir()) == []
+    assert not (tmp_path.parent / "escape.json").exists()
+
+    assert _call(["--profile", "profile.json", *argv], daemon)[0] == 0
+    assert (tmp_path / "profile.json").exists()
+
+
+def test_export_runs_in_process(daemon, tmp_path):
+    # Exports stream to their file; the daemon would buffer them whole.
+    assert _call(["export", "--what", "stats", "--out", "stats.json"], daemon)[0] == 0
+
+    assert client.request({"op": "ping"}, daemon)["served"] == 0
+    assert json.loads((tmp_path / "stats.json").read_text())["events_total"] == 0
+
+
+def test_stalled_connection_does_not_block_other_clients(daemon):
+    with client.connect(daemon):  # connects but never sends a request
+        start = time.perf_counter()
+        assert _call(["emit-warnings", "--pr", "5", "--stdout"], daemon)[0] == 0
+        assert time.perf_counter() - start < client.RESPONSE_TIMEOUT
+
+
+def test_client_falls_back_when_the_daemon_does_not_answer(tmp_path, monkeypatch):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets unavailable")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(client, "RESPONSE_TIMEOUT", 0.2)
+    _seed(tmp_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:
+        hung.bind("hung.sock")
+        hung.listen()  # accepts connections into the backlog, never answers
+
+        code, out, _ = _call(["emit-warnings", "--pr", "5", "--stdout"], "hung.sock")
+
+    assert code == 0 and "make core" in out
+
+
+def test_refresh_reopens_storage_when_sqlite_path_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _seed(tmp_path)
+    config = load_config()
+    storage = Storage(config["storage"]["sqlite_path"], read_only=True)
+    daemon = RulesDaemon(storage, ComponentMapping(tmp_path / "missing.yml"), config)
+    assert daemon.storage.get_components_for_pr(5) == ["core"]
+
+    other = Storage(str(tmp_path / "other.sqlite"))
+    other.record_pr(pr_id=5, branch="", base="", labels=[], files=[{"path": "b", "component": "ui"}])
+    other.close()
+    (tmp_path / ".codex" / "rules.yml").write_text(
+        json.dumps({"storage": {"sqlite_path": "other.sqlite"}}), encoding="utf-8"
+    )
+    daemon.refresh()
+
+    assert daemon.storage is not storage
+    assert daemon.storage.get_components_for_pr(5) == ["ui"]
+    daemon.storage.close()
@@ -0,0 +1,91 @@
+import pytest
+
+from codex_rules import cli
+from codex_rules.exchange import format_for_path, iter_events, write_events
+from codex_rules.storage import Storage
+
+from tests.test_storage_module import _seed_history
+
+
+def _export_import(tmp_path, out_name, fmt=None):
+    source = Storage(str(tmp_path / "source.sqlite"))
+    _seed_history(source, range(1, 12))
+    source.close()
+    out = tmp_path / out_name
+    fmt_args = ["--format", fmt] if fmt else []
+    cli.main(
+        ["export", "--what", "events", "--out", str(out), "--chunk-size", "7", *fmt_args],
+        storage=Storage(str(tmp_path / "source.sqlite"), read_only=True),
+    )
+    target = Storage(str(tmp_path / "target.sqlite"))
+    cli.main(["import", "--path", str(out), *fmt_args], storage=target)
+    return Storage(str(tmp_path / "source.sqlite")), target
+
+
+def test_ndjson_round_trip_preserves_events(tmp_path, capsys):
+    source, target = _export_import(tmp_path, "events.ndjson")
+
+    assert "Exported 44 events" in capsys.readouterr().err
+    assert [e for chunk in target.iter_events(5) for e in chunk] == [
+        e for chunk in source.iter_events(100) for e in chunk
+    ]
+    assert target.export_stats() == source.export_stats()
+    source.close()
+    target.close()
+
+
+@pytest.mark.parametrize("name", ["events.parquet", "events.arrow"])
+def test_columnar_round_trip(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    source, target = _export_import(tmp_path, name)
+
+    assert target.export_stats() == source.export_stats()
+    assert list(target.iter_events(50)) == list(source.iter_events(50))
+    source.close()
+    target.close()
+
+
+def test_write_events_streams_chunks(tmp_path):
+    def chunks():
+        for start in range(0, 6, 2):
+            yield [{"pr_id": n, "test_id": f"t{n}", "status": "failed"} for n in range(start, start + 2)]
+
+    path = tmp_path / "events.jsonl"
+    assert format_for_path(path) == "ndjson"
+    assert write_events(chunks(), path, "ndjson") == 6
+    rows = list(iter_events(path))
+    assert [r["test_id"] for r in rows] == [f"t{n}" for n in range(6)]
+    assert rows[0]["component"] is None
+
+
+def test_columnar_format_without_pyarrow_is_reported(tmp_path, monkeypatch, capsys):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name.startswith("pyarrow"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    with pytest.raises(SystemExit) as exc:
+        cli.main(
+            ["export", "--what", "events", "--out", str(tmp_path / "e.parquet")],
+            storage=Storage(str(tmp_path / "rules.sqlite")),
+        )
+    assert exc.value.code == 2
+    assert "requires pyarrow" in capsys.readouterr().err
+
+
+def test_import_carries_events_but_not_pr_metadata(tmp_path, capsys):
+    source, target = _export_import(tmp_path, "events.ndjson")
+
+    # Events only: the PRs' changed files stay behind, so no imported PR
+    # touches a component and nothing can correlate with a failure.
+    assert source.get_components_for_pr(1) == ["ui"]
+    assert any(a + b for a, b, _, _ in source.contingency_table(3650).values())
+    assert target.get_components_for_pr(1) == []
+    assert all(a + b == 0 for a, b, _, _ in target.contingency_table(3650).values())
+    source.close()
+    target.close()
@@ -1,6 +1,9 @@
 import json
 from pathlib import Path
 
+import pytest
+
+from codex_rules.ingest import jest_json
 from codex_rules.ingest.jest_json import parse_jest_json
 
 
@@ -44,3 +47,71 @@ def test_parse_jest_json_returns_empty_on_invalid(tmp_path):
     path.write_text(json.dumps({"testResults": None}), encoding="utf-8")
 
     assert parse_jest_json(str(path)) == []
+
+
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_iter_jest_json_streams_with_either_backend(tmp_path, monkeypatch, use_ijson):
+    if use_ijson:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(jest_json, "ijson", None)
+    suites = [
+        {
+            # Jest writes assertionResults before the suite name.
+            "assertionResults": [
+                {"title": f"case {n}", "status": "failed" if n == s else "passed", "duration": n,
+                 "failureMessages": ["trace" * 500]}
+                for n in range(3)
+            ],
+            "message": "m" * 1000,
+            "name": f"/repo/s{s}.test.js",
+            "perfStats": {"start": 1, "end": 2},
+        }
+        for s in range(3)
+    ]
+    suites.append({"testFilePath": "/repo/alt.test.js", "assertionResults": None})
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps({"numTotalTests": 9, "testResults": suites, "success": False}), encoding="utf-8")
+
+    events = list(jest_json.iter_jest_json(str(path)))
+
+    assert len(events) == 9
+    assert events[4] == {
+        "test_id": "s1.test.js#case 1",
+        "suite": "s1.test.js",
+        "status": "failed",
+        "duration_ms": 1,
+        "file": "/repo/s1.test.js",
+    }
+
+
+@pytest.mark.parametrize("read_size", range(1, 17))
+def test_iter_jest_json_at_every_read_size(tmp_path, monkeypatch, read_size):
+    from functools import partial
+
+    from codex_rules.ingest.jsonstream import JsonStream
+
+    monkeypatch.setattr(jest_json, "ijson", None)
+    payload = {
+        "startTime": 1.5e12,
+        "testResults": [
+            {
+                "assertionResults": [
+                    {"title": f"case {n}", "status": "passed", "duration": n + 0.5} for n in range(3)
+                ],
+                "endTime": 1712345678.125,
+                "name": f"/repo/s{s}.test.js",
+            }
+            for s in range(2)
+        ],
+    }
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    whole = list(jest_json.iter_jest_json(str(path)))
+
+    monkeypatch.setattr(jest_json, "JsonStream", partial(JsonStream, read_size=read_size))
+
+    assert list(jest_json.iter_jest_json(str(path))) == whole
+    assert [e["test_id"] for e in whole] == [
+        f"s{s}.test.js#case {n}" for s in range(2) for n in range(3)
+    ]
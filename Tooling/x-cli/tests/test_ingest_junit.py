@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from codex_rules.ingest.junit import parse_junit
+from codex_rules.ingest.junit import iter_junit, parse_junit
 
 
 def _write(tmp_path, text: str) -> Path:
@@ -38,3 +38,30 @@ def test_parse_junit_handles_failures_and_duration(tmp_path):
             "file": "beta.py",
         },
     ]
+
+
+def test_iter_junit_streams_nested_suites(tmp_path):
+    xml = """
+    <testsuites>
+      <testsuite name="outer">
+        <testsuite name="inner">
+          <testcase classname="a.B" name="one" time="1.5" />
+          <testcase classname="a.B" name="two"><error message="x">trace</error></testcase>
+        </testsuite>
+        <testcase classname="a.C" name="three" />
+      </testsuite>
+    </testsuites>
+    """
+    report = _write(tmp_path, xml)
+
+    stream = iter_junit(str(report))
+    first = next(stream)
+    rest = list(stream)
+
+    assert first["test_id"] == "a.B#one"
+    assert first["duration_ms"] == 1500
+    assert [(e["test_id"], e["status"]) for e in rest] == [
+        ("a.B#two", "failed"),
+        ("a.C#three", "passed"),
+    ]
+    assert parse_junit(str(report)) == [first, *rest]
@@ -1,6 +1,10 @@
+import io
 import json
 from pathlib import Path
 
+import pytest
+
+from codex_rules.ingest import pytest_json
 from codex_rules.ingest.pytest_json import parse_pytest_json
 
 
@@ -50,3 +54,101 @@ def test_parse_pytest_json_returns_empty_for_unknown(tmp_path):
     path.write_text(json.dumps({"tests": None}), encoding="utf-8")
 
     assert parse_pytest_json(str(path)) == []
+
+
+def _big_report(path, count):
+    tests = [
+        {
+            "nodeid": f"tests/test_big.py::test_{n}",
+            "outcome": "failed" if n % 4 == 0 else "passed",
+            "duration": 0.25,
+            "call": {"longrepr": "x" * 5000, "stdout": "log line\n" * 200},
+        }
+        for n in range(count)
+    ]
+    path.write_text(
+        json.dumps({"created": 1.5, "collectors": [{"nodeid": "", "result": []}], "tests": tests, "summary": {"total": count}}),
+        encoding="utf-8",
+    )
+
+
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_iter_pytest_json_streams_with_either_backend(tmp_path, monkeypatch, use_ijson):
+    if use_ijson:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(pytest_json, "ijson", None)
+    path = tmp_path / "big.json"
+    _big_report(path, 50)
+
+    stream = pytest_json.iter_pytest_json(str(path))
+    first = next(stream)
+    rest = list(stream)
+
+    assert first == {
+        "test_id": "tests/test_big.py#test_0",
+        "suite": "tests/test_big.py",
+        "status": "failed",
+        "duration_ms": 250,
+        "file": "tests/test_big.py",
+    }
+    assert len(rest) == 49
+    assert sum(e["status"] == "failed" for e in rest) == 12
+
+
+def test_json_stream_handles_values_split_across_reads():
+    from codex_rules.ingest.jsonstream import JsonStream
+
+    text = json.dumps({"skip": {"deep": [1, 2.5, "s" * 40]}, "tests": [12345, {"a": "b"}, None, -7e3]})
+    stream = JsonStream(io.StringIO(text), read_size=3)
+    values = []
+    for key in stream.members():
+        if key == "tests":
+            for _ in stream.elements():
+                values.append(stream.value())
+        else:
+            stream.value()
+    assert values == [12345, {"a": "b"}, None, -7000.0]
+
+
+def _walk(stream):
+    """Rebuild the next value by entering every container."""
+    char = stream.peek()
+    if char == "{":
+        return {key: _walk(stream) for key in stream.members()}
+    if char == "[":
+        return [_walk(stream) for _ in stream.elements()]
+    return stream.value()
+
+
+@pytest.mark.parametrize("read_size", range(1, 17))
+def test_json_stream_matches_json_loads_at_every_read_size(tmp_path, read_size):
+    from codex_rules.ingest.jsonstream import JsonStream
+
+    path = tmp_path / "report.json"
+    _big_report(path, 3)
+    report = json.loads(path.read_text(encoding="utf-8"))
+    # Numbers of every shape, including ones a small read cuts after "12." or "1e".
+    report.update({"duration": 3.25, "numbers": [12.5, 1e-7, -3.5E+12, 0, -0.0, 120, 7.0]})
+    text = json.dumps(report)
+
+    assert _walk(JsonStream(io.StringIO(text), read_size=read_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize("read_size", range(1, 17))
+def test_iter_pytest_json_at_every_read_size(tmp_path, monkeypatch, read_size):
+    from functools import partial
+
+    from codex_rules.ingest.jsonstream import JsonStream
+
+    monkeypatch.setattr(pytest_json, "ijson", None)
+    path = tmp_path / "big.json"
+    _big_report(path, 3)
+    report = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps({"duration": 3.25, **report}), encoding="utf-8")
+    whole = list(pytest_json.iter_pytest_json(str(path)))
+
+    monkeypatch.setattr(pytest_json, "JsonStream", partial(JsonStream, read_size=read_size))
+
+    assert list(pytest_json.iter_pytest_json(str(path))) == whole
+    assert [e["test_id"] for e in whole] == [t["nodeid"].replace("::", "#") for t in report["tests"]]
@@ -0,0 +1,71 @@
+from codex_rules.ingest.trx import iter_trx, parse_trx
+
+
+TRX = """<?xml version="1.0" encoding="utf-8"?>
+<TestRun id="run" xmlns="http://microsoft.com/schemas/VisualStudio/TeamTest/2010">
+  <Results>
+    <UnitTestResult testId="t1" testName="XCli.Tests.SrsTests.Parses" outcome="Passed" duration="00:00:00.2500000" />
+    <UnitTestResult testId="t2" testName="Rejects(input: &quot;x&quot;)" outcome="Failed" duration="00:01:02.0010000">
+      <Output><StdOut>captured log</StdOut><ErrorInfo><Message>boom</Message></ErrorInfo></Output>
+    </UnitTestResult>
+    <UnitTestResult testId="t3" testName="DataDriven" outcome="Failed" duration="bad">
+      <InnerResults>
+        <UnitTestResult testId="t3" testName="DataDriven (1)" outcome="Passed" />
+        <UnitTestResult testId="t3" testName="DataDriven (2)" outcome="Failed" />
+      </InnerResults>
+    </UnitTestResult>
+    <UnitTestResult testId="t4" testName="Skipped" outcome="NotExecuted" duration="00:00:00" />
+  </Results>
+  <TestDefinitions>
+    <UnitTest name="Parses" storage="/src/xcli.tests.dll" id="t1">
+      <TestMethod codeBase="/src/XCli.Tests.dll" className="XCli.Tests.SrsTests" name="Parses" />
+    </UnitTest>
+    <UnitTest name="Rejects" storage="/src/xcli.tests.dll" id="t2">
+      <TestMethod codeBase="/src/XCli.Tests.dll" className="XCli.Tests.SrsTests" name="Rejects" />
+    </UnitTest>
+    <UnitTest name="DataDriven" storage="/src/xcli.tests.dll" id="t3">
+      <TestMethod codeBase="/src/XCli.Tests.dll" className="XCli.Tests.Matrix" name="DataDriven" />
+    </UnitTest>
+  </TestDefinitions>
+  <ResultSummary outcome="Failed"><Counters total="4" passed="1" failed="2" /></ResultSummary>
+</TestRun>
+"""
+
+
+def test_parse_trx_joins_results_to_definitions(tmp_path):
+    path = tmp_path / "results.trx"
+    path.write_text(TRX, encoding="utf-8")
+
+    events = parse_trx(str(path))
+
+    assert events[:2] == [
+        {
+            "test_id": "XCli.Tests.SrsTests#Parses",
+            "suite": "XCli.Tests.SrsTests",
+            "status": "passed",
+            "duration_ms": 250,
+            "file": "/src/XCli.Tests.dll",
+        },
+        {
+            "test_id": 'XCli.Tests.SrsTests#Rejects(input: "x")',
+            "suite": "XCli.Tests.SrsTests",
+            "status": "failed",
+            "duration_ms": 62001,
+            "file": "/src/XCli.Tests.dll",
+        },
+    ]
+    # Inner data-driven rows fold into their parent result.
+    assert [(e["test_id"], e["status"], e["duration_ms"]) for e in events[2:]] == [
+        ("XCli.Tests.Matrix#DataDriven", "failed", 0),
+        ("#Skipped", "passed", 0),
+    ]
+
+
+def test_iter_trx_is_lazy(tmp_path):
+    path = tmp_path / "results.trx"
+    path.write_text(TRX, encoding="utf-8")
+
+    stream = iter_trx(str(path))
+
+    assert next(stream)["test_id"] == "XCli.Tests.SrsTests#Parses"
+    assert len(list(stream)) == 3
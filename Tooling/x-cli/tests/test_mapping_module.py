@@ -54,3 +54,81 @@ def test_component_mapping_json_fallback(tmp_path, monkeypatch):
 
     assert mapping.component_for_path("src/core/main.c") == "core"
     assert mapping.default_command_for("core") is None
+
+
+def _fnmatch_loop(components, path):
+    """Reference implementation: the original per-glob ``fnmatch`` loop."""
+    import fnmatch
+
+    norm = path.replace("\\", "/")
+    for comp, spec in components.items():
+        for pat in spec.get("globs", []):
+            if fnmatch.fnmatch(norm, pat):
+                return comp
+    return "unknown"
+
+
+def _synthetic_components(count: int) -> dict:
+    return {
+        f"comp{i:03d}": {
+            "globs": [
+                f"src/comp{i:03d}/*.py",
+                f"src/comp{i:03d}/**/*.cs",
+                f"tests/comp{i:03d}_*",
+                f"lib/*/comp{i:03d}/[a-m]*.vi",
+                f"docs/comp{i:03d}?.md",
+                f"tools/comp{i:03d}/*",
+            ]
+        }
+        for i in range(count)
+    }
+
+
+def test_compiled_matcher_keeps_first_match_wins(tmp_path):
+    mapping_path = tmp_path / "components.json"
+    mapping_path.write_text(
+        json.dumps(
+            {
+                "components": {
+                    "specific": {"globs": ["src/api/special.py"]},
+                    "api": {"globs": ["src/api/*"]},
+                    "catchall": {"globs": ["*"]},
+                    "never": {"globs": []},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    mapping = ComponentMapping(mapping_path)
+
+    assert mapping.component_for_path("src/api/special.py") == "specific"
+    assert mapping.component_for_path("src\\api\\other.py") == "api"
+    assert mapping.component_for_path("README.md") == "catchall"
+    assert mapping.component_for_path("README.md") == "catchall"  # cached
+
+
+def test_compiled_matcher_matches_fnmatch_loop(tmp_path):
+    """The compiled matcher agrees with the per-glob ``fnmatch`` loop."""
+    components = _synthetic_components(150)
+    mapping_path = tmp_path / "components.json"
+    mapping_path.write_text(json.dumps({"components": components}), encoding="utf-8")
+    mapping = ComponentMapping(mapping_path)
+
+    paths = []
+    for i in range(0, 150, 7):
+        paths += [
+            f"src/comp{i:03d}/module.py",
+            f"src/comp{i:03d}/deep/nested/file.cs",
+            f"src\\comp{i:03d}\\module.py",
+            f"lib/x/comp{i:03d}/build.vi",
+            f"lib/x/comp{i:03d}/zeta.vi",
+            f"docs/comp{i:03d}a.md",
+            f"tests/comp{i:03d}_unit.py",
+            "unmapped/file.txt",
+        ]
+    paths *= 2  # repeated paths are answered from the LRU cache
+
+    assert [mapping.component_for_path(p) for p in paths] == [
+        _fnmatch_loop(components, p) for p in paths
+    ]
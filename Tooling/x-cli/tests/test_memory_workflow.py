@@ -91,13 +91,18 @@ class MemoryWorkflowTests(unittest.TestCase):
     def test_memory_append_exit_code_on_stage_failure(self) -> None:
         # When staging the memory file fails, the command should exit non-zero.
         args = argparse.Namespace(summary="no git", author=None)
-        with patch(
+        with TemporaryDirectory() as tmpdir, patch.dict(
+            os.environ, {memory.REPO_ROOT_ENV: tmpdir}
+        ), patch(
             "codex_rules.cli.subprocess.run",
             side_effect=subprocess.CalledProcessError(1, ["git"]),
         ):
+            memory._repo_root.cache_clear()
+            self.addCleanup(memory._repo_root.cache_clear)
             with self.assertRaises(SystemExit) as cm:
                 cli.memory_append(args, {})
             self.assertNotEqual(cm.exception.code, 0)
+            self.assertTrue((Path(tmpdir) / ".codex" / "memory.json").exists())
 
     def test_memory_append_exit_code_on_append_failure(self) -> None:
         # When writing memory fails, the command should exit with the underlying code.
@@ -0,0 +1,65 @@
+import json
+
+from codex_rules import cli, profiling
+from codex_rules.profiling import Profiler, add_rows, profiled, span
+
+
+@profiled("stage")
+def _stage(rows):
+    with span("inner") as sp:
+        sp.rows = rows
+    add_rows(rows * 2)
+    return rows
+
+
+def test_spans_nest_and_count_rows():
+    with Profiler() as prof:
+        assert _stage(3) == 3
+    assert profiling.active() is None
+
+    inner, stage = prof.summary()["spans"]
+    assert (inner["name"], inner["rows"]) == ("stage/inner", 3)
+    assert (stage["name"], stage["rows"]) == ("stage", 6)
+    assert stage["wall_ms"] >= inner["wall_ms"] >= 0
+    assert set(stage) == {"name", "wall_ms", "cpu_ms", "rows", "peak_rss_kb"}
+
+
+def test_spans_are_noops_without_profiler():
+    with span("x") as sp:
+        sp.rows = 5
+        add_rows(1)
+    assert sp.rows is None
+    assert _stage(2) == 2
+
+
+def test_profile_flag_reports_workflow_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "files.json").write_text(json.dumps([{"path": "src/a.py", "status": "modified"}]))
+    (tmp_path / "results.xml").write_text(
+        '<testsuite name="s"><testcase classname="s" name="a"/>'
+        '<testcase classname="s" name="b"><failure/></testcase></testsuite>'
+    )
+
+    cli.main(
+        [
+            "--storage", "memory", "--profile", "profile.json",
+            "run-workflow", "--pr", "1", "--files-json", "files.json",
+            "--results-path", "results.xml", "--run-id", "r", "--commit", "c",
+            "--record-telemetry", "--srs-id", "FGC-REQ-TEL-001",
+        ]
+    )
+
+    profile = json.loads((tmp_path / "profile.json").read_text())
+    spans = {s["name"]: s for s in profile["spans"]}
+    assert profile["command"] == "run-workflow"
+    assert [name for name in spans if name.startswith("run-workflow/")] == [
+        "run-workflow/record-pr",
+        "run-workflow/ingest-tests",
+        "run-workflow/analyze",
+        "run-workflow/evaluate-pr",
+        "run-workflow/emit-warnings",
+    ]
+    assert spans["run-workflow/record-pr"]["rows"] == 1
+    assert spans["run-workflow/ingest-tests"]["rows"] == 2
+    entry = json.loads((tmp_path / ".codex" / "telemetry.json").read_text())["entries"][-1]
+    assert "run-workflow/emit-warnings" in [s["name"] for s in entry["profile"]["spans"]]
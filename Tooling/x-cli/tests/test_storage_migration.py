@@ -48,3 +48,170 @@ def test_migrates_commit_column_and_inserts(temp_dir: Path) -> None:
     assert cur.fetchone()[0] == "abc"
     storage.conn.close()
 
+
+def test_migrations_record_schema_version(temp_dir: Path) -> None:
+    db_path = temp_dir / "db.sqlite"
+    storage = Storage(db_path.as_posix())
+    version = storage.conn.execute("PRAGMA user_version").fetchone()[0]
+    assert version == len(Storage._MIGRATIONS)
+    storage.conn.close()
+
+    # Reopening an up-to-date database is a no-op.
+    storage = Storage(db_path.as_posix())
+    assert storage.conn.execute("PRAGMA user_version").fetchone()[0] == version
+    indexes = {
+        row[0]
+        for row in storage.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert "idx_test_events_status_ts" in indexes
+    assert "idx_test_events_test" not in indexes
+    storage.conn.close()
+
+
+HOT_TABLES = ("test_events", "pr_files", "prs")
+
+
+def _seed(storage: Storage, ts: str) -> None:
+    for pr_id in range(1, 40):
+        comp = f"comp{pr_id % 4}"
+        storage.record_pr(
+            pr_id=pr_id,
+            branch="",
+            base="",
+            labels=[],
+            files=[{"path": f"src/{comp}/{pr_id}.py", "status": "modified", "component": comp}],
+        )
+        storage.record_test_events(
+            {
+                "run_id": f"run-{pr_id}",
+                "pr_id": pr_id,
+                "commit_sha": f"sha-{pr_id}",
+                "test_id": f"suite#t{n}",
+                "suite": "suite",
+                "status": "failed" if (pr_id + n) % 5 == 0 else "passed",
+                "duration_ms": 1,
+                "component": comp,
+                "file_hint": "",
+                "ts": ts,
+            }
+            for n in range(6)
+        )
+
+
+def test_hot_queries_avoid_full_table_scans(temp_dir: Path) -> None:
+    """Every statement issued by the analyze/prune hot paths must be served
+    by an index: a plain ``SCAN <table>`` or a non-covering index walk over
+    the event tables is a regression."""
+    from datetime import UTC, datetime
+
+    storage = Storage((temp_dir / "db.sqlite").as_posix())
+    _seed(storage, datetime.now(UTC).isoformat())
+    storage.save_analysis(storage.analysis_snapshot(30))
+    storage.record_test_events(
+        [
+            {
+                "run_id": "run-99",
+                "pr_id": 99,
+                "commit_sha": "sha-99",
+                "test_id": "suite#t1",
+                "suite": "suite",
+                "status": "failed",
+                "duration_ms": 1,
+                "component": "comp1",
+                "file_hint": "",
+                "ts": datetime.now(UTC).isoformat(),
+            }
+        ]
+    )
+
+    statements: list[str] = []
+    storage.conn.set_trace_callback(statements.append)
+    list(storage.distinct_pairs(30))
+    storage.contingency("comp1", "suite#t1", 30)
+    storage.contingency_table(30)
+    storage.universe_size(30)
+    storage.analysis_snapshot(30, incremental=True)
+    storage.prune_guidance(30, 10)
+    storage.get_components_for_pr(1)
+    storage.conn.set_trace_callback(None)
+
+    queries = [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+    assert queries
+    for sql in queries:
+        plan = storage.conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+        for row in plan:
+            detail = row[3]
+            for table in HOT_TABLES:
+                if detail.startswith(f"SCAN {table}"):
+                    assert "USING COVERING INDEX" in detail, f"{detail!r} in:\n{sql}"
+    storage.conn.close()
+
+
+def test_interning_migration_preserves_text_rows(temp_dir: Path, monkeypatch) -> None:
+    db_path = (temp_dir / "db.sqlite").as_posix()
+    # Build a database at schema v4, where names were stored as text.
+    monkeypatch.setattr(Storage, "_MIGRATIONS", Storage._MIGRATIONS[:4])
+    legacy = Storage(db_path)
+    legacy.conn.execute(
+        "INSERT INTO pr_files (pr_id, path, status, component) VALUES (1, 'src/a.py', 'M', 'core')"
+    )
+    legacy.conn.execute(
+        """
+        INSERT INTO test_events
+          (run_id, pr_id, commit_sha, test_id, suite, status, duration_ms, component, file_hint, ts)
+        VALUES ('r', 1, 'abc', 'suite#case', 'suite', 'failed', 5, 'core', '', '9999-01-01')
+        """
+    )
+    legacy.conn.close()
+    monkeypatch.undo()
+
+    storage = Storage(db_path)
+    cols = [row[1] for row in storage.conn.execute("PRAGMA table_info(test_events)")]
+    assert {"test_ref", "suite_ref", "component_ref"} <= set(cols)
+    assert "test_id" not in cols
+    assert storage.get_components_for_pr(1) == ["core"]
+    assert storage.distinct_pairs(30) == [("core", "suite#case")]
+    assert storage.contingency("core", "suite#case", 30) == (1, 0, 0, 0)
+    # New events reuse the ids assigned during the migration.
+    storage.record_test_event(
+        run_id="r2",
+        pr_id=2,
+        commit_sha="def",
+        test_id="suite#case",
+        suite="suite",
+        status="failed",
+        duration_ms=0,
+        component="core",
+        file_hint="",
+        ts="9999-01-01",
+    )
+    assert storage.conn.execute("SELECT COUNT(*) FROM tests").fetchone()[0] == 1
+    storage.conn.close()
+
+
+def test_run_key_migration_drops_duplicate_events(temp_dir: Path, monkeypatch) -> None:
+    db_path = (temp_dir / "db.sqlite").as_posix()
+    # Build a database at schema v6, before (run_id, test, commit_sha) was unique.
+    monkeypatch.setattr(Storage, "_MIGRATIONS", Storage._MIGRATIONS[:6])
+    legacy = Storage(db_path)
+    event = dict(
+        run_id="r", pr_id=1, commit_sha="abc", test_id="suite#case", suite="suite", status="failed",
+        duration_ms=5, component="core", file_hint="", ts="9999-01-01",
+    )
+    # The failure of run "r" is kept even though a pass was stored first.
+    for run_id, status in (("r", "passed"), ("r", "failed"), ("r", "failed"), ("r2", "failed")):
+        legacy.conn.execute(
+            """
+            INSERT INTO test_events (run_id, pr_id, commit_sha, test_ref, status, ts)
+            VALUES (?, 1, 'abc', ?, ?, '9999-01-01')
+            """,
+            (run_id, legacy._ref("tests", "suite#case"), status),
+        )
+    legacy.conn.close()
+    monkeypatch.undo()
+
+    storage = Storage(db_path)
+    rows = storage.conn.execute("SELECT id, run_id FROM test_events ORDER BY id").fetchall()
+    assert rows == [(2, "r"), (4, "r2")]
+    assert storage.record_test_events([event]) == 0
+    storage.conn.close()
@@ -1,6 +1,9 @@
-from datetime import datetime, UTC
+import sqlite3
+from datetime import datetime, timedelta, UTC
 
-from codex_rules.storage import Storage
+import pytest
+
+from codex_rules.storage import InMemoryStorage, Storage
 
 
 DEFAULT_TS = datetime.now(UTC).isoformat()
@@ -94,3 +97,407 @@ def test_storage_records_and_queries(tmp_path):
     assert stats == {"events_total": 3, "events_failed": 2, "guidance_active": 0}
 
     store.conn.close()
+
+
+def test_contingency_table_matches_per_pair_contingency(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    components = ["core", "ui", "api"]
+    for pr_id in range(1, 13):
+        files = [
+            {"path": f"src/{components[pr_id % 3]}/{pr_id}", "component": components[pr_id % 3]}
+        ]
+        if pr_id % 4 == 0:
+            files.append({"path": f"src/api/extra{pr_id}", "component": "api"})
+        store.record_pr(pr_id=pr_id, branch="", base="", labels=[], files=files)
+    # PR 13 touches core but never runs tests, so it sits outside the universe.
+    store.record_pr(
+        pr_id=13, branch="", base="", labels=[], files=[{"path": "src/core/x", "component": "core"}]
+    )
+    for pr_id in range(1, 13):
+        for test_id in ("suite#alpha", "suite#beta"):
+            failed = (pr_id + len(test_id)) % 3 == 0 or (pr_id % 3 == 1 and test_id == "suite#alpha")
+            store.record_test_event(
+                **make_event(
+                    pr_id,
+                    status="failed" if failed else "passed",
+                    component=components[(pr_id + 1) % 3],
+                    test_id=test_id,
+                )
+            )
+    store.record_test_event(**make_event(5, status="failed", component="unknown", test_id="suite#gamma"))
+
+    table = store.contingency_table(30)
+
+    assert set(table) == set(store.distinct_pairs(30))
+    for (component, test_id), counts in table.items():
+        assert counts == store.contingency(component, test_id, 30)
+
+    store.conn.close()
+
+
+def test_record_test_events_bulk_inserts_in_chunks(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    events = (
+        make_event(pr_id, status="failed" if pr_id % 2 else "passed", component="core", test_id="suite#t")
+        for pr_id in range(1, 8)
+    )
+
+    inserted = store.record_test_events(events, chunk_size=3)
+
+    assert inserted == 7
+    assert store.export_stats()["events_total"] == 7
+    assert store.conn.in_transaction is False
+    store.conn.close()
+
+
+def test_record_test_events_rolls_back_on_error(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+
+    def events():
+        yield make_event(1, status="failed", component="core", test_id="suite#t")
+        yield make_event(2, status="failed", component="core", test_id="suite#t")
+        raise RuntimeError("parser blew up")
+
+    with pytest.raises(RuntimeError):
+        store.record_test_events(events(), chunk_size=1)
+
+    assert store.export_stats()["events_total"] == 0
+    store.conn.close()
+
+
+def _seed_history(store, pr_ids, components=("core", "ui", "api")):
+    for pr_id in pr_ids:
+        comp = components[pr_id % len(components)]
+        store.record_pr(
+            pr_id=pr_id, branch="", base="", labels=[], files=[{"path": f"src/{comp}/{pr_id}", "component": comp}]
+        )
+        store.record_test_events(
+            make_event(
+                pr_id,
+                status="failed" if (pr_id + n) % 3 == 0 else "passed",
+                component=components[(pr_id + n) % len(components)],
+                test_id=f"suite#t{n}",
+            )
+            for n in range(4)
+        )
+
+
+def test_incremental_snapshot_matches_full_recompute(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    _seed_history(store, range(1, 20))
+    first = store.analysis_snapshot(30, incremental=True)
+    assert first["full"] is True  # no high-water mark yet
+    store.save_analysis(first)
+
+    # One new PR touching a single component and failing one test.
+    store.record_pr(pr_id=50, branch="", base="", labels=[], files=[{"path": "src/ui/x", "component": "ui"}])
+    store.record_test_events(
+        [
+            make_event(50, status="failed", component="ui", test_id="suite#t1"),
+            make_event(50, status="passed", component="ui", test_id="suite#t2"),
+        ]
+    )
+
+    snapshot = store.analysis_snapshot(30, incremental=True)
+
+    assert snapshot["full"] is False
+    assert snapshot["tables"] == store.contingency_table(30)
+    assert 0 < len(snapshot["recomputed"]) < len(snapshot["tables"])
+    assert all(c == "ui" or t in {"suite#t1", "suite#t2"} for c, t in snapshot["recomputed"])
+
+    store.save_analysis(snapshot)
+    unchanged = store.analysis_snapshot(30, incremental=True)
+    assert unchanged["recomputed"] == []
+    assert unchanged["tables"] == snapshot["tables"]
+    store.conn.close()
+
+
+def test_compact_rolls_up_old_events_and_keeps_window(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    _seed_history(store, range(1, 20))
+    old_ts = (datetime.now(UTC) - timedelta(days=200)).isoformat()
+    old = []
+    for pr_id in (100, 101):
+        for status in ("failed", "failed", "passed"):
+            evt = make_event(pr_id, status=status, component="core", test_id="suite#t0")
+            evt["ts"] = old_ts
+            old.append(evt)
+    store.record_test_events(old)
+    before = store.contingency_table(30)
+
+    result = store.compact(90)
+
+    # One run stores each test once, keeping the failure.
+    assert result["events_deleted"] == 2
+    assert store.contingency_table(30) == before
+    assert store.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    rows = store.conn.execute(
+        """
+        SELECT d.day, c.name, t.name, d.pr_id, d.failures
+        FROM test_event_daily d
+        JOIN components c ON c.id = d.component_ref
+        JOIN tests t ON t.id = d.test_ref
+        ORDER BY d.pr_id
+        """
+    ).fetchall()
+    assert rows == [
+        (old_ts[:10], "core", "suite#t0", 100, 1),
+        (old_ts[:10], "core", "suite#t0", 101, 1),
+    ]
+    # Nothing left to roll up: a second pass is a no-op.
+    assert store.compact(90)["events_deleted"] == 0
+    store.conn.close()
+
+
+def test_failures_plus_summary_mode_matches_full_event_storage(tmp_path):
+    full = Storage(str(tmp_path / "full.sqlite"))
+    summary = Storage(str(tmp_path / "summary.sqlite"), event_mode="failures_plus_summary")
+    for store in (full, summary):
+        _seed_history(store, range(1, 20))
+        # A PR whose tests all passed still belongs to the universe.
+        store.record_test_events(
+            [make_event(60, status="passed", component="core", test_id=f"suite#t{n}") for n in range(3)]
+        )
+
+    assert summary.contingency_table(30) == full.contingency_table(30)
+    assert summary.universe_size(30) == full.universe_size(30) == 20
+    assert summary.contingency("ui", "suite#t1", 30) == full.contingency("ui", "suite#t1", 30)
+    assert summary.export_stats() == full.export_stats()
+
+    stored = summary.conn.execute("SELECT COUNT(*) FROM test_events").fetchone()[0]
+    assert stored == summary.export_stats()["events_failed"]
+    passed, duration = summary.conn.execute(
+        "SELECT passed, duration_ms FROM test_pass_summary WHERE pr_id = 60"
+    ).fetchone()
+    assert (passed, duration) == (3, 126)
+    full.conn.close()
+    summary.conn.close()
+
+
+def test_read_only_storage_reads_alongside_a_writer(tmp_path):
+    db = str(tmp_path / "rules.sqlite")
+    with Storage(db) as writer:
+        _seed_history(writer, range(1, 6))
+        writer.upsert_guidance(
+            {
+                "rule_id": "r1",
+                "component": "core",
+                "test_id": "suite#t0",
+                "support_prs": 1,
+                "confidence": 1.0,
+                "baseline": 0.1,
+                "lift": 10.0,
+                "p_value": 0.001,
+                "template": "",
+                "command": "make core",
+            }
+        )
+        # A write transaction in progress must not block readers.
+        writer.conn.execute("BEGIN IMMEDIATE")
+        with Storage(db, read_only=True) as reader:
+            assert [g["rule_id"] for g in reader.get_active_guidance()] == ["r1"]
+            assert reader.export_stats()["events_total"] == 20
+            with pytest.raises(sqlite3.OperationalError):
+                reader.upsert_guidance({**reader.get_active_guidance()[0], "template": "", "command": ""})
+        writer.conn.execute("COMMIT")
+
+
+def test_read_only_storage_creates_missing_database(tmp_path):
+    db = tmp_path / "cache" / "rules.sqlite"
+    with Storage(str(db), read_only=True) as reader:
+        assert reader.get_active_guidance() == []
+    assert db.exists()
+
+
+def test_storage_applies_configured_pragmas(tmp_path):
+    with Storage(str(tmp_path / "rules.sqlite"), pragmas={"cache_size": -2048}) as store:
+        assert store.conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+        assert store.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert store.conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    with pytest.raises(ValueError):
+        Storage(str(tmp_path / "other.sqlite"), pragmas={"journal_mode": "DELETE"})
+    with pytest.raises(ValueError):
+        Storage(str(tmp_path / "other.sqlite"), pragmas={"cache_size": "1; DROP TABLE prs"})
+
+
+def _rule(rule_id: str, component: str, command: str) -> dict:
+    return {
+        "rule_id": rule_id,
+        "component": component,
+        "test_id": f"suite#{rule_id}",
+        "support_prs": 3,
+        "confidence": 0.5,
+        "baseline": 0.1,
+        "lift": 5.0,
+        "p_value": 0.001,
+        "template": "",
+        "command": command,
+    }
+
+
+def test_pr_guidance_is_one_lookup_and_follows_refresh(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    store.upsert_guidance(_rule("r1", "core", "make core"))
+    files = [
+        {"path": "src/core/a", "component": "core"},
+        {"path": "src/ui/b", "component": "ui"},
+        {"path": "README", "component": "unknown"},
+    ]
+    store.record_pr(pr_id=1, branch="", base="", labels=[], files=files)
+
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    answer = store.get_pr_guidance(1)
+    store.conn.set_trace_callback(None)
+    assert len(statements) == 1
+    assert answer == {
+        "components": ["core", "ui"],
+        "guidance": [{"component": "core", "test_id": "suite#r1", "command": "make core"}],
+    }
+
+    # New guidance is visible once the table is refreshed.
+    store.upsert_guidance(_rule("r2", "ui", "make ui"))
+    assert len(store.get_pr_guidance(1)["guidance"]) == 1
+    store.refresh_pr_guidance()
+    assert [g["command"] for g in store.get_pr_guidance(1)["guidance"]] == ["make core", "make ui"]
+    # Unknown PRs fall back to a live computation.
+    assert store.get_pr_guidance(99) == {"components": [], "guidance": []}
+    store.close()
+
+
+def test_refresh_pr_guidance_for_touched_components(tmp_path):
+    store = Storage(str(tmp_path / "rules.sqlite"))
+    for pr_id, component in ((1, "core"), (2, "ui"), (3, "core")):
+        store.record_pr(
+            pr_id=pr_id, branch="", base="", labels=[], files=[{"path": f"src/{pr_id}", "component": component}]
+        )
+    assert store.get_prs_for_components(["core"]) == [1, 3]
+    assert store.get_prs_for_components([]) == []
+
+    store.upsert_guidance(_rule("r1", "core", "make core"))
+    store.upsert_guidance(_rule("r2", "ui", "make ui"))
+    store.refresh_pr_guidance(store.get_prs_for_components(["core"]))
+    assert [g["command"] for g in store.get_pr_guidance(1)["guidance"]] == ["make core"]
+    assert [g["command"] for g in store.get_pr_guidance(3)["guidance"]] == ["make core"]
+    # PR 2 was not refreshed and still has its stored, empty answer.
+    assert store.get_pr_guidance(2)["guidance"] == []
+    store.close()
+
+
+@pytest.mark.parametrize("event_mode", ["all", "failures_plus_summary"])
+def test_in_memory_storage_matches_sqlite(tmp_path, event_mode):
+    sqlite = Storage(str(tmp_path / "rules.sqlite"), event_mode=event_mode)
+    memory = InMemoryStorage(event_mode=event_mode)
+    old_ts = (datetime.now(UTC) - timedelta(days=60)).isoformat()
+    for store in (sqlite, memory):
+        _seed_history(store, range(1, 25))
+        store.record_pr(pr_id=70, branch="", base="", labels=[], files=[{"path": "docs/x", "component": "unknown"}])
+        store.record_pr(pr_id=3, branch="", base="", labels=[], files=[{"path": "src/core/3", "component": "ui"}])
+        stale = make_event(80, status="failed", component="api", test_id="suite#old")
+        stale["ts"] = old_ts
+        store.record_test_events(
+            [stale, make_event(70, status="failed", component="unknown", test_id="suite#t0")]
+        )
+        store.upsert_guidance(_rule("r1", "core", "make core"))
+        store.upsert_guidance({**_rule("r2", "core", "make core"), "test_id": "suite#t0"})
+
+    assert sorted(memory.distinct_pairs(30)) == sorted(sqlite.distinct_pairs(30))
+    assert memory.contingency_table(30) == sqlite.contingency_table(30)
+    assert memory.contingency_table(90) == sqlite.contingency_table(90)
+    assert memory.contingency_table(30, components=["ui"]) == sqlite.contingency_table(30, components=["ui"])
+    assert memory.contingency("api", "suite#old", 90) == sqlite.contingency("api", "suite#old", 90)
+    assert memory.universe_size(30) == sqlite.universe_size(30)
+    assert memory.get_components_for_pr(3) == sqlite.get_components_for_pr(3)
+    assert memory.export_stats() == sqlite.export_stats()
+    assert memory.get_active_guidance() == sqlite.get_active_guidance()
+
+    pruned = [store.prune_guidance(30, 5) for store in (sqlite, memory)]
+    assert pruned == [["core"], ["core"]]
+    assert [g["rule_id"] for g in memory.get_active_guidance()] == ["r2"]
+    assert memory.get_active_guidance() == sqlite.get_active_guidance()
+    assert memory.get_active_guidance_by_component(["core", "ui"]) == (
+        sqlite.get_active_guidance_by_component(["core", "ui"])
+    )
+    sqlite.close()
+
+
+def test_in_memory_snapshot_round_trip(tmp_path):
+    store = InMemoryStorage(event_mode="failures_plus_summary")
+    _seed_history(store, range(1, 10))
+    store.upsert_guidance(_rule("r1", "core", "make core"))
+    path = tmp_path / "snapshot.json"
+    store.save_snapshot(path)
+
+    restored = InMemoryStorage(event_mode="failures_plus_summary")
+    restored.load_snapshot(path)
+
+    assert restored.contingency_table(30) == store.contingency_table(30)
+    assert restored.universe_size(30) == store.universe_size(30)
+    assert restored.export_stats() == store.export_stats()
+    assert restored.get_active_guidance() == store.get_active_guidance()
+
+
+def test_merge_matches_direct_ingestion(tmp_path):
+    shard_a = Storage(str(tmp_path / "a.sqlite"))
+    shard_b = Storage(str(tmp_path / "b.sqlite"), event_mode="failures_plus_summary")
+    direct = Storage(str(tmp_path / "direct.sqlite"))
+    # PRs 8-11 ran on both runners; their events must be stored once.
+    _seed_history(shard_a, range(1, 12))
+    _seed_history(shard_b, range(8, 25))
+    _seed_history(direct, range(1, 25))
+    shard_a.close()
+    shard_b.close()
+
+    merged = Storage(str(tmp_path / "merged.sqlite"))
+    result = merged.merge_from([tmp_path / "a.sqlite", tmp_path / "b.sqlite"])
+
+    assert result["sources"] == 2
+    assert result["prs_added"] == 24
+    assert result["events_skipped"] == 5  # shard_b only stored their failures
+    assert merged.contingency_table(30) == direct.contingency_table(30)
+    assert merged.universe_size(30) == direct.universe_size(30)
+    assert merged.get_components_for_pr(9) == direct.get_components_for_pr(9)
+    # Merging the same shard again adds nothing.
+    assert merged.merge_from([tmp_path / "a.sqlite"])["events_added"] == 0
+    merged.close()
+    direct.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "memory"])
+@pytest.mark.parametrize("statuses", [("passed", "failed"), ("failed", "passed")])
+def test_failure_wins_when_a_run_reports_a_test_twice(tmp_path, backend, statuses):
+    # e.g. x86 and x64 result files of one CI run carry the same classname#name.
+    if backend == "sqlite":
+        store = Storage(str(tmp_path / "rules.sqlite"))
+    else:
+        store = InMemoryStorage()
+    first, second = (
+        make_event(1, status=status, component="core", test_id="suite#t0") for status in statuses
+    )
+    # In one batch and across batches, in either order.
+    store.record_test_events([first, second])
+    store.record_test_events([make_event(2, status=statuses[0], component="core", test_id="suite#t0")])
+    store.record_test_events([make_event(2, status=statuses[1], component="core", test_id="suite#t0")])
+
+    assert store.export_stats()["events_total"] == 2
+    assert store.export_stats()["events_failed"] == 2
+    assert [e["status"] for chunk in store.iter_events(10) for e in chunk] == ["failed", "failed"]
+    store.close()
+
+
+def test_merge_keeps_the_failure_of_a_run_reported_twice(tmp_path):
+    passed = Storage(str(tmp_path / "passed.sqlite"))
+    passed.record_test_events([make_event(1, status="passed", component="core", test_id="suite#t0")])
+    passed.close()
+    failed = Storage(str(tmp_path / "failed.sqlite"))
+    failed.record_test_events([make_event(1, status="failed", component="core", test_id="suite#t0")])
+    failed.close()
+
+    merged = Storage(str(tmp_path / "merged.sqlite"))
+    result = merged.merge_from([tmp_path / "passed.sqlite", tmp_path / "failed.sqlite"])
+    merged.merge_from([tmp_path / "passed.sqlite"])
+
+    assert result["events_added"] == 2
+    assert merged.export_stats()["events_failed"] == 1
+    assert merged.export_stats()["events_total"] == 1
+    merged.close()